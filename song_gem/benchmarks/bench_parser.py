@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark del parser de secciones de letras
+
+Mide el throughput de parse_sections sobre el corpus de respuestas reales del
+modelo (benchmarks/corpus/model_outputs) y comprueba que el tiempo crece de
+forma lineal con el tamaño de la entrada.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Agregar src al path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from utils.lyrics_sections import parse_sections
+
+CORPUS_DIR = Path(__file__).parent / "corpus" / "model_outputs"
+
+
+def load_corpus():
+    """Carga las respuestas del corpus (conservando finales de línea originales)"""
+    return {f.name: f.read_text(encoding='utf-8') for f in sorted(CORPUS_DIR.glob('*.txt'))}
+
+
+def time_parse(text: str, repeat: int) -> float:
+    """Devuelve el tiempo medio por parseo en segundos"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse_sections(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de parse_sections')
+    parser.add_argument('--repeat', type=int, default=2000, help='Repeticiones por archivo')
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"📂 {len(corpus)} respuestas en el corpus")
+    print("-" * 60)
+
+    total_lines = 0
+    total_time = 0.0
+    for name, text in corpus.items():
+        elapsed = time_parse(text, args.repeat)
+        lines = len(text.splitlines())
+        sections = parse_sections(text)
+        total_lines += lines
+        total_time += elapsed
+        print(f"{name:<38} {lines:>4} líneas  {len(sections):>2} secciones  {elapsed * 1e6:>8.1f} µs")
+
+    print("-" * 60)
+    print(f"Throughput: {total_lines / total_time:,.0f} líneas/s")
+
+    # Escalado: concatenar el corpus N veces debe escalar de forma lineal
+    joined = '\n\n'.join(corpus.values())
+    print("\nEscalado (corpus concatenado):")
+    base = None
+    for factor in (1, 10, 100):
+        elapsed = time_parse(joined * factor, max(1, args.repeat // (factor * 10)))
+        base = base or elapsed
+        print(f"  x{factor:<4} {elapsed * 1e3:>8.2f} ms  (ratio {elapsed / base:>6.1f})")
+
+
+if __name__ == "__main__":
+    main()
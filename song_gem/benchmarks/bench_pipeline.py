@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline del pipeline completo
+
+Genera corpus sintéticos deterministas de varios tamaños (ver
+synthetic_corpus.py) y mide clean_lyrics, cada método de StyleAnalyzer,
+generate_style_profile (también desde características ya guardadas),
+guardado/carga del perfil, la caché de letras con su
+índice de texto completo y sus búsquedas, la compilación del corpus de IDs
+de tokens y las palabras distintivas y, con el backend stub,
+el parseo de respuestas, la verificación de originalidad (también contra el
+corpus) y la generación completa. Informa throughput, memoria pico y la comparación con una línea base
+guardada. No usa red (requiere los modelos de spaCy/NLTK instalados).
+
+Uso:
+    python benchmarks/bench_pipeline.py --scales 10,100,1000
+    python benchmarks/bench_pipeline.py --save-baseline
+    python benchmarks/bench_pipeline.py --fail-on-regression --tolerance 0.25
+"""
+
+import argparse
+import io
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Agregar src (y este directorio) al path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).parent))
+
+from synthetic_corpus import clean_songs, generate_corpus, render_lyrics_page
+from utils.metrics import MetricsRegistry
+
+CORPUS_DIR = Path(__file__).parent / "corpus" / "model_outputs"
+DEFAULT_BASELINE = Path(__file__).parent / "results" / "baseline.json"
+DEFAULT_SCALES = (10, 100, 1000, 10000)
+# Por debajo de este tiempo las diferencias son ruido y no se marcan
+NOISE_FLOOR_SECONDS = 0.002
+
+
+def measure(fn: Callable, repeat: int, memory: bool) -> Dict:
+    """
+    Mide una función
+
+    Args:
+        fn: Función sin argumentos
+        repeat: Repeticiones cronometradas (se usa la mediana)
+        memory: Si True, hace una ejecución extra bajo tracemalloc para la memoria pico
+
+    Returns:
+        Segundos (mediana y mínimo) y bytes pico
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {'seconds': statistics.median(times), 'min_seconds': min(times), 'peak_bytes': peak}
+
+
+def quiet(fn: Callable) -> Callable:
+    """Silencia los print del pipeline durante la medición"""
+    def wrapper():
+        with redirect_stdout(io.StringIO()):
+            return fn()
+    return wrapper
+
+
+def analyzer_benchmarks(scale: int, workdir: Path) -> Tuple[List, Dict, object]:
+    """Benchmarks de limpieza y análisis para un corpus de `scale` canciones (con su perfil y corpus compilado)"""
+    from analyzers.feature_store import FeatureStore
+    from analyzers.style_analyzer import StyleAnalyzer
+    from analyzers.token_corpus import TokenCorpus
+    from scrapers.genius_client import extract_lyrics
+    from scrapers.lyrics_scraper import LyricsScraper
+    from utils.repetition import analyze_repetition
+
+    scraper = LyricsScraper('offline', str(workdir / 'lyrics_cache'))
+    analyzer = StyleAnalyzer()
+    approximate = StyleAnalyzer(approximate=True)
+    cached = StyleAnalyzer(feature_store=FeatureStore(str(workdir / f'features_{scale}.sqlite3')))
+    corpus = generate_corpus(scale)
+    songs = clean_songs(corpus, scraper.clean_lyrics, scraper.extract_sections)
+    pages = [render_lyrics_page(song) for song in corpus[:100]]
+    sample_lyrics = "\n".join(song['lyrics'] for song in songs[:5])
+    profile = quiet(lambda: analyzer.generate_style_profile('Synthetic Artist', songs))()
+    profile_path = workdir / f'profile_{scale}.json'
+    analyzer.save_style_profile(profile, str(profile_path))
+    scraper.cache_songs('Synthetic Artist', songs)  # Índice de texto completo para las búsquedas
+    quiet(lambda: cached.generate_style_profile('Synthetic Artist', songs))()  # Características guardadas
+
+    # Caché aparte con un segundo artista, para comparar vocabularios en el corpus compilado
+    corpus_cache = workdir / f'corpus_cache_{scale}'
+    corpus_cache.mkdir(exist_ok=True)
+    reference = clean_songs(generate_corpus(max(scale // 10, 10), artist='Reference Artist', seed=1),
+                            scraper.clean_lyrics)
+    for name, artist_songs in (('synthetic_artist', songs), ('reference_artist', reference)):
+        (corpus_cache / f'{name}.json').write_text(json.dumps(artist_songs), encoding='utf-8')
+    token_corpus = TokenCorpus(str(workdir / f'token_corpus_{scale}'))
+    token_corpus.update(str(corpus_cache))
+
+    def build_corpus():
+        shutil.rmtree(workdir / 'token_corpus_build', ignore_errors=True)
+        TokenCorpus(str(workdir / 'token_corpus_build')).update(str(corpus_cache))
+
+    return [
+        ('clean_lyrics', scale, lambda: [scraper.clean_lyrics(s['raw_lyrics']) for s in corpus]),
+        ('extract_lyrics_page', len(pages), lambda: [extract_lyrics(page) for page in pages]),
+        ('cache_songs_indexed', scale, lambda: scraper.cache_songs('Synthetic Artist', songs)),
+        ('search_lyrics', 1, lambda: scraper.search_lyrics('broken song')),
+        ('search_lines_ending', 1, lambda: scraper.search_lines(ending='ight')),
+        ('extract_sections', scale, lambda: [scraper.extract_sections(s['raw_lyrics']) for s in corpus]),
+        ('analyze_vocabulary', scale, lambda: analyzer.analyze_vocabulary(songs)),
+        ('analyze_vocabulary_approximate', scale, lambda: approximate.analyze_vocabulary(songs)),
+        ('analyze_sentiment_and_themes', scale, lambda: analyzer.analyze_sentiment_and_themes(songs)),
+        ('analyze_structure_patterns', scale, lambda: analyzer.analyze_structure_patterns(songs)),
+        ('detect_repetition', scale, lambda: [analyze_repetition(s['lyrics'].split('\n')) for s in songs]),
+        ('analyze_rhyme_patterns', min(scale, 5), lambda: analyzer.analyze_rhyme_patterns(sample_lyrics)),
+        ('generate_style_profile', scale, quiet(lambda: analyzer.generate_style_profile('Synthetic Artist', songs))),
+        ('generate_style_profile_cached_features', scale, quiet(
+            lambda: cached.generate_style_profile('Synthetic Artist', songs)
+        )),
+        ('generate_style_profile_streaming', scale, quiet(
+            lambda: analyzer.generate_style_profile_streaming('Synthetic Artist', iter(songs))
+        )),
+        ('profile_save', 1, lambda: analyzer.save_style_profile(profile, str(profile_path))),
+        ('profile_load', 1, lambda: analyzer.load_style_profile(str(profile_path))),
+        ('token_corpus_build', scale + len(reference), build_corpus),
+        ('analyze_corpus_vocabulary', scale, lambda: analyzer.analyze_corpus_vocabulary(
+            token_corpus, 'synthetic_artist'
+        )),
+    ], profile, token_corpus
+
+
+def generation_benchmarks(profile: Dict, generations: int, token_corpus) -> List:
+    """Benchmarks de parseo, originalidad (también contra el corpus) y generación completa con el backend stub"""
+    from generators.backends import StubBackend
+    from generators.lyrics_generator import LyricsGenerator
+
+    outputs = StubBackend.from_path(str(CORPUS_DIR)).outputs
+    generator = LyricsGenerator(backend=StubBackend(seed=0), metrics=MetricsRegistry())
+    corpus_generator = LyricsGenerator(backend=StubBackend(seed=0), metrics=MetricsRegistry(), corpus=token_corpus)
+    parsed = [generator._parse_lyrics_response(text) for text in outputs]
+
+    return [
+        ('parse_response', len(outputs), lambda: [generator._parse_lyrics_response(t) for t in outputs]),
+        ('check_originality', len(parsed), lambda: [generator._check_originality(p, profile) for p in parsed]),
+        ('check_originality_corpus', len(parsed), lambda: [
+            corpus_generator._check_originality(p, profile) for p in parsed
+        ]),
+        ('generate_lyrics_stub_x4', generations, quiet(lambda: [
+            generator.generate_lyrics(profile, f"tema {i}", candidate_count=4, parallel_candidates=False)
+            for i in range(generations)
+        ])),
+    ]
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Imprime la comparación con la línea base y devuelve las regresiones"""
+    regressions = []
+    print("\n📏 Comparación con la línea base")
+    print("-" * 78)
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            print(f"  {key:<44} (sin línea base)")
+            continue
+        ratio = result['seconds'] / base['seconds'] if base['seconds'] else 1.0
+        mem = ''
+        if result.get('peak_bytes') and base.get('peak_bytes'):
+            mem = f"  mem x{result['peak_bytes'] / base['peak_bytes']:.2f}"
+        flag = ''
+        if max(result['seconds'], base['seconds']) < NOISE_FLOOR_SECONDS:
+            pass
+        elif ratio > 1 + tolerance:
+            flag = '  ⚠️ regresión'
+            regressions.append(key)
+        elif ratio < 1 - tolerance:
+            flag = '  🚀 mejora'
+        print(f"  {key:<44} x{ratio:5.2f}{mem}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offline del pipeline de SongGem')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='Tamaños de corpus separados por comas')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por benchmark (mediana)')
+    parser.add_argument('--generations', type=int, default=10, help='Generaciones stub a medir')
+    parser.add_argument('--no-memory', action='store_true', help='No medir memoria pico (más rápido)')
+    parser.add_argument('--only', help='Ejecuta solo benchmarks cuyo nombre contenga este texto')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Archivo de línea base')
+    parser.add_argument('--save-baseline', action='store_true', help='Guarda los resultados como línea base')
+    parser.add_argument('--output', help='Guarda los resultados de esta ejecución en JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Margen relativo antes de marcar una regresión')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Sale con código 1 si hay regresiones frente a la línea base')
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+    results = {}
+
+    print(f"🧪 Benchmark del pipeline (Python {platform.python_version()}, escalas {scales})")
+    print(f"{'benchmark':<44} {'mediana':>10} {'items/s':>12} {'mem pico':>10}")
+    print("-" * 78)
+
+    def run(name: str, scale, items: int, fn: Callable, repeat: int):
+        key = f"{name}@{scale}"
+        if args.only and args.only not in key:
+            return
+        result = measure(fn, repeat, not args.no_memory)
+        result['items'] = items
+        result['throughput'] = items / result['seconds'] if result['seconds'] else 0.0
+        results[key] = result
+        peak = f"{result['peak_bytes'] / 2 ** 20:8.1f}MB" if result['peak_bytes'] is not None else '-'
+        print(f"{key:<44} {result['seconds'] * 1e3:>8.2f}ms {result['throughput']:>12,.0f} {peak:>10}")
+
+    profile = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            benchmarks, profile, token_corpus = analyzer_benchmarks(scale, Path(tmp))
+            repeat = args.repeat if scale <= 1000 else 1
+            for name, items, fn in benchmarks:
+                run(name, scale, items, fn, repeat)
+
+        if profile is not None:
+            for name, items, fn in generation_benchmarks(profile, args.generations, token_corpus):
+                run(name, 'stub', items, fn, args.repeat)
+
+    baseline_path = Path(args.baseline)
+    regressions = []
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        regressions = compare(results, baseline.get('results', {}), args.tolerance)
+
+    payload = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(payload, indent=2), encoding='utf-8')
+        print(f"\n💾 Resultados guardados en {args.output}")
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+        print(f"\n💾 Línea base guardada en {baseline_path}")
+
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regresiones por encima del {args.tolerance:.0%}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Fuzzing del parser de secciones de letras
+
+Aplica mutaciones aleatorias (saltos de línea, markdown, CRLF, truncado,
+encabezados duplicados, ruido unicode) al corpus de respuestas del modelo y
+verifica invariantes de parse_sections:
+
+- nunca lanza excepciones
+- ninguna sección queda vacía y todas las etiquetas tienen formato [..]
+- ninguna línea de salida es un encabezado ni línea vacía
+- las líneas de salida aparecen en el mismo orden que en la entrada
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from utils.lyrics_sections import parse_sections, _HEADER_RE
+
+CORPUS_DIR = Path(__file__).parent / "corpus" / "model_outputs"
+
+HEADERS = ['[Chorus]', '**[Verse 3]**', '## Bridge', 'Coro:', '(Hook)', '[Outro] (opcional)', '**Puente:**']
+NOISE = ['', ' ', '---', '```', '*', '**', '—', '¿¡', '\t', '🎵', '[', ']', '[]', '()', '#']
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    """Aplica entre 1 y 5 mutaciones aleatorias al texto"""
+    lines = text.splitlines()
+    for _ in range(rng.randint(1, 5)):
+        op = rng.randrange(7)
+        pos = rng.randint(0, len(lines)) if lines else 0
+        if op == 0:
+            lines.insert(pos, rng.choice(HEADERS))
+        elif op == 1:
+            lines.insert(pos, rng.choice(NOISE))
+        elif op == 2 and lines:
+            del lines[rng.randrange(len(lines))]
+        elif op == 3 and lines:
+            i = rng.randrange(len(lines))
+            lines[i] = f"**{lines[i]}**"
+        elif op == 4:
+            lines = lines[:pos]
+        elif op == 5 and lines:
+            i = rng.randrange(len(lines))
+            lines.insert(i, lines[i])
+        elif op == 6:
+            lines = [line + '\r' for line in lines]
+    return '\n'.join(lines)
+
+
+def check_invariants(text: str):
+    """Lanza AssertionError si el resultado viola alguna invariante"""
+    sections = parse_sections(text)
+    source = text
+    cursor = 0
+    for label, lines in sections:
+        assert lines, f"sección vacía: {label}"
+        assert label.startswith('[') and label.endswith(']'), f"etiqueta mal formada: {label}"
+        for line in lines:
+            assert line.strip(), "línea vacía en la salida"
+            assert not _HEADER_RE.match(line), f"encabezado en la salida: {line}"
+            found = source.find(line.split()[0], cursor)
+            assert found >= 0, f"línea fuera de orden: {line}"
+            cursor = found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fuzzing de parse_sections')
+    parser.add_argument('--iterations', type=int, default=5000, help='Casos a generar')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla aleatoria')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [f.read_text(encoding='utf-8') for f in sorted(CORPUS_DIR.glob('*.txt'))]
+
+    failures = 0
+    for i in range(args.iterations):
+        case = mutate(rng.choice(corpus), rng)
+        try:
+            check_invariants(case)
+        except Exception as e:
+            failures += 1
+            if failures <= 5:
+                print(f"❌ Caso {i}: {type(e).__name__}: {e}")
+                print(case[:300])
+                print("-" * 40)
+
+    print(f"{'✅' if not failures else '❌'} {args.iterations - failures}/{args.iterations} casos correctos")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
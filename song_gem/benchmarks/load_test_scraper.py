@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de LyricsScraper contra el servidor simulado de Genius
+
+Descarga los catálogos de varios artistas sintéticos con el cliente
+asíncrono a distintos niveles de concurrencia (conexiones simultáneas) e
+informa canciones por segundo, peticiones, reintentos y conexiones abiertas
+en cada nivel. Sin --base-url arranca mock_genius.py en un hilo del mismo
+proceso; para medir sin que el servidor compita por la CPU, lánzalo aparte y
+pasa su URL.
+
+Uso:
+    python benchmarks/load_test_scraper.py --concurrency 1,4,16,32 --latency-ms 50
+    python benchmarks/load_test_scraper.py --error-rate 0.05 --rate-limit 200
+    python benchmarks/mock_genius.py --port 8765 --latency-ms 50 &
+    python benchmarks/load_test_scraper.py --base-url http://127.0.0.1:8765
+"""
+
+import argparse
+import io
+import json
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+from typing import Dict
+
+# Agregar src (y este directorio) al path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).parent))
+
+import httpx
+
+from mock_genius import add_server_arguments, running_in_thread, server_from_arguments
+from scrapers.lyrics_scraper import LyricsScraper
+
+
+def server_stats(base_url: str) -> Dict:
+    """Contadores del servidor simulado"""
+    return httpx.get(f"{base_url}/_stats").json()
+
+
+def run_level(base_url: str, concurrency: int, artists: int, songs: int, workdir: Path) -> Dict:
+    """
+    Descarga los catálogos completos con un nivel de concurrencia
+
+    Returns:
+        Canciones, tiempo y diferencias de los contadores del servidor
+    """
+    scraper = LyricsScraper('mock-token', str(workdir / f'c{concurrency}'),
+                            max_connections=concurrency, base_url=base_url)
+    before = server_stats(base_url)
+    start = time.perf_counter()
+    fetched = 0
+    try:
+        for artist_id in range(1, artists + 1):
+            with redirect_stdout(io.StringIO()):
+                fetched += len(scraper.get_artist_songs(f"Mock Artist {artist_id}", songs))
+    finally:
+        elapsed = time.perf_counter() - start
+        scraper.client.close()
+    after = server_stats(base_url)
+
+    def delta(name: str) -> int:
+        return after.get(name, 0) - before.get(name, 0)
+
+    failed = sum(delta(name) for name in after if name.startswith('status_') and name != 'status_200')
+    return {
+        'concurrency': concurrency,
+        'songs': fetched,
+        'seconds': elapsed,
+        'songs_per_second': fetched / elapsed if elapsed else 0.0,
+        'requests': delta('requests_total'),
+        'failed_responses': failed,
+        'rate_limited': delta('rate_limited'),
+        # La conexión de la consulta final de _stats no es del scraper
+        'connections': delta('connections') - 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga del scraper contra Genius simulado')
+    parser.add_argument('--concurrency', default='1,2,4,8,16,32', help='Niveles de concurrencia separados por comas')
+    parser.add_argument('--base-url', help='URL de un mock_genius.py ya arrancado (si no, se arranca uno)')
+    parser.add_argument('--output', help='Guarda los resultados en JSON')
+    add_server_arguments(parser)
+    parser.set_defaults(artists=4, songs=50, latency_ms=50.0)
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+    results = []
+    with ExitStack() as stack:
+        base_url = args.base_url
+        if not base_url:
+            server = server_from_arguments(args)
+            server.warm()
+            base_url = stack.enter_context(running_in_thread(server)).url
+        workdir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+
+        print(f"🧪 Carga del scraper contra {base_url} ({args.artists} artistas x {args.songs} canciones)")
+        print(f"{'concurrencia':>12} {'canciones':>10} {'tiempo':>9} {'canc/s':>9} "
+              f"{'peticiones':>11} {'fallidas':>9} {'conexiones':>11}")
+        print("-" * 78)
+        for concurrency in levels:
+            result = run_level(base_url, concurrency, args.artists, args.songs, workdir)
+            results.append(result)
+            print(f"{concurrency:>12} {result['songs']:>10} {result['seconds']:>8.2f}s "
+                  f"{result['songs_per_second']:>9.1f} {result['requests']:>11} "
+                  f"{result['failed_responses']:>9} {result['connections']:>11}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'args': vars(args), 'results': results}, indent=2),
+                                     encoding='utf-8')
+        print(f"\n💾 Resultados guardados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
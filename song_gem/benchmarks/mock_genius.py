@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita la API de Genius para pruebas de carga del scraper
+
+Sirve artistas, listas de canciones y páginas de letras sintéticas
+(synthetic_corpus.py) con los endpoints que usa el cliente asíncrono de
+genius_client.py, con latencia configurable, inyección de errores (429/5xx)
+y límite de peticiones por segundo. Las canciones se generan bajo demanda y
+son deterministas para una misma semilla.
+
+Endpoints:
+    GET /search?q=...                  Canciones del artista (y título) buscado
+    GET /artists/{id}/songs            Canciones paginadas (sort: popularity, title, release_date)
+    GET /songs/{id}                    Metadatos completos de una canción
+    GET /lyrics/{id}                   Página HTML con la letra
+    GET /_stats                        Contadores del servidor (peticiones, errores, conexiones)
+    POST /_release?artist=N&count=K    Publica K canciones nuevas del artista N (pruebas de --sync)
+
+Uso:
+    python benchmarks/mock_genius.py --port 8765 --artists 20 --songs 200 --latency-ms 80
+    python src/main.py --analyze "Mock Artist 1" --genius-key x --genius-url http://127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.append(str(Path(__file__).parent))
+
+from synthetic_corpus import generate_song, render_lyrics_page
+
+_REASONS = {
+    200: 'OK', 401: 'Unauthorized', 404: 'Not Found', 429: 'Too Many Requests',
+    500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable', 504: 'Gateway Timeout',
+}
+# Separación entre IDs de canción de artistas distintos
+_SONG_ID_STRIDE = 100000
+_FIRST_RELEASE = date(2000, 1, 1)
+_SONG_PATH_RE = re.compile(r'^/songs/(\d+)$')
+_ARTIST_SONGS_RE = re.compile(r'^/artists/(\d+)/songs$')
+_LYRICS_RE = re.compile(r'^/lyrics/(\d+)$')
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+class TokenBucket:
+    """Límite de peticiones por segundo con ráfagas de hasta `burst`"""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def acquire(self) -> float:
+        """Consume un token; devuelve 0 si se concede o los segundos hasta el siguiente"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class MockGeniusServer:
+    """Imitación de la API y las páginas de Genius sobre asyncio"""
+
+    def __init__(self, artists: int = 10, songs_per_artist: int = 100, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, error_statuses: Tuple[int, ...] = (429, 500, 503),
+                 rate_limit: float = 0.0, retry_after: float = 1.0, page_padding: int = 200,
+                 seed: int = 0, host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            artists: Número de artistas sintéticos ("Mock Artist 1" ... "Mock Artist N")
+            songs_per_artist: Canciones por artista
+            latency: Latencia añadida a cada respuesta (segundos)
+            jitter: Variación aleatoria máxima sobre la latencia (segundos)
+            error_rate: Fracción de peticiones que fallan con un código de error_statuses
+            error_statuses: Códigos de los errores inyectados
+            rate_limit: Peticiones por segundo permitidas (0 = sin límite); el
+                exceso recibe 429 con Retry-After
+            retry_after: Retry-After de los 429 inyectados (segundos)
+            page_padding: Relleno de las páginas de letras (ver render_lyrics_page)
+            seed: Semilla de letras, latencias y errores
+            host: Dirección de escucha
+            port: Puerto de escucha (0 = uno libre)
+        """
+        self.artists = artists
+        self.songs_per_artist = songs_per_artist
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.retry_after = retry_after
+        self.page_padding = page_padding
+        self.seed = seed
+        self.host = host
+        self.port = port
+        self.bucket = TokenBucket(rate_limit) if rate_limit else None
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        # Canciones publicadas por artista después de arrancar (release())
+        self._released = Counter()
+        self._songs: Dict[int, Dict] = {}
+        self._pages: Dict[int, bytes] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+
+    @property
+    def url(self) -> str:
+        """URL base del servidor (para LyricsScraper(base_url=...))"""
+        return f"http://{self.host}:{self.port}"
+
+    # Datos sintéticos
+
+    def artist_name(self, artist_id: int) -> str:
+        return f"Mock Artist {artist_id}"
+
+    def song_count(self, artist_id: int) -> int:
+        """Canciones publicadas de un artista (las iniciales más las de release())"""
+        return self.songs_per_artist + self._released[artist_id]
+
+    def release(self, artist_id: int, count: int = 1) -> List[int]:
+        """
+        Publica canciones nuevas de un artista, con fecha e ID posteriores a las existentes
+
+        Returns:
+            IDs de las canciones publicadas
+        """
+        first = artist_id * _SONG_ID_STRIDE + self.song_count(artist_id)
+        self._released[artist_id] += count
+        return list(range(first, first + count))
+
+    def _song(self, song_id: int) -> Optional[Dict]:
+        """Canción sintética (generada la primera vez que se pide)"""
+        artist_id, index = divmod(song_id, _SONG_ID_STRIDE)
+        if not 1 <= artist_id <= self.artists or not 0 <= index < self.song_count(artist_id):
+            return None
+        song = self._songs.get(song_id)
+        if song is None:
+            artist = self.artist_name(artist_id)
+            song = generate_song(random.Random(f"{artist}:{self.seed}:{index}"), artist, index)
+            song['id'] = song_id
+            song['artist_id'] = artist_id
+            # Las canciones más recientes tienen índice mayor
+            song['release_date'] = _FIRST_RELEASE + timedelta(days=30 * index)
+            self._songs[song_id] = song
+        return song
+
+    def _song_body(self, song: Dict, full: bool = False) -> Dict:
+        """Canción con el formato de la API (resumen o metadatos completos)"""
+        released = song['release_date']
+        body = {
+            'id': song['id'],
+            'title': song['title'],
+            'full_title': f"{song['title']} by {song['artist']}",
+            'url': f"{self.url}/lyrics/{song['id']}",
+            'path': f"/lyrics/{song['id']}",
+            'api_path': f"/songs/{song['id']}",
+            'lyrics_state': 'complete',
+            'release_date_for_display': f"{released:%B} {released.day}, {released.year}",
+            'primary_artist': {
+                'id': song['artist_id'],
+                'name': song['artist'],
+                'api_path': f"/artists/{song['artist_id']}",
+            },
+        }
+        if full:
+            body.update({
+                'instrumental': False,
+                'release_date': released.isoformat(),
+                'featured_artists': [],
+                'producer_artists': [{'id': 900000 + song['artist_id'], 'name': f"{song['artist']} Producer"}],
+                'writer_artists': [{'id': song['artist_id'], 'name': song['artist']}],
+            })
+        return body
+
+    def _artist_song_ids(self, artist_id: int, sort: str) -> List[int]:
+        ids = [artist_id * _SONG_ID_STRIDE + index for index in range(self.song_count(artist_id))]
+        if sort == 'title':
+            ids.sort(key=lambda song_id: self._song(song_id)['title'])
+        elif sort == 'release_date':
+            ids.reverse()  # Más recientes primero
+        return ids
+
+    def warm(self):
+        """Genera por adelantado todas las canciones y páginas (fuera de las mediciones)"""
+        for artist_id in range(1, self.artists + 1):
+            for song_id in self._artist_song_ids(artist_id, 'popularity'):
+                self._lyrics_page(song_id)
+
+    # Endpoints
+
+    def _search(self, query: Dict) -> Tuple[int, object]:
+        wanted = f" {_normalize(query.get('q', ''))} "
+        hits = []
+        for artist_id in range(1, self.artists + 1):
+            if f" {_normalize(self.artist_name(artist_id))} " not in wanted:
+                continue
+            songs = [self._song(song_id) for song_id in self._artist_song_ids(artist_id, 'popularity')]
+            # Las canciones cuyo título aparece en la búsqueda van primero
+            songs.sort(key=lambda song: f" {_normalize(song['title'])} " not in wanted)
+            hits.extend({'type': 'song', 'result': self._song_body(song)} for song in songs[:10])
+        return 200, {'meta': {'status': 200}, 'response': {'hits': hits[:20]}}
+
+    def _artist_songs(self, artist_id: int, query: Dict) -> Tuple[int, object]:
+        if not 1 <= artist_id <= self.artists:
+            return 404, {'meta': {'status': 404, 'message': 'Not found'}}
+        per_page = min(int(query.get('per_page', 20)), 50)
+        page = max(int(query.get('page', 1)), 1)
+        ids = self._artist_song_ids(artist_id, query.get('sort', 'title'))
+        chunk = ids[(page - 1) * per_page:page * per_page]
+        return 200, {'meta': {'status': 200}, 'response': {
+            'songs': [self._song_body(self._song(song_id)) for song_id in chunk],
+            'next_page': page + 1 if page * per_page < len(ids) else None,
+        }}
+
+    def _song_detail(self, song_id: int) -> Tuple[int, object]:
+        song = self._song(song_id)
+        if song is None:
+            return 404, {'meta': {'status': 404, 'message': 'Not found'}}
+        return 200, {'meta': {'status': 200}, 'response': {'song': self._song_body(song, full=True)}}
+
+    def _lyrics_page(self, song_id: int) -> Tuple[int, object]:
+        song = self._song(song_id)
+        if song is None:
+            return 404, '<html><body>Not found</body></html>'
+        page = self._pages.get(song_id)
+        if page is None:
+            page = self._pages[song_id] = render_lyrics_page(song, self.page_padding).encode('utf-8')
+        return 200, page
+
+    def _route(self, path: str, query: Dict, headers: Dict) -> Tuple[int, object]:
+        """Resuelve la ruta; los endpoints de la API exigen el token"""
+        match = _LYRICS_RE.match(path)
+        if match:
+            self.stats['requests_page'] += 1
+            return self._lyrics_page(int(match.group(1)))
+
+        self.stats['requests_api'] += 1
+        if not headers.get('authorization', '').startswith('Bearer '):
+            return 401, {'meta': {'status': 401, 'message': 'Missing access token'}}
+        if path == '/search':
+            return self._search(query)
+        match = _ARTIST_SONGS_RE.match(path)
+        if match:
+            return self._artist_songs(int(match.group(1)), query)
+        match = _SONG_PATH_RE.match(path)
+        if match:
+            return self._song_detail(int(match.group(1)))
+        return 404, {'meta': {'status': 404, 'message': 'Not found'}}
+
+    async def _respond(self, path: str, query: Dict, headers: Dict) -> Tuple[int, object, Dict]:
+        """Aplica límite de peticiones, errores inyectados y latencia antes de responder"""
+        if path == '/_stats':
+            return 200, dict(self.stats), {}
+        if path == '/_release':
+            artist_id = int(query.get('artist', 1))
+            if not 1 <= artist_id <= self.artists:
+                return 404, {'meta': {'status': 404, 'message': 'Not found'}}, {}
+            return 200, {'released': self.release(artist_id, int(query.get('count', 1)))}, {}
+
+        self.stats['requests_total'] += 1
+        if self.bucket:
+            wait = self.bucket.acquire()
+            if wait:
+                self.stats['rate_limited'] += 1
+                return 429, {'meta': {'status': 429, 'message': 'Rate limited'}}, {'Retry-After': f"{wait:.3f}"}
+
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self.rng.random() < self.error_rate:
+            status = self.rng.choice(self.error_statuses)
+            self.stats['injected_errors'] += 1
+            extra = {'Retry-After': f"{self.retry_after:g}"} if status == 429 else {}
+            return status, {'meta': {'status': status, 'message': 'Injected error'}}, extra
+
+        status, payload = self._route(path, query, headers)
+        return status, payload, {}
+
+    # HTTP
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atiende una conexión con keep-alive"""
+        self.stats['connections'] += 1
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                method, target, version = lines[0].split(' ', 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                url = urlsplit(target)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                status, payload, extra = await self._respond(url.path.rstrip('/') or '/', query, headers)
+                self.stats[f'status_{status}'] += 1
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+                self._write(writer, status, payload, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # stop() cierra las conexiones keep-alive abiertas
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, payload, extra: Dict, keep_alive: bool):
+        if isinstance(payload, (bytes, str)):
+            body = payload if isinstance(payload, bytes) else payload.encode('utf-8')
+            content_type = 'text/html; charset=utf-8'
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        head = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ] + [f"{name}: {value}" for name, value in extra.items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+
+    async def start(self):
+        """Abre el socket de escucha"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Cierra el socket de escucha y las conexiones keep-alive abiertas"""
+        if self._server:
+            self._server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"🎭 Genius simulado en {self.url} ({self.artists} artistas x {self.songs_per_artist} canciones)")
+        async with self._server:
+            await self._server.serve_forever()
+
+
+@contextmanager
+def running_in_thread(server: MockGeniusServer):
+    """
+    Ejecuta el servidor en un hilo con su propio event loop
+
+    Args:
+        server: Servidor a arrancar
+
+    Yields:
+        El servidor ya escuchando (con su puerto asignado)
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name='mock-genius', daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """Opciones de simulación comunes a este script y al de carga"""
+    parser.add_argument('--artists', type=int, default=10, help='Artistas sintéticos')
+    parser.add_argument('--songs', type=int, default=100, help='Canciones por artista')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latencia por respuesta')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Variación aleatoria de la latencia')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de respuestas con error')
+    parser.add_argument('--error-statuses', default='429,500,503', help='Códigos de los errores inyectados')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Peticiones/s permitidas (0 = sin límite)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After de los 429 inyectados')
+    parser.add_argument('--page-padding', type=int, default=200, help='Relleno de las páginas de letras')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla')
+
+
+def server_from_arguments(args, host: str = '127.0.0.1', port: int = 0) -> MockGeniusServer:
+    """Construye el servidor a partir de las opciones de add_server_arguments"""
+    return MockGeniusServer(
+        artists=args.artists,
+        songs_per_artist=args.songs,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(',') if s.strip()),
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        page_padding=args.page_padding,
+        seed=args.seed,
+        host=host,
+        port=port,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que imita la API de Genius')
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección de escucha')
+    parser.add_argument('--port', type=int, default=8765, help='Puerto de escucha')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_arguments(args, args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print(f"\n👋 Servidor detenido ({dict(server.stats)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
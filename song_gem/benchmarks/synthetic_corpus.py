@@ -0,0 +1,153 @@
+"""
+Corpus sintético y determinista de canciones para benchmarks
+
+Genera catálogos de artista con la misma forma que devuelve LyricsScraper
+(título, artista, letras, conteos), con secciones etiquetadas, estribillos
+repetidos, rimas por familias y el ruido típico de Genius ("Embed", créditos
+entre corchetes) para que clean_lyrics tenga trabajo real. La misma semilla
+produce siempre el mismo corpus, sin red.
+"""
+
+import html
+import random
+from typing import Dict, List
+
+_SUBJECTS = ['I', 'you', 'we', 'they', 'my heart', 'the city', 'your ghost', 'the radio', 'this town', 'the night']
+_VERBS = ['keep', 'lose', 'chase', 'remember', 'burn', 'hold', 'carry', 'break', 'follow', 'call']
+_OBJECTS = ['the light', 'your name', 'a promise', 'the highway', 'every secret', 'the morning', 'my shadow',
+            'the river', 'our story', 'the silence', 'a broken song', 'the summer']
+_ADVERBS = ['tonight', 'again', 'forever', 'alone', 'slowly', 'somehow', 'in the dark', 'on the floor']
+
+# Familias de rima: la última palabra del verso sale de la misma familia
+_RHYMES = [
+    ['fire', 'higher', 'wire', 'desire', 'liar', 'choir'],
+    ['rain', 'pain', 'again', 'chain', 'train', 'lane'],
+    ['heart', 'apart', 'start', 'art', 'dark', 'part'],
+    ['night', 'light', 'fight', 'bright', 'right', 'flight'],
+    ['love', 'above', 'enough', 'glove', 'dove', 'of'],
+    ['home', 'alone', 'stone', 'phone', 'bone', 'known'],
+]
+_MOODS = ['happy', 'love', 'cry', 'dark', 'dance', 'lonely', 'free', 'lost', 'smile', 'hurt']
+_STRUCTURES = [
+    ['Verse 1', 'Chorus', 'Verse 2', 'Chorus', 'Bridge', 'Chorus'],
+    ['Intro', 'Verse 1', 'Pre-Chorus', 'Chorus', 'Verse 2', 'Pre-Chorus', 'Chorus', 'Outro'],
+    ['Verse 1', 'Verse 2', 'Chorus', 'Verse 3', 'Chorus'],
+    ['Verse 1', 'Chorus', 'Verse 2', 'Chorus'],
+]
+
+
+def _line(rng: random.Random, rhyme: str) -> str:
+    words = [rng.choice(_SUBJECTS), rng.choice(_VERBS), rng.choice(_OBJECTS)]
+    if rng.random() < 0.5:
+        words.append(rng.choice(_ADVERBS))
+    if rng.random() < 0.3:
+        words.append(rng.choice(_MOODS))
+    words.append(rhyme)
+    line = ' '.join(words)
+    return line[0].upper() + line[1:]
+
+
+def _stanza(rng: random.Random, lines: int) -> List[str]:
+    # Esquema AABB o ABAB según la canción
+    a, b = rng.sample(_RHYMES, 2)
+    scheme = [a, a, b, b] if rng.random() < 0.6 else [a, b, a, b]
+    return [_line(rng, rng.choice(scheme[i % 4])) for i in range(lines)]
+
+
+def generate_song(rng: random.Random, artist: str, index: int) -> Dict:
+    """Genera una canción con letras en bruto (tal como llegan de Genius)"""
+    structure = rng.choice(_STRUCTURES)
+    chorus = _stanza(rng, 4)
+    parts = [f"{rng.randint(1, 200)} Contributors{artist} Song {index} Lyrics"]
+    for label in structure:
+        lines = chorus if label == 'Chorus' else _stanza(rng, rng.choice((2, 4, 4, 6, 8)))
+        parts.append(f"[{label}]\n" + '\n'.join(lines))
+    raw = '\n\n'.join(parts) + f"{rng.randint(1, 99)}Embed"
+
+    return {
+        'title': f"Song {index}",
+        'artist': artist,
+        'raw_lyrics': raw,
+        'structure': structure,
+    }
+
+
+def generate_corpus(n_songs: int, artist: str = 'Synthetic Artist', seed: int = 0) -> List[Dict]:
+    """
+    Genera un catálogo determinista de canciones
+
+    Args:
+        n_songs: Número de canciones
+        artist: Nombre del artista
+        seed: Semilla del generador
+
+    Returns:
+        Canciones con 'raw_lyrics' (sin limpiar) y el resto de campos del scraper
+        excepto 'lyrics', que se rellena con clean_songs
+    """
+    rng = random.Random(f"{artist}:{seed}:{n_songs}")
+    return [generate_song(rng, artist, i) for i in range(n_songs)]
+
+
+def clean_songs(corpus: List[Dict], clean, extract_sections=None) -> List[Dict]:
+    """
+    Aplica la limpieza del scraper y añade los campos que él calcula
+
+    Args:
+        corpus: Canciones generadas por generate_corpus
+        clean: Función de limpieza (LyricsScraper.clean_lyrics)
+        extract_sections: Extracción de secciones (LyricsScraper.extract_sections);
+            sin ella las canciones son como las de cachés antiguas, sin 'sections'
+
+    Returns:
+        Canciones listas para StyleAnalyzer
+    """
+    songs = []
+    for song in corpus:
+        lyrics = clean(song['raw_lyrics'])
+        cleaned = {
+            'title': song['title'],
+            'artist': song['artist'],
+            'lyrics': lyrics,
+            'word_count': len(lyrics.split()),
+            'line_count': len(lyrics.split('\n')),
+        }
+        if extract_sections:
+            cleaned['sections'] = extract_sections(song['raw_lyrics'])
+        songs.append(cleaned)
+    return songs
+
+
+def render_lyrics_page(song: Dict, padding: int = 200) -> str:
+    """
+    Página HTML de la canción con el marcado de Genius
+
+    Las estrofas se reparten en dos contenedores data-lyrics-container, con
+    la cabecera LyricsHeader, enlaces de anotación y scripts de relleno
+    como en las páginas reales.
+
+    Args:
+        song: Canción de generate_corpus
+        padding: Bloques de relleno (scripts y pie) alrededor de la letra
+
+    Returns:
+        HTML de la página
+    """
+    stanzas = song['raw_lyrics'].split('\n\n')[1:]
+    middle = len(stanzas) // 2
+    containers = []
+    for chunk in (stanzas[:middle], stanzas[middle:]):
+        lines = '<br/><br/>'.join(
+            '<br/>'.join(f'<a class="ReferentFragment"><span>{html.escape(line)}</span></a>'
+                         if i % 3 == 1 else html.escape(line) for i, line in enumerate(stanza.split('\n')))
+            for stanza in chunk
+        )
+        containers.append(f'<div data-lyrics-container="true" class="Lyrics__Container">{lines}</div>')
+    header = (f'<div class="LyricsHeader__Container"><h2>{html.escape(song["title"])} Lyrics</h2></div>')
+    filler = '<div class="Footer"><a href="/about">About</a><p>Genius is the world&#x27;s biggest collection</p></div>'
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        + '<script>window.__CONFIG__ = {"a": 1, "b": [1, 2, 3]};</script>' * padding
+        + f'</head><body><main>{containers[0].replace(">", ">" + header, 1)}{containers[1]}</main>'
+        + filler * padding + '</body></html>'
+    )
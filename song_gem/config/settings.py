@@ -7,19 +7,54 @@ GENIUS_API_KEY = None  # Tu API key de Genius
 # Configuración de scraping
 MAX_SONGS_PER_ARTIST = 50  # Máximo de canciones a analizar por artista
 MIN_LYRICS_LENGTH = 100    # Longitud mínima de letras para analizar
+GENIUS_CLIENT = "async"    # "async" (httpx, conexiones reutilizables) o "lyricsgenius"
+GENIUS_MAX_CONNECTIONS = 10  # Conexiones simultáneas a Genius del cliente asíncrono
+LYRICS_CACHE_FRESH_TTL = 7 * 86400      # Edad (s) hasta la que un artista cacheado se sirve sin refrescar
+LYRICS_CACHE_HARD_EXPIRY = 90 * 86400   # Edad (s) desde la que se refresca antes de servir (0 = nunca)
+SONG_LOOKUP_TTL = 30 * 86400            # Vigencia (s) de las canciones sueltas buscadas en Genius
+SONG_LOOKUP_NEGATIVE_TTL = 86400        # Vigencia (s) de las búsquedas de canciones sin resultado
+GENIUS_RATE_LIMIT = 10                  # Peticiones por segundo a Genius como máximo (0 = sin límite)
+SYNC_MAX_NEW_SONGS = 50                 # Canciones nuevas por artista como máximo al sincronizar
+GENIUS_API_URL = "https://api.genius.com"  # Otra URL apunta al servidor simulado (benchmarks/mock_genius.py)
 
 # Configuración de análisis
 SENTIMENT_THRESHOLD = 0.1  # Umbral para análisis de sentimiento
 RHHEME_ANALYSIS_DEPTH = 3  # Profundidad de análisis de rimas
+ANALYSIS_MODE = "auto"              # "exact", "streaming", "approximate" o "auto" (streaming desde el umbral)
+STREAMING_ANALYSIS_THRESHOLD = 2000  # Canciones a partir de las que "auto" usa streaming
+STREAMING_MEMORY_BUDGET_MB = 32     # Presupuesto de memoria de los sketches en streaming
+REBUILD_WORKERS = 0                 # Procesos de --rebuild-profiles (0 = uno por CPU)
+VOCAB_SKETCH_PRECISION = 12         # HyperLogLog de palabras distintas (2^p registros, ~1.6 % de error)
+VOCAB_SKETCH_TOP_WORDS = 1000       # Palabras más frecuentes guardadas en el perfil para los agregados
+DEFAULT_LANGUAGE = "en"             # Idioma de las letras sin señal suficiente para detectarlo
+PRELOAD_LANGUAGES = ["en", "es"]    # Recursos cargados antes de lanzar workers (los heredan al hacer fork)
 
 # Configuración de generación
 GENERATION_TEMPERATURE = 0.8
 MAX_TOKENS = 2000
+GENERATION_BACKEND = "gemini"  # "gemini" o "stub" (local, sin red)
+GENERATION_CANDIDATES = 1  # Candidatos por canción (best-of-N con reranking local)
+MAX_CANDIDATES = 8         # Máximo de candidatos por petición (cada uno es una llamada al modelo)
+CANDIDATE_WORKERS = 4      # Llamadas simultáneas al modelo por generación best-of-N
+
+# Modo servicio HTTP (--serve)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+SERVER_WORKERS = 4     # Hilos para scraping, análisis y generación concurrentes
 
 # Paths
 DATA_DIR = "../data"
 LYRICS_CACHE_DIR = f"{DATA_DIR}/lyrics_cache"
 STYLE_PROFILES_DIR = f"{DATA_DIR}/style_profiles"
+PROFILE_CACHE_SIZE = 64  # Perfiles de estilo en memoria (LRU)
+FEATURE_STORE_PATH = f"{DATA_DIR}/song_features.sqlite3"  # Características por canción ("" = sin almacén)
+TOKEN_CORPUS_DIR = f"{DATA_DIR}/token_corpus"  # Corpus compilado de la caché (--build-corpus; "" = sin corpus)
+GENERATIONS_DB_PATH = f"{DATA_DIR}/generations.sqlite3"  # Canciones generadas y reescritas
+
+# Cola de trabajos en segundo plano (--job-*)
+JOBS_DB_PATH = f"{DATA_DIR}/jobs.sqlite3"
+JOB_WORKERS = 2          # Procesos worker por defecto
+JOB_POLL_INTERVAL = 1.0  # Segundos de espera cuando la cola está vacía
 
 # Configuración de logging
 LOG_LEVEL = "INFO"
@@ -0,0 +1,99 @@
+"""
+Almacén persistente de características por canción
+
+Guarda en SQLite lo que StyleAnalyzer calcula de cada canción (idioma,
+conteo de palabras de contenido, sentimiento, temas y estructura) bajo una
+clave que combina un hash de la letra limpia y sus secciones con la versión
+del análisis por canción. Un perfil se agrega entonces desde características
+ya calculadas y solo se analizan las canciones nuevas o modificadas, aunque
+la misma canción aparezca en varios perfiles o se recree un perfil.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable
+
+from utils.sqlite import ThreadLocalConnection
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS song_features (
+    key TEXT PRIMARY KEY,
+    features TEXT NOT NULL
+);
+"""
+
+# Claves por consulta (por debajo del límite de parámetros de SQLite)
+_BATCH = 500
+
+
+def lyrics_hash(song: Dict) -> str:
+    """Hash del contenido que determina las características de una canción"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(song['lyrics'].encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(json.dumps(song.get('sections'), ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """Características por canción respaldadas por SQLite, por hash de letra y versión"""
+
+    def __init__(self, db_path: str):
+        """
+        Abre (o crea) el almacén
+
+        Args:
+            db_path: Ruta del archivo SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = ThreadLocalConnection(self.db_path)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conexión de este hilo y proceso (ver utils.sqlite)"""
+        return self._connection.get()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Características guardadas de varias canciones
+
+        Args:
+            keys: Claves (versión y hash de la letra)
+
+        Returns:
+            {clave: características} de las que están guardadas
+        """
+        keys = list(dict.fromkeys(keys))
+        conn = self._connect()
+        found = {}
+        for start in range(0, len(keys), _BATCH):
+            batch = keys[start:start + _BATCH]
+            rows = conn.execute(
+                f"SELECT key, features FROM song_features WHERE key IN ({', '.join('?' * len(batch))})", batch
+            )
+            found.update((key, json.loads(features)) for key, features in rows)
+        return found
+
+    def put_many(self, features: Dict[str, Dict]):
+        """Guarda las características de varias canciones en una transacción"""
+        if not features:
+            return
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO song_features VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in features.items()]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def count(self) -> int:
+        """Canciones con características guardadas"""
+        return self._connect().execute("SELECT COUNT(*) FROM song_features").fetchone()[0]
@@ -0,0 +1,217 @@
+"""
+Detección de idioma y recursos de análisis por idioma
+
+Cada canción se analiza con el tokenizador, las stop words, el léxico de
+sentimiento y las palabras clave de temas de su idioma. Los recursos se
+cargan la primera vez que se piden y quedan en una caché del proceso
+compartida por todos los analizadores e hilos; precargarlos antes de lanzar
+los workers de la cola hace que los procesos hijos los hereden ya cargados.
+"""
+
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from nltk import word_tokenize
+from nltk.corpus import stopwords
+from nltk.sentiment import SentimentIntensityAnalyzer
+from nltk.sentiment.vader import VaderConstants
+
+LEXICONS_DIR = Path(__file__).parent / "lexicons"
+
+# Palabras funcionales frecuentes y exclusivas de cada idioma (para la detección)
+_FUNCTION_WORDS = {
+    'en': {'the', 'and', 'you', 'i', 'to', 'my', 'it', 'that', 'is', 'of', 'your', 'on', 'be', 'for',
+           'with', 'what', 'this', "don't", "i'm", "it's", 'we', 'are', 'was', 'will', 'when', 'just',
+           'know', 'but', 'all', 'got'},
+    'es': {'que', 'de', 'el', 'la', 'y', 'en', 'mi', 'tu', 'te', 'lo', 'los', 'las', 'un', 'una', 'por',
+           'con', 'para', 'es', 'se', 'yo', 'más', 'como', 'pero', 'cuando', 'porque', 'qué', 'estoy',
+           'eres', 'quiero', 'sin', 'ya', 'del', 'al', 'nos', 'soy', 'todo'},
+}
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+# Caracteres leídos para detectar el idioma (las primeras estrofas bastan)
+_DETECTION_CHARS = 3000
+# Aciertos mínimos de palabras funcionales para fiarse de la detección
+_MIN_HITS = 3
+
+_THEME_KEYWORDS = {
+    'en': {
+        'love': ['love', 'heart', 'kiss', 'romance', 'baby', 'darling', 'sweet', 'forever', 'together'],
+        'heartbreak': ['break', 'pain', 'cry', 'tears', 'goodbye', 'alone', 'hurt', 'sad', 'miss'],
+        'party': ['party', 'dance', 'club', 'night', 'music', 'drink', 'fun', 'celebrate', 'tonight'],
+        'success': ['money', 'fame', 'win', 'success', 'top', 'king', 'queen', 'power', 'rich'],
+        'struggle': ['fight', 'struggle', 'hard', 'difficult', 'battle', 'war', 'challenge', 'overcome'],
+        'nature': ['sky', 'sun', 'moon', 'stars', 'rain', 'ocean', 'mountain', 'flower', 'tree'],
+        'urban': ['city', 'street', 'town', 'building', 'lights', 'traffic', 'downtown', 'neighborhood']
+    },
+    'es': {
+        'love': ['amor', 'corazón', 'beso', 'bebé', 'cariño', 'mi vida', 'siempre', 'juntos', 'querer'],
+        'heartbreak': ['dolor', 'llorar', 'lágrimas', 'adiós', 'sola', 'herida', 'triste', 'extraño', 'olvidar'],
+        'party': ['fiesta', 'bailar', 'perreo', 'discoteca', 'noche', 'música', 'tomar', 'gozar', 'rumba'],
+        'success': ['dinero', 'fama', 'ganar', 'éxito', 'rey', 'reina', 'poder', 'rico', 'millones'],
+        'struggle': ['luchar', 'lucha', 'difícil', 'batalla', 'guerra', 'sufrir', 'superar', 'caer'],
+        'nature': ['cielo', 'sol', 'luna', 'estrellas', 'lluvia', 'mar', 'montaña', 'flor', 'árbol'],
+        'urban': ['ciudad', 'calle', 'barrio', 'esquina', 'luces', 'tráfico', 'centro', 'edificio']
+    },
+}
+
+LANGUAGES = {
+    'en': {'name': 'english', 'lexicon': None},
+    'es': {
+        'name': 'spanish',
+        'lexicon': LEXICONS_DIR / "es.tsv",
+        'negations': ['no', 'nunca', 'jamás', 'jamas', 'ni', 'nadie', 'nada', 'tampoco',
+                      'ningún', 'ningun', 'ninguno', 'ninguna', 'sin'],
+        'boosters': {'muy': 0.293, 'tan': 0.293, 'demasiado': 0.293, 'super': 0.293, 'súper': 0.293,
+                     'totalmente': 0.293, 'bastante': 0.293, 'poco': -0.293, 'apenas': -0.293,
+                     'casi': -0.293},
+    },
+}
+
+
+def detect_language(text: str, default: str = 'en') -> str:
+    """
+    Detecta el idioma de una letra por sus palabras funcionales
+
+    Args:
+        text: Letra
+        default: Idioma si no hay señal suficiente
+
+    Returns:
+        Código de idioma de LANGUAGES
+    """
+    hits = dict.fromkeys(_FUNCTION_WORDS, 0)
+    for word in _WORD_RE.findall(text[:_DETECTION_CHARS].lower()):
+        for code, words in _FUNCTION_WORDS.items():
+            if word in words:
+                hits[code] += 1
+    best = max(hits, key=hits.get)
+    return best if hits[best] >= _MIN_HITS else default
+
+
+def keyword_terms(keywords: Dict[str, List[str]]) -> Dict[int, Dict[Tuple[str, ...], List[str]]]:
+    """
+    Agrupa palabras clave por número de palabras ('mi vida' = 2) para count_terms
+
+    Args:
+        keywords: Palabras clave de cada categoría (p. ej. tema)
+
+    Returns:
+        {n: {(palabras): [categorías]}}
+    """
+    terms: Dict[int, Dict[Tuple[str, ...], List[str]]] = {}
+    for category, words in keywords.items():
+        for keyword in words:
+            term = tuple(keyword.split())
+            terms.setdefault(len(term), {}).setdefault(term, []).append(category)
+    return terms
+
+
+def count_terms(words: List[str], terms: Dict[int, Dict[Tuple[str, ...], List[str]]]) -> Dict[str, int]:
+    """
+    Cuenta apariciones de palabras clave por categoría
+
+    Se comparan palabras completas ('mar' no cuenta en 'amarte') y las claves
+    de varias palabras ('mi vida') como n-gramas de palabras.
+
+    Args:
+        words: Palabras de la letra en orden, con stop words (LanguageResources.words)
+        terms: Palabras clave agrupadas con keyword_terms
+
+    Returns:
+        Apariciones por categoría (solo las que aparecen)
+    """
+    scores: Dict[str, int] = {}
+    for size, grams in terms.items():
+        for gram in zip(*(words[i:] for i in range(size))):
+            for category in grams.get(gram, ()):
+                scores[category] = scores.get(category, 0) + 1
+    return scores
+
+
+def _load_lexicon(path: Path) -> Dict[str, float]:
+    """Lee un léxico VADER (palabra<TAB>valencia, se ignoran comentarios)"""
+    lexicon = {}
+    for line in path.read_text(encoding='utf-8').splitlines():
+        if line.strip() and not line.startswith('#'):
+            word, valence = line.split('\t')[:2]
+            lexicon[word.strip()] = float(valence)
+    return lexicon
+
+
+class LexiconSentimentAnalyzer(SentimentIntensityAnalyzer):
+    """VADER con el léxico, las negaciones y los intensificadores de otro idioma"""
+
+    def __init__(self, lexicon: Dict[str, float], negations: Iterable[str] = (),
+                 boosters: Dict[str, float] = None):
+        self.lexicon_file = None
+        self.lexicon = lexicon
+        self.constants = VaderConstants()
+        self.constants.NEGATE = set(negations)
+        self.constants.BOOSTER_DICT = dict(boosters or {})
+
+
+class LanguageResources:
+    """Recursos de análisis de un idioma (se crean una vez por proceso)"""
+
+    def __init__(self, code: str):
+        config = LANGUAGES[code]
+        self.code = code
+        self.name = config['name']
+        self.stop_words = set(stopwords.words(self.name))
+        self.theme_keywords = _THEME_KEYWORDS[code]
+        self.theme_terms = keyword_terms(self.theme_keywords)
+        if config['lexicon'] is None:
+            self.sentiment = SentimentIntensityAnalyzer()
+        else:
+            self.sentiment = LexiconSentimentAnalyzer(
+                _load_lexicon(config['lexicon']), config.get('negations', ()), config.get('boosters')
+            )
+
+    def tokenize(self, text: str) -> List[str]:
+        """Tokeniza con las reglas de puntuación del idioma"""
+        return word_tokenize(text, language=self.name)
+
+    def words(self, text: str) -> List[str]:
+        """Palabras alfabéticas en minúsculas (con stop words)"""
+        return [w for w in self.tokenize(text.lower()) if w.isalpha()]
+
+    def content_words(self, text: str) -> List[str]:
+        """Palabras alfabéticas en minúsculas sin stop words"""
+        return [w for w in self.words(text) if w not in self.stop_words]
+
+
+_resources: Dict[str, LanguageResources] = {}
+_lock = threading.Lock()
+
+
+def get_resources(code: str) -> LanguageResources:
+    """
+    Recursos de un idioma, cargados la primera vez y compartidos en el proceso
+
+    Args:
+        code: Código de idioma (los no soportados usan inglés)
+
+    Returns:
+        LanguageResources del idioma
+    """
+    code = code if code in LANGUAGES else 'en'
+    resources = _resources.get(code)
+    if resources is None:
+        with _lock:
+            resources = _resources.get(code)
+            if resources is None:
+                resources = _resources[code] = LanguageResources(code)
+    return resources
+
+
+def preload_languages(codes: Iterable[str]):
+    """Carga por adelantado los recursos (p. ej. antes de lanzar procesos worker)"""
+    for code in codes:
+        get_resources(code)
+
+
+def loaded_languages() -> List[str]:
+    """Idiomas con recursos ya cargados en este proceso"""
+    return sorted(_resources)
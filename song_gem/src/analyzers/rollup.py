@@ -0,0 +1,98 @@
+"""
+Agregados de vocabulario por género o sello
+
+Combina los resúmenes de vocabulario ('vocabulary_profile.sketches') de
+varios perfiles de estilo sin volver a leer las letras: la unión de
+HyperLogLog da las palabras distintas del grupo y la combinación de
+Space-Saving sus palabras más frecuentes. El coste no depende del tamaño de
+los catálogos, solo del de los resúmenes.
+"""
+
+from datetime import datetime
+from typing import Dict, List
+
+from utils.sketches import HyperLogLog, SpaceSaving
+
+
+def merge_vocabulary_sketches(sketches: List[Dict], top_limit: int = 1000) -> Dict:
+    """
+    Combina resúmenes de vocabulario
+
+    Args:
+        sketches: Resúmenes con el formato de VocabularySketch.summaries
+        top_limit: Palabras más frecuentes a conservar en el resultado
+
+    Returns:
+        Resumen combinado con el mismo formato
+
+    Raises:
+        ValueError: Si la lista está vacía o los HyperLogLog no son compatibles
+    """
+    if not sketches:
+        raise ValueError("No hay resúmenes de vocabulario que combinar")
+
+    distinct = HyperLogLog.from_dict(sketches[0]['distinct'])
+    top_words = SpaceSaving.from_dict(sketches[0]['top_words'])
+    for sketch in sketches[1:]:
+        distinct = distinct.merge(HyperLogLog.from_dict(sketch['distinct']))
+        top_words = top_words.merge(SpaceSaving.from_dict(sketch['top_words']), capacity=top_limit)
+
+    return {
+        'total_words': sum(sketch['total_words'] for sketch in sketches),
+        'distinct': distinct.to_dict(),
+        'top_words': top_words.to_dict(top_limit),
+    }
+
+
+def build_rollup(name: str, profiles: List[Dict], top_limit: int = 1000) -> Dict:
+    """
+    Construye el perfil agregado de un grupo de artistas
+
+    Args:
+        name: Nombre del agregado (género, sello...)
+        profiles: Perfiles de estilo con resúmenes de vocabulario
+        top_limit: Palabras más frecuentes a conservar
+
+    Returns:
+        Agregado con vocabulario combinado, solapamiento y cotas de error
+
+    Raises:
+        ValueError: Si ningún perfil tiene resúmenes de vocabulario
+    """
+    usable = [p for p in profiles if p.get('vocabulary_profile', {}).get('sketches')]
+    skipped = [p.get('artist_name') for p in profiles if not p.get('vocabulary_profile', {}).get('sketches')]
+    if not usable:
+        raise ValueError("Ningún perfil tiene resúmenes de vocabulario (vuelve a analizar los artistas)")
+
+    merged = merge_vocabulary_sketches([p['vocabulary_profile']['sketches'] for p in usable], top_limit)
+    distinct = HyperLogLog.from_dict(merged['distinct'])
+    top_words = SpaceSaving.from_dict(merged['top_words'])
+    unique_words = round(distinct.estimate())
+    artist_unique = {p['artist_name']: p['vocabulary_profile']['unique_words'] for p in usable}
+    # Palabras compartidas respecto al máximo posible: 0 = vocabularios
+    # disjuntos, 1 = todos los artistas usan las mismas palabras
+    shared = sum(artist_unique.values()) - unique_words
+    max_shared = sum(artist_unique.values()) - max(artist_unique.values())
+    overlap = min(1.0, max(0.0, shared / max_shared)) if max_shared else 0.0
+
+    return {
+        'rollup_name': name,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'artists': [p['artist_name'] for p in usable],
+        'skipped_artists': skipped,
+        'total_songs_analyzed': sum(p.get('total_songs_analyzed', 0) for p in usable),
+        'vocabulary_profile': {
+            'total_words': merged['total_words'],
+            'unique_words': unique_words,
+            'vocabulary_richness': unique_words / merged['total_words'] if merged['total_words'] else 0,
+            'most_common_words': [(word, count) for word, count, _ in top_words.top(20)],
+            'artist_unique_words': artist_unique,
+            'vocabulary_overlap': overlap,
+            'sketches': merged,
+        },
+        'accuracy': {
+            'unique_words_relative_std_error': distinct.relative_error,
+            'top_words_max_error': top_words.max_error,
+            'top20_guaranteed': top_words.guaranteed_top(20),
+        },
+    }
@@ -0,0 +1,219 @@
+"""
+Análisis de estilo en streaming con memoria acotada
+
+Alternativa a StyleAnalyzer.generate_style_profile para catálogos muy
+grandes: recorre las canciones una sola vez desde un iterador y solo conserva
+agregados de tamaño fijo, en lugar de la lista de todas las palabras, el texto
+concatenado de todas las letras y las puntuaciones de cada canción.
+"""
+
+from collections import Counter, defaultdict
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from analyzers.vocabulary_sketch import VocabularySketch
+from utils.profiling import span
+from utils.sketches import RunningMoments
+
+# Canciones usadas para el análisis de rima (igual que el análisis exacto)
+RHYME_SAMPLE_SONGS = 5
+# Canciones cuyas características se leen (o calculan y guardan) de una vez
+FEATURE_BATCH = 256
+
+
+class StreamingProfileBuilder:
+    """Construye un perfil de estilo en una pasada con un presupuesto de memoria"""
+
+    def __init__(self, analyzer, memory_budget_mb: float = 32, sketch_precision: int = 12,
+                 sketch_top_words: int = 1000):
+        """
+        Args:
+            analyzer: StyleAnalyzer cuyas características por canción (y su almacén) se reutilizan
+            memory_budget_mb: Presupuesto total de los sketches en MB
+            sketch_precision: Precisión del HyperLogLog de palabras distintas
+            sketch_top_words: Palabras más frecuentes que se guardan en los resúmenes del perfil
+        """
+        self.analyzer = analyzer
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.sketch_top_words = sketch_top_words
+
+        # Vocabulario: conteo exacto mientras quepa; sketches al desbordar
+        self.vocabulary = VocabularySketch(self.memory_budget_bytes, sketch_precision)
+
+        # Sentimiento y temas
+        self.sentiment = {key: RunningMoments() for key in ('compound', 'pos', 'neg', 'neu')}
+        self.sentiment_categories = {'positive': 0, 'negative': 0, 'neutral': 0}
+        self.most_positive = (None, None)
+        self.most_negative = (None, None)
+        self.theme_scores = Counter()
+
+        # Estructura
+        self.structures = Counter()
+        self.section_lengths: Dict[str, RunningMoments] = defaultdict(RunningMoments)
+        self.sectioned_songs = 0
+
+        self.languages = Counter()
+        self.rhyme_sample: List[str] = []
+        self.songs = 0
+
+        # Memoria fuera de los sketches: el lote de canciones en curso y, si
+        # las canciones llegan en una lista, el catálogo entero del llamador
+        self.catalog_in_memory = False
+        self.peak_batch_bytes = 0
+
+    def add_songs(self, songs: List[Dict]):
+        """Incorpora un lote de canciones a los agregados"""
+        for song, features in zip(songs, self.analyzer.song_features(songs)):
+            self.add_song(song, features)
+
+    def add_song(self, song: Dict, features: Dict = None):
+        """Incorpora una canción (con sus características, si ya se tienen) a los agregados"""
+        features = features or self.analyzer.song_features([song])[0]
+        self.songs += 1
+        self.languages[features['language']] += 1
+        self._add_vocabulary(features)
+        self._add_sentiment(song.get('title'), features)
+        self._add_structure(features)
+        if len(self.rhyme_sample) < RHYME_SAMPLE_SONGS:
+            self.rhyme_sample.append(song['lyrics'])
+
+    @span('analyze.stream_vocabulary')
+    def _add_vocabulary(self, features: Dict):
+        # Conteo ya agregado por canción: los estribillos repiten muchas palabras
+        self.vocabulary.add_counts(Counter(features['word_counts']))
+
+    @span('analyze.stream_sentiment')
+    def _add_sentiment(self, title: str, features: Dict):
+        scores = features['sentiment']
+        for key, moments in self.sentiment.items():
+            moments.add(scores[key])
+
+        compound = scores['compound']
+        if compound >= 0.05:
+            self.sentiment_categories['positive'] += 1
+        elif compound <= -0.05:
+            self.sentiment_categories['negative'] += 1
+        else:
+            self.sentiment_categories['neutral'] += 1
+
+        if self.most_positive[1] is None or compound > self.most_positive[1]:
+            self.most_positive = (title, compound)
+        if self.most_negative[1] is None or compound < self.most_negative[1]:
+            self.most_negative = (title, compound)
+
+        self.theme_scores.update(features['themes'])
+
+    @span('analyze.stream_structure')
+    def _add_structure(self, features: Dict):
+        self.structures[features['structure']] += 1
+        self.sectioned_songs += features['has_sections']
+        for kind, kind_lengths in features['section_lengths'].items():
+            moments = self.section_lengths[kind]
+            for length in kind_lengths:
+                moments.add(length)
+
+    def build(self, artist_name: str, songs: Iterable[Dict]) -> Dict:
+        """
+        Consume las canciones y devuelve el perfil de estilo
+
+        Args:
+            artist_name: Nombre del artista
+            songs: Canciones (lista o iterador)
+
+        Returns:
+            Perfil con el formato de StyleAnalyzer.generate_style_profile más
+            'analysis_mode' y 'accuracy_report' (vacío si no hubo canciones)
+        """
+        print(f"Analizando estilo de {artist_name} en streaming "
+              f"(presupuesto {self.memory_budget_bytes / 2 ** 20:.0f} MB)...")
+        self.catalog_in_memory = isinstance(songs, (list, tuple))
+        songs = iter(songs)
+        while True:
+            batch = list(islice(songs, FEATURE_BATCH))
+            if not batch:
+                break
+            batch_bytes = sum(len(song.get('lyrics') or '') for song in batch)
+            self.peak_batch_bytes = max(self.peak_batch_bytes, batch_bytes)
+            self.add_songs(batch)
+
+        if not self.songs:
+            return {}
+
+        vocab_analysis = self.vocabulary.profile()
+        vocab_analysis['sketches'] = self.vocabulary.summaries(self.sketch_top_words)
+        sentiment_analysis = self._sentiment_profile()
+        structure_analysis = self._structure_profile()
+        language_analysis = self.analyzer._language_summary(self.languages)
+        rhyme_analysis = self.analyzer.analyze_rhyme_patterns(
+            "\n".join(self.rhyme_sample), language_analysis['dominant_language']
+        )
+
+        return {
+            'artist_name': artist_name,
+            'analysis_date': str(Path().cwd()),
+            'total_songs_analyzed': self.songs,
+            'vocabulary_profile': vocab_analysis,
+            'sentiment_profile': sentiment_analysis,
+            'structure_profile': structure_analysis,
+            'rhyme_profile': rhyme_analysis,
+            'language_profile': language_analysis,
+            'writing_style_summary': self.analyzer._generate_style_summary(
+                vocab_analysis, sentiment_analysis, structure_analysis
+            ),
+            'analysis_mode': 'streaming',
+            'accuracy_report': self.accuracy_report(),
+        }
+
+    @property
+    def exact_vocabulary(self) -> bool:
+        """Si el vocabulario cupo en el Space-Saving (conteos exactos)"""
+        return self.vocabulary.exact
+
+    def _sentiment_profile(self) -> Dict:
+        total = sum(self.sentiment_categories.values())
+        return {
+            'average_sentiment': {
+                'compound': self.sentiment['compound'].mean,
+                'positive': self.sentiment['pos'].mean,
+                'negative': self.sentiment['neg'].mean,
+                'neutral': self.sentiment['neu'].mean
+            },
+            'sentiment_spread': {key: moments.std for key, moments in self.sentiment.items()},
+            'sentiment_distribution': {
+                k: {'count': v, 'percentage': (v / total) * 100} for k, v in self.sentiment_categories.items()
+            },
+            'dominant_themes': self.analyzer._rank_themes(dict(self.theme_scores)),
+            'emotional_range': {
+                'most_positive': self.most_positive[0],
+                'most_negative': self.most_negative[0]
+            }
+        }
+
+    def _structure_profile(self) -> Dict:
+        return self.analyzer._structure_summary(
+            self.structures,
+            {kind: moments.mean for kind, moments in self.section_lengths.items() if moments.count},
+            Counter({kind: moments.count for kind, moments in self.section_lengths.items()}),
+            self.sectioned_songs,
+            self.songs
+        )
+
+    def memory_bytes(self) -> int:
+        """Memoria aproximada usada por los agregados de vocabulario"""
+        return self.vocabulary.memory_bytes
+
+    def accuracy_report(self) -> Dict:
+        """Cotas de error de cada estadística aproximada"""
+        report = {
+            'songs': self.songs,
+            'memory_budget_bytes': self.memory_budget_bytes,
+            'sketch_memory_bytes': self.memory_bytes(),
+            # Lo que no acota el presupuesto: un lote de FEATURE_BATCH letras y,
+            # con una lista de entrada, todas las canciones del catálogo
+            'batch_songs': FEATURE_BATCH,
+            'peak_batch_lyrics_bytes': self.peak_batch_bytes,
+            'catalog_in_memory': self.catalog_in_memory,
+        }
+        report.update(self.vocabulary.accuracy())
+        return report
@@ -1,40 +1,166 @@
 import re
 import nltk
-from nltk import word_tokenize, sent_tokenize
-from nltk.corpus import stopwords
-from nltk.sentiment import SentimentIntensityAnalyzer
 from textblob import TextBlob
 from collections import Counter, defaultdict
 import json
-from typing import List, Dict, Tuple, Optional
+import os
+import tempfile
+from typing import Iterable, List, Dict, Tuple, Optional
 from pathlib import Path
-import spacy
 
-# Cargar modelos de lenguaje
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Descargando modelo de spaCy...")
-    import subprocess
-    subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+import numpy as np
+
+from analyzers.feature_store import FeatureStore, lyrics_hash
+from analyzers.languages import LanguageResources, count_terms, detect_language, get_resources
+from analyzers.streaming_analyzer import StreamingProfileBuilder
+from analyzers.token_corpus import TokenCorpus
+from analyzers.vocabulary_sketch import VocabularySketch, summaries_from_counts
+from utils.lyrics_sections import normalize_sections, section_kind
+from utils.metrics import METRICS
+from utils.profiling import span
+from utils.repetition import analyze_repetition, split_by_chorus
+
+# Versión del análisis por canción (song_features): incrementarla al cambiar
+# cómo se tokeniza, puntúa o estructura una canción invalida las
+# características guardadas; los cambios solo en la agregación no la tocan
+FEATURES_VERSION = 2
+# Versión de la agregación en perfiles: incrementarla al cambiar cómo se
+# combinan las características hace que --rebuild-profiles rehaga todos
+PROFILE_VERSION = 2
+# Peso del prior (fracción de los conteos de todo el corpus) en las palabras distintivas
+CORPUS_PRIOR_WEIGHT = 0.01
+# Apariciones mínimas en el artista para considerar una palabra distintiva
+MIN_DISTINCTIVE_COUNT = 3
 
 class StyleAnalyzer:
     """Analiza el estilo lírico de un artista basado en sus canciones"""
     
-    def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        self.sia = SentimentIntensityAnalyzer()
+    def __init__(self, approximate: bool = False, memory_budget_mb: float = 32,
+                 sketch_precision: int = 12, sketch_top_words: int = 1000,
+                 default_language: str = 'en', feature_store: FeatureStore = None):
+        """
+        Los recursos de cada idioma (stop words, léxico de sentimiento,
+        temas) se cargan al analizar la primera canción en ese idioma.
+        
+        Args:
+            approximate: Si True, el vocabulario se cuenta con sketches de memoria
+                acotada (HyperLogLog y Space-Saving) en lugar de conteos exactos
+            memory_budget_mb: Presupuesto de los sketches de vocabulario
+            sketch_precision: Precisión del HyperLogLog de palabras distintas
+            sketch_top_words: Palabras más frecuentes guardadas en los resúmenes del perfil
+            default_language: Idioma de las letras sin señal suficiente para detectarlo
+            feature_store: Almacén de características por canción; sin él se
+                calculan siempre
+        """
+        self.default_language = default_language
+        self.approximate = approximate
+        self.memory_budget_mb = memory_budget_mb
+        self.sketch_precision = sketch_precision
+        self.sketch_top_words = sketch_top_words
+        self.feature_store = feature_store
+    
+    @property
+    def features_version(self) -> str:
+        """Prefijo de las claves de características (versión e idioma por defecto)"""
+        return f"v{FEATURES_VERSION}:{self.default_language}:"
+    
+    @property
+    def stop_words(self) -> set:
+        """Stop words del idioma por defecto"""
+        return get_resources(self.default_language).stop_words
+    
+    @property
+    def sia(self):
+        """Analizador de sentimiento del idioma por defecto"""
+        return get_resources(self.default_language).sentiment
+    
+    def song_language(self, song: Dict) -> str:
+        """Idioma de una canción (se detecta una vez y se guarda en 'language')"""
+        language = song.get('language')
+        if not language:
+            language = song['language'] = detect_language(song['lyrics'], self.default_language)
+        return language
+    
+    def _resources(self, song: Dict) -> LanguageResources:
+        """Recursos de análisis del idioma de una canción"""
+        return get_resources(self.song_language(song))
+    
+    def analyze_languages(self, songs: List[Dict], features: List[Dict] = None) -> Dict:
+        """Mezcla de idiomas del catálogo"""
+        features = features or self.song_features(songs)
+        return self._language_summary(Counter(song_features['language'] for song_features in features))
+    
+    @staticmethod
+    def _language_summary(counts: Counter) -> Dict:
+        """Perfil de idiomas a partir del conteo por idioma"""
+        total = sum(counts.values())
+        return {
+            'dominant_language': counts.most_common(1)[0][0] if counts else None,
+            'languages': {
+                code: {'count': count, 'percentage': (count / total) * 100}
+                for code, count in counts.most_common()
+            }
+        }
+    
+    def song_features(self, songs: List[Dict]) -> List[Dict]:
+        """
+        Características de cada canción, del almacén o calculadas
+        
+        Solo se calculan (y se guardan) las que faltan en el almacén. El
+        idioma se copia además a la canción, como hace song_language.
+        
+        Returns:
+            Por canción: language, word_counts, sentiment, themes, structure,
+            section_lengths y has_sections
+        """
+        keys = [self.features_version + lyrics_hash(song) for song in songs] if self.feature_store else []
+        with span('analyze.features_load'):
+            stored = self.feature_store.get_many(keys) if self.feature_store else {}
+        
+        features, computed = [], {}
+        with span('analyze.features'):
+            for index, song in enumerate(songs):
+                key = keys[index] if keys else None
+                song_features = stored.get(key) or computed.get(key)
+                if song_features is None:
+                    song_features = self._compute_features(song)
+                    if key:
+                        computed[key] = song_features
+                song.setdefault('language', song_features['language'])
+                features.append(song_features)
+        
+        if self.feature_store:
+            self.feature_store.put_many(computed)
+            METRICS.inc('song_features_total', len(songs) - len(computed), labels={'result': 'hit'})
+            METRICS.inc('song_features_total', len(computed), labels={'result': 'miss'})
+        return features
+    
+    def _compute_features(self, song: Dict) -> Dict:
+        """Análisis de una canción que no depende del resto del catálogo"""
+        lyrics = song['lyrics']
+        resources = self._resources(song)
+        structure, lengths, has_sections = self._song_structure(song)
+        words = resources.words(lyrics)
+        return {
+            'language': resources.code,
+            'word_counts': dict(Counter(w for w in words if w not in resources.stop_words)),
+            'sentiment': resources.sentiment.polarity_scores(lyrics),
+            'themes': self._theme_scores(words, resources.code),
+            'structure': structure,
+            'section_lengths': dict(lengths),
+            'has_sections': has_sections,
+        }
     
-    def analyze_rhyme_patterns(self, lyrics: str) -> Dict:
-        """Analiza patrones de rima en las letras"""
+    @span('analyze.rhyme')
+    def analyze_rhyme_patterns(self, lyrics: str, language: str = None) -> Dict:
+        """Analiza patrones de rima en las letras (idioma detectado si no se indica)"""
+        resources = get_resources(language or detect_language(lyrics, self.default_language))
         lines = [line.strip() for line in lyrics.split('\n') if line.strip()]
         rhymes = defaultdict(list)
         
         for i, line in enumerate(lines):
-            words = word_tokenize(line.lower())
             # Obtener la última palabra de cada línea que no sea stop word
-            last_words = [w for w in words if w.isalpha() and w not in self.stop_words]
+            last_words = resources.content_words(line)
             
             if last_words:
                 last_word = last_words[-1]
@@ -80,45 +206,115 @@ class StyleAnalyzer:
         scheme_counts = Counter(schemes)
         return [f"{scheme} ({count} veces)" for scheme, count in scheme_counts.most_common()]
     
-    def analyze_vocabulary(self, songs: List[Dict]) -> Dict:
-        """Analiza el vocabulario del artista"""
-        all_words = []
-        all_unique_words = set()
-        
-        for song in songs:
-            words = word_tokenize(song['lyrics'].lower())
-            words = [w for w in words if w.isalpha() and w not in self.stop_words]
-            all_words.extend(words)
-            all_unique_words.update(words)
-        
-        word_freq = Counter(all_words)
+    @span('analyze.vocabulary')
+    def analyze_vocabulary(self, songs: List[Dict], features: List[Dict] = None) -> Dict:
+        """
+        Analiza el vocabulario del artista
+        
+        Incluye en 'sketches' los resúmenes combinables (HyperLogLog de
+        palabras distintas y top de palabras) usados en los agregados por
+        género o sello.
+        
+        Args:
+            songs: Canciones del artista
+            features: Sus características (song_features), si ya se tienen
+        """
+        features = features or self.song_features(songs)
+        if self.approximate:
+            return self._analyze_vocabulary_approximate(features)
+        
+        # Suma en orden de canciones: mismo orden de aparición que contar la lista de palabras
+        word_freq = Counter()
+        for song_features in features:
+            word_freq.update(song_features['word_counts'])
+        total_words = sum(word_freq.values())
         
         # Analizar complejidad del vocabulario
-        avg_word_length = sum(len(word) for word in all_unique_words) / len(all_unique_words)
+        avg_word_length = sum(len(word) for word in word_freq) / len(word_freq)
         rare_words = [word for word, freq in word_freq.items() if freq == 1]
         
         return {
-            'total_words': len(all_words),
-            'unique_words': len(all_unique_words),
-            'vocabulary_richness': len(all_unique_words) / len(all_words),
+            'total_words': total_words,
+            'unique_words': len(word_freq),
+            'vocabulary_richness': len(word_freq) / total_words,
             'most_common_words': word_freq.most_common(20),
             'avg_word_length': avg_word_length,
             'rare_words_count': len(rare_words),
-            'rare_words_sample': rare_words[:20]
+            'rare_words_sample': rare_words[:20],
+            'sketches': summaries_from_counts(word_freq, self.sketch_precision, self.sketch_top_words)
         }
     
-    def analyze_sentiment_and_themes(self, songs: List[Dict]) -> Dict:
-        """Analiza sentimientos y temas recurrentes"""
-        sentiments = []
-        all_lyrics = ""
-        
-        for song in songs:
-            lyrics = song['lyrics']
-            all_lyrics += lyrics + " "
+    def _analyze_vocabulary_approximate(self, features: List[Dict]) -> Dict:
+        """Vocabulario con memoria acotada; añade 'accuracy' con las cotas de error"""
+        sketch = VocabularySketch(int(self.memory_budget_mb * 1024 * 1024), self.sketch_precision)
+        for song_features in features:
+            sketch.add_counts(Counter(song_features['word_counts']))
+        
+        vocabulary = sketch.profile()
+        vocabulary['sketches'] = sketch.summaries(self.sketch_top_words)
+        vocabulary['accuracy'] = sketch.accuracy()
+        return vocabulary
+    
+    @span('analyze.corpus_vocabulary')
+    def analyze_corpus_vocabulary(self, corpus: TokenCorpus, artist_key: str, language: str = None,
+                                  top: int = 20) -> Dict:
+        """
+        Palabras que distinguen al artista del resto de la caché
+        
+        Compara los conteos del artista con los del resto del corpus
+        compilado (log-odds con prior de Dirichlet informativo, Monroe et
+        al. 2008). Los conteos salen de np.bincount sobre vistas del corpus
+        mapeado en memoria, sin releer ni tokenizar letras.
+        
+        Args:
+            corpus: Corpus compilado de la caché de letras
+            artist_key: Artista en el corpus (nombre de su JSON en la caché, sin extensión)
+            language: Idioma de las stop words que se excluyen (por defecto, el del analizador)
+            top: Palabras a devolver
             
-            # Análisis de sentimiento con NLTK
-            sentiment_scores = self.sia.polarity_scores(lyrics)
-            sentiments.append(sentiment_scores)
+        Returns:
+            distinctive_words [(palabra, z-score)], corpus_share (fracción de los
+            tokens del corpus) y corpus_artists; vacío si el artista no está
+        """
+        counts = corpus.word_counts(artist_key)
+        if counts is None or not counts.any():
+            return {}
+        totals = corpus.word_counts()
+        vocabulary = corpus.vocabulary()
+        stop_words = get_resources(language or self.default_language).stop_words
+        
+        artist, rest = counts.astype(np.float64), (totals - counts).astype(np.float64)
+        prior = CORPUS_PRIOR_WEIGHT * totals + 1e-9
+        artist_total, rest_total, prior_total = artist.sum(), rest.sum(), prior.sum()
+        log_odds = (np.log((artist + prior) / (artist_total + prior_total - artist - prior))
+                    - np.log((rest + prior) / (rest_total + prior_total - rest - prior)))
+        z_scores = log_odds / np.sqrt(1 / (artist + prior) + 1 / (rest + prior))
+        
+        eligible = (counts >= MIN_DISTINCTIVE_COUNT) & ~np.fromiter(
+            (word in stop_words for word in vocabulary), dtype=bool, count=len(vocabulary)
+        )
+        distinctive = []
+        if rest_total:
+            candidates = np.flatnonzero(eligible)
+            for token_id in candidates[np.argsort(-z_scores[candidates], kind='stable')][:top]:
+                if z_scores[token_id] <= 0:
+                    break
+                distinctive.append((vocabulary[token_id], round(float(z_scores[token_id]), 2)))
+        
+        return {
+            'distinctive_words': distinctive,
+            'corpus_share': float(artist_total / totals.sum()),
+            'corpus_artists': len(corpus.artists()),
+        }
+    
+    @span('analyze.sentiment_themes')
+    def analyze_sentiment_and_themes(self, songs: List[Dict], features: List[Dict] = None) -> Dict:
+        """Analiza sentimientos y temas recurrentes (con los recursos del idioma de cada canción)"""
+        features = features or self.song_features(songs)
+        sentiments = [song_features['sentiment'] for song_features in features]
+        theme_scores = Counter()
+        for song_features in features:
+            theme_scores.update(song_features['themes'])
         
         # Sentimiento promedio
         avg_sentiment = {
@@ -128,41 +324,32 @@ class StyleAnalyzer:
             'neutral': sum(s['neu'] for s in sentiments) / len(sentiments)
         }
         
-        # Detectar temas usando análisis de palabras clave
-        themes = self._detect_themes(all_lyrics)
-        
+        compounds = [s['compound'] for s in sentiments]
         return {
             'average_sentiment': avg_sentiment,
             'sentiment_distribution': self._categorize_sentiments(sentiments),
-            'dominant_themes': themes,
+            'dominant_themes': self._rank_themes(dict(theme_scores)),
             'emotional_range': {
-                'most_positive': max(songs, key=lambda x: self.sia.polarity_scores(x['lyrics'])['compound'])['title'],
-                'most_negative': min(songs, key=lambda x: self.sia.polarity_scores(x['lyrics'])['compound'])['title']
+                'most_positive': songs[compounds.index(max(compounds))]['title'],
+                'most_negative': songs[compounds.index(min(compounds))]['title']
             }
         }
     
-    def _detect_themes(self, lyrics: str) -> List[Dict]:
-        """Detecta temas recurrentes en las letras"""
-        # Palabras clave por tema
-        theme_keywords = {
-            'love': ['love', 'heart', 'kiss', 'romance', 'baby', 'darling', 'sweet', 'forever', 'together'],
-            'heartbreak': ['break', 'pain', 'cry', 'tears', 'goodbye', 'alone', 'hurt', 'sad', 'miss'],
-            'party': ['party', 'dance', 'club', 'night', 'music', 'drink', 'fun', 'celebrate', 'tonight'],
-            'success': ['money', 'fame', 'win', 'success', 'top', 'king', 'queen', 'power', 'rich'],
-            'struggle': ['fight', 'struggle', 'hard', 'difficult', 'battle', 'war', 'challenge', 'overcome'],
-            'nature': ['sky', 'sun', 'moon', 'stars', 'rain', 'ocean', 'mountain', 'flower', 'tree'],
-            'urban': ['city', 'street', 'town', 'building', 'lights', 'traffic', 'downtown', 'neighborhood']
-        }
-        
-        lyrics_lower = lyrics.lower()
-        theme_scores = {}
-        
-        for theme, keywords in theme_keywords.items():
-            score = sum(lyrics_lower.count(keyword) for keyword in keywords)
-            if score > 0:
-                theme_scores[theme] = score
-        
-        # Normalizar y ordenar por relevancia
+    def _theme_scores(self, words: List[str], language: str = 'en') -> Dict[str, int]:
+        """
+        Cuenta apariciones de palabras clave por tema (sumable entre canciones)
+        
+        Se comparan palabras completas ('mar' no cuenta en 'amarte') y las
+        claves de varias palabras ('mi vida') como n-gramas de palabras.
+        
+        Args:
+            words: Palabras de la letra en orden, con stop words (LanguageResources.words)
+            language: Código de idioma de las palabras clave
+        """
+        return count_terms(words, get_resources(language).theme_terms)
+    
+    def _rank_themes(self, theme_scores: Dict[str, int]) -> List[Dict]:
+        """Normaliza y ordena los temas por relevancia"""
         total_themes = sum(theme_scores.values()) if theme_scores else 1
         sorted_themes = sorted(theme_scores.items(), key=lambda x: x[1], reverse=True)
         
@@ -185,83 +372,111 @@ class StyleAnalyzer:
         total = sum(categories.values())
         return {k: {'count': v, 'percentage': (v/total)*100} for k, v in categories.items()}
     
-    def analyze_structure_patterns(self, songs: List[Dict]) -> Dict:
-        """Analiza patrones estructurales de las canciones"""
-        structures = []
-        verse_lengths = []
-        chorus_lengths = []
-        
-        for song in songs:
-            lyrics = song['lyrics']
-            structure = self._detect_song_structure(lyrics)
-            structures.append(structure)
-            
-            # Analizar longitudes de versos y coros
-            verse_lens, chorus_lens = self._analyze_section_lengths(lyrics)
-            verse_lengths.extend(verse_lens)
-            chorus_lengths.extend(chorus_lens)
-        
-        # Contar estructuras más comunes
-        structure_counts = Counter(structures)
-        
+    @span('analyze.structure')
+    def analyze_structure_patterns(self, songs: List[Dict], features: List[Dict] = None) -> Dict:
+        """
+        Analiza patrones estructurales de las canciones
+        
+        Usa las secciones etiquetadas del scraper ('sections') cuando existen;
+        las canciones cacheadas sin ellas usan las heurísticas sobre el texto.
+        """
+        features = features or self.song_features(songs)
+        structures = Counter()
+        section_lengths = defaultdict(list)
+        section_counts = Counter()
+        sectioned = 0
+        
+        for song_features in features:
+            structures[song_features['structure']] += 1
+            sectioned += song_features['has_sections']
+            for kind, kind_lengths in song_features['section_lengths'].items():
+                section_lengths[kind].extend(kind_lengths)
+                section_counts[kind] += len(kind_lengths)
+        
+        return self._structure_summary(
+            structures,
+            {kind: sum(lens) / len(lens) for kind, lens in section_lengths.items() if lens},
+            section_counts,
+            sectioned,
+            len(songs)
+        )
+    
+    def _song_structure(self, song: Dict) -> Tuple[str, Dict[str, List[int]], bool]:
+        """
+        Orden de secciones y longitudes (en líneas) por tipo de una canción
+        
+        Returns:
+            (estructura, {tipo: [longitudes]}, si vino con secciones etiquetadas)
+        """
+        sections = normalize_sections(song.get('sections'))
+        if not sections:
+            structure, verse_lens, chorus_lens = self._repetition_structure(song['lyrics'])
+            return structure, {'Verse': verse_lens, 'Chorus': chorus_lens}, False
+        
+        order = []
+        lengths = defaultdict(list)
+        for label, lines in sections:
+            kind = section_kind(label)
+            order.append(kind)
+            lengths[kind].append(len(lines))
+        return '-'.join(order), lengths, True
+    
+    @staticmethod
+    def _structure_summary(structures: Counter, avg_lengths: Dict[str, float],
+                           section_counts: Counter, sectioned: int, total_songs: int) -> Dict:
+        """Perfil de estructura a partir de los agregados (común al análisis exacto y en streaming)"""
         return {
-            'common_structures': [{'structure': s, 'frequency': f} for s, f in structure_counts.most_common(5)],
-            'avg_verse_length': sum(verse_lengths) / len(verse_lengths) if verse_lengths else 0,
-            'avg_chorus_length': sum(chorus_lengths) / len(chorus_lengths) if chorus_lengths else 0,
-            'structure_diversity': len(structure_counts) / len(songs) if songs else 0
+            'common_structures': [{'structure': s, 'frequency': f} for s, f in structures.most_common(5)],
+            'avg_verse_length': avg_lengths.get('Verse', 0),
+            'avg_chorus_length': avg_lengths.get('Chorus', 0),
+            'avg_bridge_length': avg_lengths.get('Bridge', 0),
+            'section_lengths': avg_lengths,
+            'sections_per_song': {kind: count / total_songs for kind, count in section_counts.most_common() if count},
+            'songs_with_sections': sectioned,
+            'structure_diversity': len(structures) / total_songs if total_songs else 0
         }
     
-    def _detect_song_structure(self, lyrics: str) -> str:
-        """Detecta la estructura básica de una canción"""
-        lines = lyrics.split('\n')
-        has_chorus = any(line.strip() for line in lines if self._is_chorus_line(line))
-        has_bridge = any('bridge' in line.lower() for line in lines)
-        has_hook = any('hook' in line.lower() for line in lines)
-        
-        # Simplificación: detectar repeticiones para identificar coros
-        line_counts = Counter(line.strip() for line in lines if line.strip())
-        has_repetitions = any(count > 1 for count in line_counts.values())
-        
-        if has_repetitions:
-            return "Verse-Chorus"
-        elif has_bridge:
-            return "Verse-Bridge"
+    def _repetition_structure(self, lyrics: str) -> Tuple[str, List[int], List[int]]:
+        """
+        Estructura y longitudes de versos y coros a partir de las repeticiones
+        
+        Para letras sin secciones etiquetadas: el bloque de varias líneas que
+        más se repite es el coro y los tramos entre sus apariciones, versos.
+        
+        Returns:
+            (estructura, longitudes de versos, longitudes de coros)
+        """
+        repetition = analyze_repetition(lyrics.split('\n'))
+        verses, choruses = split_by_chorus(repetition['total_lines'], repetition['chorus'])
+        
+        if repetition['chorus']:
+            structure = "Verse-Chorus"
+        elif repetition['hooks']:
+            structure = "Verse-Hook"
         else:
-            return "Verse-Only"
-    
-    def _is_chorus_line(self, line: str) -> bool:
-        """Determina si una línea podría ser parte de un coro (heurística simple)"""
-        # Coros suelen tener características específicas
-        if not line.strip():
-            return False
-        
-        words = word_tokenize(line.lower())
-        # Coros suelen ser más cortos y repetitivos
-        return len(words) >= 4 and len(words) <= 12
+            structure = "Verse-Only"
+        return structure, verses, choruses
     
-    def _analyze_section_lengths(self, lyrics: str) -> Tuple[List[int], List[int]]:
-        """Analiza las longitudes de secciones de la canción"""
-        lines = [line.strip() for line in lyrics.split('\n') if line.strip()]
-        
-        # Simplificación: dividir en secciones basadas en líneas vacías
-        sections = []
-        current_section = []
-        
-        for line in lines:
-            if not line and current_section:
-                sections.append(len(current_section))
-                current_section = []
-            else:
-                current_section.append(line)
-        
-        if current_section:
-            sections.append(len(current_section))
-        
-        # Heurística simple: secciones impares = versos, pares = coros
-        verses = sections[::2]
-        choruses = sections[1::2]
-        
-        return verses, choruses
+    def generate_style_profile_streaming(self, artist_name: str, songs: Iterable[Dict],
+                                         memory_budget_mb: float = 32) -> Dict:
+        """
+        Genera el perfil en una sola pasada con memoria acotada
+        
+        Consume las canciones de un iterador y solo mantiene agregados
+        (sketches de frecuencia, momentos de sentimiento, conteos de
+        estructura). El perfil incluye un 'accuracy_report' con las cotas
+        de error de cada estimación.
+        
+        Args:
+            artist_name: Nombre del artista
+            songs: Canciones (lista o iterador)
+            memory_budget_mb: Presupuesto de memoria para los sketches
+            
+        Returns:
+            Perfil de estilo con el mismo formato que generate_style_profile
+        """
+        builder = StreamingProfileBuilder(self, memory_budget_mb, self.sketch_precision, self.sketch_top_words)
+        return builder.build(artist_name, songs)
     
     def generate_style_profile(self, artist_name: str, songs: List[Dict]) -> Dict:
         """Genera un perfil completo del estilo del artista"""
@@ -270,14 +485,17 @@ class StyleAnalyzer:
         
         print(f"Analizando estilo de {artist_name} con {len(songs)} canciones...")
         
-        # Análisis completos
-        vocab_analysis = self.analyze_vocabulary(songs)
-        sentiment_analysis = self.analyze_sentiment_and_themes(songs)
-        structure_analysis = self.analyze_structure_patterns(songs)
+        # Análisis por canción (del almacén de características si lo hay) y agregados
+        features = self.song_features(songs)
+        vocab_analysis = self.analyze_vocabulary(songs, features)
+        sentiment_analysis = self.analyze_sentiment_and_themes(songs, features)
+        structure_analysis = self.analyze_structure_patterns(songs, features)
+        
+        language_analysis = self.analyze_languages(songs, features)
         
         # Análisis de rima (muestra para no sobrecargar)
         sample_lyrics = "\n".join(song['lyrics'] for song in songs[:5])
-        rhyme_analysis = self.analyze_rhyme_patterns(sample_lyrics)
+        rhyme_analysis = self.analyze_rhyme_patterns(sample_lyrics, language_analysis['dominant_language'])
         
         # Crear perfil de estilo
         style_profile = {
@@ -288,10 +506,13 @@ class StyleAnalyzer:
             'sentiment_profile': sentiment_analysis,
             'structure_profile': structure_analysis,
             'rhyme_profile': rhyme_analysis,
+            'language_profile': language_analysis,
             'writing_style_summary': self._generate_style_summary(
                 vocab_analysis, sentiment_analysis, structure_analysis
             )
         }
+        if self.approximate:
+            style_profile['analysis_mode'] = 'approximate'
         
         return style_profile
     
@@ -326,10 +547,23 @@ class StyleAnalyzer:
         
         return "El artista presenta un estilo con " + ", ".join(summary_parts) + "."
     
+    def analyzer_version(self, mode: str, memory_budget_mb: float) -> str:
+        """Versión de todo lo que, además de las letras, determina un perfil"""
+        return f"f{FEATURES_VERSION}.p{PROFILE_VERSION}:{self.default_language}:{mode}:{memory_budget_mb:g}"
+    
     def save_style_profile(self, profile: Dict, output_path: str):
-        """Guarda el perfil de estilo en un archivo JSON"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(profile, f, ensure_ascii=False, indent=2)
+        """Guarda el perfil de estilo en un archivo JSON (escritura atómica)"""
+        # Un temporal por escritura: hilos del servidor y workers distintos
+        # pueden guardar el mismo perfil a la vez
+        output_path = Path(output_path)
+        fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=output_path.name + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(profile, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
     
     def load_style_profile(self, profile_path: str) -> Optional[Dict]:
         """Carga un perfil de estilo desde un archivo"""
@@ -0,0 +1,479 @@
+"""
+Corpus compilado de la caché de letras (vocabulario global e IDs de tokens)
+
+Las letras de toda la caché se tokenizan una sola vez a IDs de un
+vocabulario global y se guardan en arrays planos de NumPy que se leen
+mapeados en memoria: los análisis entre artistas cortan vistas de esos
+arrays (sin copiarlos ni volver a leer JSON) y cuentan con np.bincount, y
+la verificación de originalidad busca n-gramas en un índice ordenado. La
+compilación es incremental: solo se tokenizan los JSON de la caché nuevos
+o modificados, que se añaden al final; los rangos que quedan obsoletos se
+descartan al compactar.
+
+Archivos del directorio del corpus (el número cambia al reescribirlos):
+    manifest.json   longitudes, archivos vigentes y canciones de cada artista
+    vocab.N.txt     un token por línea; su ID es el número de línea (0 = desconocido)
+    tokens.N.u32    IDs de los tokens, canción tras canción y línea tras línea
+    lines.N.i64     posición en tokens del inicio de cada línea
+    songs.N.i64     primera línea de cada canción
+    ngrams.N.u64    hashes (ordenados y sin repetir) de los n-gramas de NGRAM_SIZE tokens
+"""
+
+import fcntl
+import json
+import os
+import re
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Versión del formato y de la tokenización: al cambiarla se recompila todo
+CORPUS_VERSION = 1
+# Tokens por n-grama del índice de originalidad
+NGRAM_SIZE = 5
+# ID de los tokens que no están en el vocabulario (al codificar textos nuevos)
+UNKNOWN = 0
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+# Base del hash polinómico de los n-gramas (módulo 2^64)
+_HASH_BASE = np.uint64(0x100000001B3)
+# Se compacta cuando los tokens obsoletos superan a los vigentes
+_MAX_DEAD_RATIO = 1.0
+
+_KINDS = {
+    'tokens': (np.uint32, 'u32'),
+    'lines': (np.int64, 'i64'),
+    'songs': (np.int64, 'i64'),
+    'ngrams': (np.uint64, 'u64'),
+}
+
+
+def tokenize_line(line: str) -> List[str]:
+    """Palabras en minúsculas de una línea (la misma regla para todos los idiomas)"""
+    return _WORD_RE.findall(line.lower())
+
+
+def ngram_hashes(tokens: np.ndarray, line_starts: np.ndarray, n: int = NGRAM_SIZE) -> np.ndarray:
+    """
+    Hashes de los n-gramas que no cruzan líneas ni contienen tokens desconocidos
+
+    Args:
+        tokens: IDs de tokens
+        line_starts: Inicio de cada línea, relativo a tokens
+        n: Tokens por n-grama
+
+    Returns:
+        Hashes uint64, en orden y con repeticiones
+    """
+    count = len(tokens) - n + 1
+    if count <= 0 or not len(line_starts):
+        return np.empty(0, np.uint64)
+    values = np.asarray(tokens, dtype=np.uint64)
+    hashes = np.zeros(count, np.uint64)
+    for k in range(n):
+        hashes = hashes * _HASH_BASE + values[k:k + count]
+
+    # El n-grama que empieza en cada posición debe caber en su línea
+    line_ends = np.append(line_starts[1:], len(tokens))
+    line_of = np.repeat(np.arange(len(line_starts)), line_ends - line_starts)[:count]
+    valid = line_ends[line_of] - np.arange(count) >= n
+    unknown = values == UNKNOWN
+    if unknown.any():
+        valid &= np.convolve(unknown, np.ones(n, dtype=bool), 'valid') == 0
+    return hashes[valid]
+
+
+def _empty_manifest(serial: int = 0, generation: int = 0) -> Dict:
+    return {
+        'version': CORPUS_VERSION,
+        'serial': serial,
+        'generation': generation,
+        'files': {},
+        'vocab_size': 1,
+        'vocab_bytes': 1,
+        'tokens': 0,
+        'lines': 0,
+        'songs': 0,
+        'ngrams': 0,
+        'artists': {},
+        'dead': [],
+    }
+
+
+class _Snapshot:
+    """Una versión del corpus: manifest y arrays mapeados (inmutable salvo cachés)"""
+
+    def __init__(self, directory: Path, manifest: Dict):
+        self.manifest = manifest
+        self.arrays = {kind: self._map(directory, kind) for kind in _KINDS}
+        self.vocab_path = directory / manifest['files']['vocab'] if 'vocab' in manifest['files'] else None
+        self.vocabulary: Optional[List[str]] = None
+        self.index: Optional[Dict[str, int]] = None
+        self.totals: Optional[np.ndarray] = None
+
+    def _map(self, directory: Path, kind: str) -> np.ndarray:
+        dtype, _ = _KINDS[kind]
+        length = self.manifest[kind]
+        if not length:
+            return np.empty(0, dtype)
+        return np.memmap(directory / self.manifest['files'][kind], dtype=dtype, mode='r', shape=(length,))
+
+    def line_start(self, line: int) -> int:
+        """Posición en tokens de una línea (o el final del corpus)"""
+        return self.manifest['tokens'] if line == self.manifest['lines'] else int(self.arrays['lines'][line])
+
+    def song_start(self, song: int) -> int:
+        """Primera línea de una canción (o el final del corpus)"""
+        return self.manifest['lines'] if song == self.manifest['songs'] else int(self.arrays['songs'][song])
+
+    def span(self, first_song: int, end_song: int) -> Tuple[np.ndarray, np.ndarray, int, int]:
+        """
+        Vistas (sin copia) de un rango de canciones
+
+        Returns:
+            (tokens, inicio absoluto de cada línea, primera línea, primer token)
+        """
+        first_line, end_line = self.song_start(first_song), self.song_start(end_song)
+        first_token, end_token = self.line_start(first_line), self.line_start(end_line)
+        return (self.arrays['tokens'][first_token:end_token], self.arrays['lines'][first_line:end_line],
+                first_line, first_token)
+
+    def span_tokens(self, songs: List[int]) -> int:
+        first, end = songs
+        return self.line_start(self.song_start(end)) - self.line_start(self.song_start(first))
+
+    def span_lines(self, songs: List[int]) -> int:
+        first, end = songs
+        return self.song_start(end) - self.song_start(first)
+
+    def load_vocabulary(self) -> List[str]:
+        if self.vocabulary is None:
+            if self.vocab_path is None:
+                self.vocabulary = ['']
+            else:
+                with open(self.vocab_path, 'rb') as f:
+                    data = f.read(self.manifest['vocab_bytes'])
+                self.vocabulary = data.decode('utf-8').split('\n')[:self.manifest['vocab_size']]
+        return self.vocabulary
+
+    def load_index(self) -> Dict[str, int]:
+        if self.index is None:
+            self.index = {word: token_id for token_id, word in enumerate(self.load_vocabulary())}
+        return self.index
+
+
+class TokenCorpus:
+    """Corpus de IDs de tokens de la caché de letras, mapeado en memoria"""
+
+    def __init__(self, directory: str):
+        """
+        Abre el corpus (vacío hasta la primera compilación con update)
+
+        Args:
+            directory: Directorio del corpus
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._manifest_path = self.directory / 'manifest.json'
+        self._stat = None
+        self._snapshot = None
+        self._snapshot_now()
+
+    def _read_manifest(self) -> Dict:
+        try:
+            manifest = json.loads(self._manifest_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return _empty_manifest()
+        if manifest.get('version') != CORPUS_VERSION:
+            # Formato antiguo: se recompila entero en archivos nuevos
+            return _empty_manifest(manifest.get('serial', 0), manifest.get('generation', 0))
+        return manifest
+
+    def _snapshot_now(self) -> _Snapshot:
+        """Versión vigente del corpus; se vuelve a mapear si otro proceso lo actualizó"""
+        try:
+            st = self._manifest_path.stat()
+            stat = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            stat = None
+        if self._snapshot is None or stat != self._stat:
+            # Una compilación puede borrar los archivos del manifest recién leído
+            for attempt in range(3):
+                try:
+                    snapshot = _Snapshot(self.directory, self._read_manifest())
+                    break
+                except FileNotFoundError:
+                    if attempt == 2:
+                        raise
+            self._stat = stat
+            self._snapshot = snapshot
+        return self._snapshot
+
+    # Consultas
+
+    def stats(self) -> Dict:
+        """
+        Tamaño del corpus: artistas, canciones, líneas, tokens, vocabulario y n-gramas
+
+        Canciones, líneas y tokens cuentan solo los rangos vigentes; lo
+        obsoleto pendiente de compactar va aparte (dead_*).
+        """
+        snapshot = self._snapshot_now()
+        manifest = snapshot.manifest
+        live = [entry['songs'] for entry in manifest['artists'].values()]
+        return {
+            'artists': len(manifest['artists']),
+            'songs': sum(end - first for first, end in live),
+            'lines': sum(snapshot.span_lines(songs) for songs in live),
+            'tokens': sum(snapshot.span_tokens(songs) for songs in live),
+            'vocabulary': manifest['vocab_size'] - 1,
+            'ngrams': manifest['ngrams'],
+            'dead_songs': sum(end - first for first, end in manifest['dead']),
+            'dead_tokens': sum(snapshot.span_tokens(songs) for songs in manifest['dead']),
+        }
+
+    def generation(self) -> int:
+        """Contador que avanza con cada compilación que cambia el corpus"""
+        return self._snapshot_now().manifest.get('generation', 0)
+
+    def artists(self) -> List[str]:
+        """Claves de los artistas del corpus (nombre de su JSON en la caché, sin extensión)"""
+        return sorted(self._snapshot_now().manifest['artists'])
+
+    def vocabulary(self) -> List[str]:
+        """Vocabulario global: la palabra de cada ID (el 0, desconocido, es '')"""
+        return self._snapshot_now().load_vocabulary()
+
+    def artist_tokens(self, artist_key: str) -> Optional[np.ndarray]:
+        """IDs de los tokens de un artista, como vista del array mapeado (None si no está)"""
+        snapshot = self._snapshot_now()
+        entry = snapshot.manifest['artists'].get(artist_key)
+        return snapshot.span(*entry['songs'])[0] if entry else None
+
+    def word_counts(self, artist_key: str = None) -> Optional[np.ndarray]:
+        """
+        Apariciones de cada ID del vocabulario
+
+        Args:
+            artist_key: Artista (por defecto, todo el corpus vigente)
+
+        Returns:
+            Array de longitud igual al vocabulario (None si el artista no está)
+        """
+        snapshot = self._snapshot_now()
+        size = snapshot.manifest['vocab_size']
+        if artist_key is not None:
+            entry = snapshot.manifest['artists'].get(artist_key)
+            return np.bincount(snapshot.span(*entry['songs'])[0], minlength=size) if entry else None
+
+        if snapshot.totals is None:
+            totals = np.bincount(snapshot.arrays['tokens'], minlength=size)
+            for first, end in snapshot.manifest['dead']:
+                totals -= np.bincount(snapshot.span(first, end)[0], minlength=size)
+            snapshot.totals = totals
+        return snapshot.totals
+
+    def encode(self, lines: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        IDs de los tokens de un texto con el vocabulario del corpus
+
+        Returns:
+            (IDs, con UNKNOWN para las palabras nuevas; inicio de cada línea con palabras)
+        """
+        index = self._snapshot_now().load_index()
+        tokens, starts = [], []
+        for line in lines:
+            words = tokenize_line(line)
+            if words:
+                starts.append(len(tokens))
+                tokens.extend(index.get(word, UNKNOWN) for word in words)
+        return np.asarray(tokens, dtype=np.uint32), np.asarray(starts, dtype=np.int64)
+
+    def copied_ngrams(self, lines: Iterable[str], n: int = NGRAM_SIZE) -> Tuple[int, int]:
+        """
+        N-gramas de un texto que aparecen en alguna letra del corpus
+
+        Args:
+            lines: Líneas del texto
+            n: Tokens por n-grama (el índice solo tiene los de NGRAM_SIZE)
+
+        Returns:
+            (n-gramas encontrados, n-gramas del texto)
+        """
+        snapshot = self._snapshot_now()
+        tokens, starts = self.encode(lines)
+        lengths = np.diff(np.append(starts, len(tokens)))
+        total = int(np.maximum(lengths - n + 1, 0).sum())
+        index = snapshot.arrays['ngrams']
+        if not total or not len(index) or n != NGRAM_SIZE:
+            return 0, total
+        hashes = ngram_hashes(tokens, starts, n)
+        positions = np.minimum(np.searchsorted(index, hashes), len(index) - 1)
+        return int((index[positions] == hashes).sum()), total
+
+    # Compilación
+
+    def update(self, cache_dir: str) -> Dict:
+        """
+        Compila en el corpus los JSON de la caché nuevos o modificados
+
+        Los artistas cuyo JSON cambió se añaden de nuevo al final y su rango
+        anterior queda obsoleto, igual que el de los que ya no están en la
+        caché; cuando lo obsoleto supera a lo vigente se compacta copiando
+        los rangos vigentes (sin releer la caché). Los n-gramas de lo
+        obsoleto siguen en el índice hasta la compactación. Un solo proceso
+        compila a la vez; los lectores ven la versión nueva al terminar.
+
+        Args:
+            cache_dir: Directorio de la caché de letras
+
+        Returns:
+            Artistas añadidos, actualizados y retirados, y si se compactó
+        """
+        with open(self.directory / '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            manifest = self._read_manifest()
+            result = {'added': 0, 'updated': 0, 'removed': 0, 'compacted': False}
+
+            present = {}
+            for path in sorted(Path(cache_dir).glob('*.json')):
+                st = path.stat()
+                present[path.stem] = (path, [st.st_mtime_ns, st.st_size])
+            for key in [key for key in manifest['artists'] if key not in present]:
+                manifest['dead'].append(manifest['artists'].pop(key)['songs'])
+                result['removed'] += 1
+
+            new_spans = self._append(manifest, present, result)
+            snapshot = _Snapshot(self.directory, manifest)
+
+            dead_tokens = sum(snapshot.span_tokens(songs) for songs in manifest['dead'])
+            if dead_tokens and dead_tokens > (manifest['tokens'] - dead_tokens) * _MAX_DEAD_RATIO:
+                manifest = self._compact(snapshot)
+                result['compacted'] = True
+            elif new_spans:
+                hashes = [ngram_hashes(tokens, starts - first_token)
+                          for tokens, starts, _, first_token in (snapshot.span(*span) for span in new_spans)]
+                self._write_ngrams(manifest, np.union1d(snapshot.arrays['ngrams'], np.concatenate(hashes)))
+            elif not result['removed']:
+                return result
+
+            self._write_manifest(manifest)
+            self._remove_unused(manifest)
+        return result
+
+    def _new_file(self, manifest: Dict, kind: str) -> Path:
+        """Crea (vacío) un archivo nuevo para un array o el vocabulario"""
+        manifest['serial'] += 1
+        extension = 'txt' if kind == 'vocab' else _KINDS[kind][1]
+        name = f"{kind}.{manifest['serial']}.{extension}"
+        manifest['files'][kind] = name
+        (self.directory / name).write_bytes(b'\n' if kind == 'vocab' else b'')
+        return self.directory / name
+
+    def _append(self, manifest: Dict, present: Dict[str, Tuple[Path, List[int]]], result: Dict) -> List[List[int]]:
+        """Tokeniza los artistas nuevos o modificados y los añade al final de los archivos"""
+        for kind in ('vocab', 'tokens', 'lines', 'songs'):
+            if kind not in manifest['files']:
+                self._new_file(manifest, kind)
+        # Descarta lo que escribiera una compilación interrumpida
+        sizes = {'vocab': manifest['vocab_bytes']}
+        sizes.update({kind: manifest[kind] * np.dtype(_KINDS[kind][0]).itemsize
+                      for kind in ('tokens', 'lines', 'songs')})
+        for kind, size in sizes.items():
+            os.truncate(self.directory / manifest['files'][kind], size)
+
+        index = _Snapshot(self.directory, manifest).load_index()
+        handles = {kind: open(self.directory / manifest['files'][kind], 'ab') for kind in sizes}
+        new_spans = []
+        try:
+            for key, (path, stat) in present.items():
+                entry = manifest['artists'].get(key)
+                if entry and entry['stat'] == stat:
+                    continue
+                try:
+                    songs = json.loads(path.read_text(encoding='utf-8'))
+                except (OSError, ValueError):
+                    continue
+
+                tokens, line_starts, song_starts, new_words = array('I'), array('q'), array('q'), []
+                for song in songs:
+                    song_starts.append(manifest['lines'] + len(line_starts))
+                    for line in (song.get('lyrics') or '').split('\n'):
+                        words = tokenize_line(line)
+                        if not words:
+                            continue
+                        line_starts.append(manifest['tokens'] + len(tokens))
+                        for word in words:
+                            token_id = index.get(word)
+                            if token_id is None:
+                                token_id = index[word] = len(index)
+                                new_words.append(word)
+                            tokens.append(token_id)
+
+                vocab_bytes = ''.join(f"{word}\n" for word in new_words).encode('utf-8')
+                handles['vocab'].write(vocab_bytes)
+                handles['tokens'].write(tokens.tobytes())
+                handles['lines'].write(line_starts.tobytes())
+                handles['songs'].write(song_starts.tobytes())
+
+                first_song = manifest['songs']
+                manifest['vocab_size'] += len(new_words)
+                manifest['vocab_bytes'] += len(vocab_bytes)
+                manifest['tokens'] += len(tokens)
+                manifest['lines'] += len(line_starts)
+                manifest['songs'] += len(song_starts)
+                if entry:
+                    manifest['dead'].append(entry['songs'])
+                result['updated' if entry else 'added'] += 1
+                manifest['artists'][key] = {'stat': stat, 'songs': [first_song, manifest['songs']]}
+                new_spans.append([first_song, manifest['songs']])
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return new_spans
+
+    def _compact(self, snapshot: _Snapshot) -> Dict:
+        """Reescribe en archivos nuevos solo los rangos vigentes y rehace el índice de n-gramas"""
+        manifest = json.loads(json.dumps(snapshot.manifest))
+        manifest.update({'tokens': 0, 'lines': 0, 'songs': 0, 'dead': []})
+        handles = {kind: open(self._new_file(manifest, kind), 'ab') for kind in ('tokens', 'lines', 'songs')}
+        hashes = []
+        try:
+            for entry in sorted(manifest['artists'].values(), key=lambda entry: entry['songs']):
+                first, end = entry['songs']
+                tokens, line_starts, first_line, first_token = snapshot.span(first, end)
+                song_starts = snapshot.arrays['songs'][first:end]
+                handles['tokens'].write(np.ascontiguousarray(tokens).tobytes())
+                handles['lines'].write((line_starts - first_token + manifest['tokens']).tobytes())
+                handles['songs'].write((song_starts - first_line + manifest['lines']).tobytes())
+                hashes.append(ngram_hashes(tokens, line_starts - first_token))
+
+                entry['songs'] = [manifest['songs'], manifest['songs'] + end - first]
+                manifest['tokens'] += len(tokens)
+                manifest['lines'] += len(line_starts)
+                manifest['songs'] += end - first
+        finally:
+            for handle in handles.values():
+                handle.close()
+        self._write_ngrams(manifest, np.unique(np.concatenate(hashes)) if hashes else np.empty(0, np.uint64))
+        return manifest
+
+    def _write_ngrams(self, manifest: Dict, hashes: np.ndarray):
+        path = self._new_file(manifest, 'ngrams')
+        hashes.astype(np.uint64).tofile(path)
+        manifest['ngrams'] = len(hashes)
+
+    def _write_manifest(self, manifest: Dict):
+        manifest['generation'] = manifest.get('generation', 0) + 1
+        tmp_path = self._manifest_path.with_name(f"manifest.json.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(manifest), encoding='utf-8')
+        os.replace(tmp_path, self._manifest_path)
+
+    def _remove_unused(self, manifest: Dict):
+        """Borra los archivos de versiones anteriores (los lectores que los mapean siguen funcionando)"""
+        keep = set(manifest['files'].values()) | {'manifest.json', '.lock'}
+        for path in self.directory.iterdir():
+            if path.name not in keep and not path.name.endswith('.tmp'):
+                path.unlink()
@@ -0,0 +1,186 @@
+"""
+Estadísticas de vocabulario aproximadas y combinables
+
+VocabularySketch cuenta palabras con memoria acotada: conteos exactos en un
+Space-Saving mientras el vocabulario quepa y, a partir de ahí, HyperLogLog
+para palabras distintas y Count-Min para detectar repeticiones. Sus resúmenes
+(HLL de palabras distintas y top de palabras) se guardan en el perfil y se
+pueden combinar entre artistas para agregados por género o sello.
+"""
+
+from collections import Counter
+from typing import Dict, List
+
+from utils.sketches import CountMinSketch, HyperLogLog, SpaceSaving, hash_item
+
+# Reparto del presupuesto entre el top de palabras y el Count-Min
+_BUDGET_SPLIT = {'top_words': 0.6, 'frequencies': 0.4}
+# Candidatos a hapax que se guardan para la muestra de palabras raras
+RARE_CANDIDATES = 200
+
+
+class VocabularySketch:
+    """Conteo de vocabulario con memoria acotada"""
+
+    def __init__(self, memory_budget_bytes: int, precision: int = 12):
+        """
+        Args:
+            memory_budget_bytes: Presupuesto para el top de palabras y el Count-Min
+            precision: Precisión de los HyperLogLog (2^p registros)
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.precision = precision
+        self._budget = {name: int(memory_budget_bytes * share) for name, share in _BUDGET_SPLIT.items()}
+
+        self.top_words = SpaceSaving.for_budget(self._budget['top_words'])
+        self.distinct = HyperLogLog(precision)
+        # Solo se crean cuando el vocabulario desborda el Space-Saving
+        self.frequencies: CountMinSketch = None
+        self.repeated: HyperLogLog = None
+
+        self.total_words = 0
+        self.first_sighting_length = 0
+        self.first_sightings = 0
+        self.rare_candidates: List[str] = []
+
+    @property
+    def exact(self) -> bool:
+        """Si el vocabulario cupo en el Space-Saving (conteos exactos)"""
+        return self.frequencies is None
+
+    def add_counts(self, counts: Counter):
+        """Incorpora los conteos de palabras de una canción"""
+        tracked = self.top_words.counts
+        for word, count in counts.items():
+            self.total_words += count
+            hashed = hash_item(word)
+            self.distinct.add(word, hashed)
+
+            if self.frequencies is None:
+                if word in tracked or len(tracked) < self.top_words.capacity:
+                    if word not in tracked:
+                        self._first_sighting(word, count)
+                    self.top_words.add(word, count)
+                    continue
+                self._start_sketches()
+
+            self.top_words.add(word, count)
+            estimate = self.frequencies.add(word, count, hashed)
+            if estimate == count:
+                # Primera aparición (salvo colisión del Count-Min)
+                self._first_sighting(word, count)
+            if estimate > 1:
+                self.repeated.add(word, hashed)
+
+    def _first_sighting(self, word: str, count: int):
+        self.first_sighting_length += len(word)
+        self.first_sightings += 1
+        if count == 1 and len(self.rare_candidates) < RARE_CANDIDATES:
+            self.rare_candidates.append(word)
+
+    def _start_sketches(self):
+        """Crea los sketches al desbordar el vocabulario y vuelca en ellos los conteos exactos"""
+        self.frequencies = CountMinSketch.for_budget(self._budget['frequencies'])
+        self.repeated = HyperLogLog(self.precision, seed=1)
+        for word, (count, _) in self.top_words.counts.items():
+            hashed = hash_item(word)
+            self.frequencies.add(word, count, hashed)
+            if count > 1:
+                self.repeated.add(word, hashed)
+
+    def profile(self) -> Dict:
+        """Estadísticas con el formato de StyleAnalyzer.analyze_vocabulary"""
+        tracked = self.top_words.counts
+        if self.exact:
+            unique_words = len(tracked)
+            rare_count = sum(1 for count, _ in tracked.values() if count == 1)
+            rare_sample = [w for w in self.rare_candidates if tracked[w][0] == 1][:20]
+        else:
+            unique_words = round(self.distinct.estimate())
+            rare_count = max(0, unique_words - round(self.repeated.estimate()))
+            rare_sample = [w for w in self.rare_candidates if self.frequencies.estimate(w) == 1][:20]
+
+        return {
+            'total_words': self.total_words,
+            'unique_words': unique_words,
+            'vocabulary_richness': unique_words / self.total_words if self.total_words else 0,
+            'most_common_words': [(word, count) for word, count, _ in self.top_words.top(20)],
+            'avg_word_length': self.first_sighting_length / self.first_sightings if self.first_sightings else 0,
+            'rare_words_count': rare_count,
+            'rare_words_sample': rare_sample
+        }
+
+    def summaries(self, top_limit: int = 1000) -> Dict:
+        """Resúmenes serializables y combinables para guardar en el perfil"""
+        return {
+            'total_words': self.total_words,
+            'distinct': self.distinct.to_dict(),
+            'top_words': self.top_words.to_dict(top_limit),
+        }
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memoria aproximada usada por los agregados"""
+        total = self.top_words.memory_bytes + self.distinct.memory_bytes
+        if not self.exact:
+            total += self.frequencies.memory_bytes + self.repeated.memory_bytes
+        return total
+
+    def accuracy(self) -> Dict:
+        """Cotas de error de cada estadística aproximada"""
+        exact = self.exact
+        report = {
+            'word_counts': {
+                'exact': exact,
+                'capacity': self.top_words.capacity,
+                'tracked': len(self.top_words.counts),
+                'max_error': self.top_words.max_error,
+                'top20_guaranteed': self.top_words.guaranteed_top(20),
+            },
+            'unique_words': {
+                'exact': exact,
+                'relative_std_error': 0.0 if exact else self.distinct.relative_error,
+            },
+            'rare_words_count': {
+                'exact': exact,
+                'method': 'conteo exacto' if exact else 'distintas - repetidas (HyperLogLog)',
+                # Las colisiones del Count-Min marcan como repetidas algunas palabras únicas
+                'bias': None if exact else 'subestima',
+            },
+        }
+        if not exact:
+            report['count_min'] = {
+                'width': self.frequencies.width,
+                'depth': self.frequencies.depth,
+                'epsilon': self.frequencies.epsilon,
+                'delta': self.frequencies.delta,
+                'max_overcount': self.frequencies.epsilon * self.frequencies.total,
+            }
+        return report
+
+
+def summaries_from_counts(word_freq: Counter, precision: int = 12, top_limit: int = 1000) -> Dict:
+    """
+    Resúmenes combinables a partir de conteos exactos
+
+    Permite que los perfiles del análisis exacto también participen en
+    agregados por género o sello.
+
+    Args:
+        word_freq: Conteo exacto de palabras
+        precision: Precisión del HyperLogLog
+        top_limit: Palabras más frecuentes a conservar
+
+    Returns:
+        Mismo formato que VocabularySketch.summaries
+    """
+    distinct = HyperLogLog(precision)
+    for word in word_freq:
+        distinct.add(word)
+    top_words = SpaceSaving(max(1, len(word_freq)))
+    top_words.counts = {word: [count, 0] for word, count in word_freq.items()}
+    return {
+        'total_words': sum(word_freq.values()),
+        'distinct': distinct.to_dict(),
+        'top_words': top_words.to_dict(top_limit),
+    }
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class ModelResponse:
+    """Respuesta normalizada de un backend de generación"""
+
+    def __init__(self, texts: List[str], usage: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            texts: Texto de cada candidato devuelto por el modelo
+            usage: Conteo de tokens (prompt_tokens, output_tokens, total_tokens)
+        """
+        self.texts = texts
+        self.usage = usage or {}
+
+    @property
+    def text(self) -> str:
+        """Texto del primer candidato"""
+        return self.texts[0] if self.texts else ""
+
+
+class ModelBackend:
+    """Interfaz común para los modelos que generan letras"""
+
+    name = "base"
+    model_name = "unknown"
+
+    def generate(self, prompt: str, generation_config: Dict) -> ModelResponse:
+        """
+        Genera texto a partir de un prompt
+
+        Args:
+            prompt: Prompt completo de generación
+            generation_config: Parámetros de generación (temperature, candidate_count, ...)
+
+        Returns:
+            Respuesta con uno o más candidatos
+        """
+        raise NotImplementedError
+
+
+class GeminiBackend(ModelBackend):
+    """Backend que usa la API de Google Gemini"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str = 'gemini-pro'):
+        """
+        Inicializa el cliente de Gemini
+
+        Args:
+            api_key: API key de Google Gemini
+            model_name: Modelo de Gemini a usar
+        """
+        # Importación diferida: el backend local no necesita el SDK de Gemini
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt: str, generation_config: Dict) -> ModelResponse:
+        response = self.model.generate_content(prompt, generation_config=generation_config)
+
+        if generation_config.get('candidate_count', 1) > 1:
+            texts = [
+                ''.join(part.text for part in candidate.content.parts)
+                for candidate in response.candidates
+            ]
+        else:
+            texts = [response.text]
+
+        usage = {}
+        metadata = getattr(response, 'usage_metadata', None)
+        if metadata is not None:
+            usage = {
+                'prompt_tokens': getattr(metadata, 'prompt_token_count', 0) or 0,
+                'output_tokens': getattr(metadata, 'candidates_token_count', 0) or 0,
+                'total_tokens': getattr(metadata, 'total_token_count', 0) or 0,
+            }
+
+        return ModelResponse(texts, usage)
+
+
+class StubBackend(ModelBackend):
+    """
+    Backend local y determinista para pruebas y benchmarks sin red
+
+    Devuelve salidas predefinidas (o letras sintéticas derivadas del prompt)
+    tras una latencia configurable.
+    """
+
+    name = "stub"
+    model_name = "stub"
+
+    _WORDS = [
+        'night', 'light', 'heart', 'street', 'fire', 'rain', 'dream', 'road',
+        'city', 'shadow', 'river', 'gold', 'echo', 'storm', 'dance', 'silence',
+        'noche', 'luna', 'calle', 'fuego', 'corazón', 'camino', 'mar', 'cielo',
+    ]
+
+    def __init__(self,
+                 outputs: Optional[List[str]] = None,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 seed: int = 0):
+        """
+        Inicializa el backend local
+
+        Args:
+            outputs: Respuestas predefinidas; se devuelven en orden cíclico
+            latency: Latencia simulada por llamada en segundos
+            jitter: Variación máxima (+/-) de la latencia en segundos
+            seed: Semilla para la latencia y las letras sintéticas
+        """
+        self.outputs = list(outputs) if outputs else []
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs) -> 'StubBackend':
+        """
+        Crea el backend con salidas leídas de disco
+
+        Args:
+            path: Archivo JSON con una lista de textos, o directorio con archivos .txt
+
+        Returns:
+            Backend local con esas salidas
+        """
+        source = Path(path)
+        if source.is_dir():
+            outputs = [f.read_text(encoding='utf-8') for f in sorted(source.glob('*.txt'))]
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                outputs = json.load(f)
+        return cls(outputs=outputs, **kwargs)
+
+    def _synthetic_lyrics(self, prompt: str, index: int) -> str:
+        """Genera una letra sintética determinista a partir del prompt"""
+        digest = hashlib.sha256(f"{self.seed}:{index}:{prompt}".encode('utf-8')).digest()
+        rng = random.Random(digest)
+
+        def line() -> str:
+            return ' '.join(rng.choice(self._WORDS) for _ in range(rng.randint(4, 8))).capitalize()
+
+        chorus = [line() for _ in range(4)]
+        sections = [
+            ('[Verse 1]', [line() for _ in range(4)]),
+            ('[Chorus]', chorus),
+            ('[Verse 2]', [line() for _ in range(4)]),
+            ('[Chorus]', chorus),
+            ('[Bridge]', [line() for _ in range(2)]),
+            ('[Chorus]', chorus),
+        ]
+        return '\n\n'.join(label + '\n' + '\n'.join(lines) for label, lines in sections)
+
+    def generate(self, prompt: str, generation_config: Dict) -> ModelResponse:
+        count = generation_config.get('candidate_count', 1)
+
+        with self._lock:
+            first_call = self.calls
+            self.calls += count
+            delay = self.latency
+            if self.jitter:
+                delay = max(0.0, delay + self._rng.uniform(-self.jitter, self.jitter))
+
+        if delay:
+            time.sleep(delay)
+
+        texts = []
+        for index in range(first_call, first_call + count):
+            if self.outputs:
+                texts.append(self.outputs[index % len(self.outputs)])
+            else:
+                texts.append(self._synthetic_lyrics(prompt, index))
+
+        prompt_tokens = len(prompt.split())
+        output_tokens = sum(len(text.split()) for text in texts)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': prompt_tokens + output_tokens,
+        }
+        return ModelResponse(texts, usage)
+
+
+def create_backend(name: str,
+                   api_key: str = None,
+                   stub_outputs: str = None,
+                   stub_latency: float = 0.0) -> ModelBackend:
+    """
+    Crea un backend por nombre
+
+    Args:
+        name: 'gemini' o 'stub'
+        api_key: API key de Gemini (solo para 'gemini')
+        stub_outputs: Ruta con salidas predefinidas para 'stub'
+        stub_latency: Latencia simulada para 'stub'
+
+    Returns:
+        Backend configurado
+    """
+    if name == 'gemini':
+        if not api_key:
+            raise ValueError("El backend 'gemini' requiere una API key de Gemini")
+        return GeminiBackend(api_key)
+    if name == 'stub':
+        if stub_outputs:
+            return StubBackend.from_path(stub_outputs, latency=stub_latency)
+        return StubBackend(latency=stub_latency)
+    raise ValueError(f"Backend desconocido: {name}")
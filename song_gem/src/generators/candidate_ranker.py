@@ -0,0 +1,161 @@
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+_WORD_RE = re.compile(r"[a-záéíóúüñ']+", re.IGNORECASE)
+
+# Etiquetas de sección reconocidas al validar la estructura de un candidato
+_VERSE_RE = re.compile(r'verse|verso|estrofa', re.IGNORECASE)
+_CHORUS_RE = re.compile(r'chorus|coro|hook|estribillo', re.IGNORECASE)
+
+
+def _load_sentiment_analyzer(language: str = 'en'):
+    """Carga el analizador de sentimiento del idioma si sus recursos están disponibles (None si no)"""
+    try:
+        from analyzers.languages import get_resources
+        return get_resources(language).sentiment
+    except (ImportError, LookupError):
+        return None
+
+
+class CandidateRanker:
+    """Puntúa y ordena candidatos de letras contra el perfil de estilo del artista"""
+
+    DEFAULT_WEIGHTS = {
+        'originality': 0.35,
+        'style_match': 0.25,
+        'sentiment_match': 0.15,
+        'structure': 0.25,
+    }
+
+    def __init__(self,
+                 weights: Dict[str, float] = None,
+                 sentiment_fn: Optional[Callable[[str], float]] = None):
+        """
+        Inicializa el ranker
+
+        Args:
+            weights: Pesos de cada componente del score final
+            sentiment_fn: Función texto -> compound en [-1, 1]; por defecto VADER
+                con el léxico del idioma del texto
+        """
+        self.weights = dict(self.DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self._sentiment_fn = sentiment_fn
+        self._sia: Dict[str, object] = {}  # idioma -> analizador (False si no disponible)
+
+    def _sentiment(self, text: str) -> Optional[float]:
+        """Calcula el sentimiento compound de un texto"""
+        if self._sentiment_fn:
+            return self._sentiment_fn(text)
+        from analyzers.languages import detect_language
+        language = detect_language(text)
+        if language not in self._sia:
+            self._sia[language] = _load_sentiment_analyzer(language) or False
+        if not self._sia[language]:
+            return None
+        return self._sia[language].polarity_scores(text)['compound']
+
+    def _term_matrix(self, texts: List[str], vocabulary: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Construye la matriz candidatos x vocabulario del perfil en una sola pasada"""
+        rows, cols = [], []
+        totals = np.zeros(len(texts), dtype=np.float64)
+
+        for i, text in enumerate(texts):
+            tokens = _WORD_RE.findall(text.lower())
+            totals[i] = len(tokens)
+            for token in tokens:
+                col = vocabulary.get(token)
+                if col is not None:
+                    rows.append(i)
+                    cols.append(col)
+
+        matrix = np.zeros((len(texts), max(len(vocabulary), 1)), dtype=np.float64)
+        if rows:
+            np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), 1.0)
+        return matrix, totals
+
+    def _style_match(self, texts: List[str], style_profile: Dict) -> np.ndarray:
+        """Similitud coseno entre el uso de palabras de cada candidato y el perfil"""
+        common_words = style_profile.get('vocabulary_profile', {}).get('most_common_words', [])
+        if not common_words:
+            return np.full(len(texts), 0.5)
+
+        vocabulary = {word: i for i, (word, _) in enumerate(common_words)}
+        profile_vector = np.array([float(freq) for _, freq in common_words])
+
+        matrix, totals = self._term_matrix(texts, vocabulary)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(profile_vector)
+        cosine = np.divide(matrix @ profile_vector, norms,
+                           out=np.zeros(len(texts)), where=norms > 0)
+
+        # Cobertura: proporción del texto que usa vocabulario característico
+        coverage = np.divide(matrix.sum(axis=1), totals,
+                             out=np.zeros(len(texts)), where=totals > 0)
+        return 0.7 * cosine + 0.3 * np.minimum(coverage * 5.0, 1.0)
+
+    def _sentiment_match(self, texts: List[str], style_profile: Dict) -> np.ndarray:
+        """Cercanía entre el sentimiento de cada candidato y el promedio del artista"""
+        target = style_profile.get('sentiment_profile', {}).get('average_sentiment', {}).get('compound')
+        scores = [self._sentiment(text) for text in texts]
+        if target is None or any(score is None for score in scores):
+            return np.full(len(texts), 0.5)
+        return 1.0 - np.abs(np.asarray(scores, dtype=np.float64) - target) / 2.0
+
+    def _structure_features(self, lyrics: List[Tuple[str, List[str]]]) -> List[float]:
+        """Extrae rasgos estructurales de un candidato ya parseado"""
+        labels = [label for label, _ in lyrics]
+        line_counts = [len(lines) for _, lines in lyrics]
+        return [
+            float(len(labels) >= 3),
+            float(any(_VERSE_RE.search(label) for label in labels)),
+            float(any(_CHORUS_RE.search(label) for label in labels)),
+            float(bool(line_counts) and all(2 <= n <= 16 for n in line_counts)),
+            float('[Full Song]' not in labels),
+            float(sum(1 for label in labels if _CHORUS_RE.search(label)) >= 2),
+        ]
+
+    def _structure_validity(self, parsed: List[List[Tuple[str, List[str]]]]) -> np.ndarray:
+        """Score de estructura válida de cada candidato"""
+        features = np.array([self._structure_features(lyrics) for lyrics in parsed], dtype=np.float64)
+        return features.mean(axis=1)
+
+    def rank(self,
+             texts: List[str],
+             parsed: List[List[Tuple[str, List[str]]]],
+             originality: List[float],
+             style_profile: Dict) -> List[Dict]:
+        """
+        Puntúa todos los candidatos y los ordena de mejor a peor
+
+        Args:
+            texts: Texto crudo de cada candidato
+            parsed: Letras estructuradas de cada candidato
+            originality: Score de originalidad de cada candidato
+            style_profile: Perfil de estilo del artista
+
+        Returns:
+            Lista de scores por candidato ordenada por score total descendente
+        """
+        components = {
+            'originality': np.asarray(originality, dtype=np.float64),
+            'style_match': self._style_match(texts, style_profile),
+            'sentiment_match': self._sentiment_match(texts, style_profile),
+            'structure': self._structure_validity(parsed),
+        }
+
+        names = list(components)
+        score_matrix = np.column_stack([components[name] for name in names])
+        weights = np.array([self.weights.get(name, 0.0) for name in names])
+        totals = score_matrix @ weights / max(weights.sum(), 1e-9)
+
+        ranking = []
+        for index in np.argsort(-totals, kind='stable'):
+            entry = {'candidate': int(index), 'total_score': round(float(totals[index]), 4)}
+            for column, name in enumerate(names):
+                entry[name] = round(float(score_matrix[index, column]), 4)
+            ranking.append(entry)
+        return ranking
@@ -0,0 +1,234 @@
+"""
+Almacén de canciones generadas y reescritas
+
+Cada resultado se añade (nunca se sobrescribe) a una tabla SQLite con un ID
+de generación propio. Artista, tema, fecha y score de originalidad van en
+columnas indexadas para filtrar decenas de miles de borradores sin leer el
+JSON completo de cada uno, que se guarda aparte en la misma fila.
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.sqlite import ThreadLocalConnection
+
+GENERATION_KINDS = ('generate', 'rewrite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    artist_key TEXT NOT NULL,
+    theme TEXT,
+    theme_key TEXT,
+    emotion TEXT,
+    structure TEXT,
+    originality_score REAL,
+    original_artist TEXT,
+    original_title TEXT,
+    backend TEXT,
+    created_at REAL NOT NULL,
+    song TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generations_artist ON generations (artist_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_generations_theme ON generations (theme_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_generations_created ON generations (created_at);
+CREATE INDEX IF NOT EXISTS idx_generations_originality ON generations (originality_score);
+"""
+
+# Columnas de los listados (sin el JSON completo)
+_SUMMARY_COLUMNS = ('id', 'kind', 'artist', 'theme', 'emotion', 'structure', 'originality_score',
+                    'original_artist', 'original_title', 'backend', 'created_at')
+_ORDERS = {
+    'recent': 'created_at DESC',
+    'oldest': 'created_at',
+    'originality': 'originality_score DESC, created_at DESC',
+}
+
+
+def _key(text: Optional[str]) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+def new_generation_id() -> str:
+    """ID de generación: milisegundos en hexadecimal (ordena por fecha) y sufijo aleatorio"""
+    return f"{int(time.time() * 1000):011x}{uuid.uuid4().hex[:8]}"
+
+
+class GenerationStore:
+    """Almacén persistente (solo añadir) de generaciones respaldado por SQLite"""
+
+    def __init__(self, db_path: str):
+        """
+        Abre (o crea) el almacén
+
+        Args:
+            db_path: Ruta del archivo SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = ThreadLocalConnection(self.db_path)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conexión de este hilo y proceso (ver utils.sqlite)"""
+        return self._connection.get()
+
+    @staticmethod
+    def _row(song_data: Dict, kind: str, created_at: float) -> Tuple:
+        """Fila de la tabla para una generación (asigna su ID si no lo tiene)"""
+        if kind not in GENERATION_KINDS:
+            raise ValueError(f"Tipo de generación desconocido: {kind}")
+        generation_id = song_data.setdefault('generation_id', new_generation_id())
+        original = song_data.get('original_song') or {}
+        artist = song_data.get('artist_style') or 'Unknown'
+        return (
+            generation_id, kind, artist, _key(artist),
+            song_data.get('theme'), _key(song_data.get('theme')),
+            song_data.get('emotion'), song_data.get('structure'),
+            song_data.get('originality_score'),
+            original.get('artist'), original.get('title'),
+            (song_data.get('generation_metadata') or {}).get('backend'),
+            created_at, json.dumps(song_data, ensure_ascii=False),
+        )
+
+    def add(self, song_data: Dict, kind: str = 'generate') -> str:
+        """
+        Añade una generación
+
+        Args:
+            song_data: Resultado de LyricsGenerator (recibe su 'generation_id')
+            kind: 'generate' o 'rewrite'
+
+        Returns:
+            ID de la generación
+        """
+        return self.add_many([song_data], kind)[0]
+
+    def add_many(self, songs: Iterable[Dict], kind: str = 'generate',
+                 created_at: Iterable[float] = None) -> List[str]:
+        """
+        Añade muchas generaciones en una sola transacción
+
+        Args:
+            songs: Resultados de LyricsGenerator
+            kind: 'generate' o 'rewrite'
+            created_at: Fechas de cada una (por defecto, ahora)
+
+        Returns:
+            IDs de las generaciones, en el mismo orden
+        """
+        songs = list(songs)
+        now = time.time()
+        dates = list(created_at) if created_at is not None else [now] * len(songs)
+        rows = [self._row(song, kind, date) for song, date in zip(songs, dates)]
+
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(f"INSERT INTO generations VALUES ({', '.join('?' * 14)})", rows)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [row[0] for row in rows]
+
+    def get(self, generation_id: str) -> Optional[Dict]:
+        """Resultado completo de una generación (None si no existe)"""
+        row = self._connect().execute("SELECT song FROM generations WHERE id = ?", (generation_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _filters(self, artist: str, theme: str, kind: str, since: float, until: float,
+                 min_originality: float) -> Tuple[str, List]:
+        conditions, params = [], []
+        for column, value in (('artist_key', _key(artist) if artist else None),
+                              ('theme_key', _key(theme) if theme else None),
+                              ('kind', kind)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(until)
+        if min_originality is not None:
+            conditions.append("originality_score >= ?")
+            params.append(min_originality)
+        return (' WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+    def query(self, artist: str = None, theme: str = None, kind: str = None, since: float = None,
+              until: float = None, min_originality: float = None, order: str = 'recent',
+              limit: int = 50, offset: int = 0) -> List[Dict]:
+        """
+        Lista generaciones filtradas (sin la letra; ver get)
+
+        Args:
+            artist: Artista de estilo (sin distinguir mayúsculas)
+            theme: Tema exacto (sin distinguir mayúsculas)
+            kind: 'generate' o 'rewrite'
+            since: Desde esta fecha (timestamp)
+            until: Hasta esta fecha, excluida (timestamp)
+            min_originality: Score de originalidad mínimo
+            order: 'recent', 'oldest' u 'originality'
+            limit: Máximo de resultados
+            offset: Resultados a saltar (paginación)
+
+        Returns:
+            Resumen de cada generación
+        """
+        if order not in _ORDERS:
+            raise ValueError(f"Orden desconocido: {order}")
+        where, params = self._filters(artist, theme, kind, since, until, min_originality)
+        rows = self._connect().execute(
+            f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM generations{where} "
+            f"ORDER BY {_ORDERS[order]} LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        ).fetchall()
+        return [dict(zip(_SUMMARY_COLUMNS, row)) for row in rows]
+
+    def count(self, artist: str = None, theme: str = None, kind: str = None, since: float = None,
+              until: float = None, min_originality: float = None) -> int:
+        """Número de generaciones que cumplen los filtros (ver query)"""
+        where, params = self._filters(artist, theme, kind, since, until, min_originality)
+        return self._connect().execute(f"SELECT COUNT(*) FROM generations{where}", params).fetchone()[0]
+
+    def import_files(self, paths: Iterable[Path], kind: str) -> int:
+        """
+        Importa los JSON que se guardaban antes, uno por generación
+
+        Cada uno toma la fecha de su archivo; los ya importados (mismo
+        artista, tema y fecha) se saltan, así que puede repetirse.
+
+        Args:
+            paths: Archivos JSON de data/generated_songs o data/rewritten_songs
+            kind: 'generate' o 'rewrite'
+
+        Returns:
+            Generaciones importadas
+        """
+        conn = self._connect()
+        songs, dates = [], []
+        for path in paths:
+            try:
+                song_data = json.loads(Path(path).read_text(encoding='utf-8'))
+                created_at = Path(path).stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            if not isinstance(song_data, dict) or not song_data.get('success'):
+                continue
+            imported = conn.execute(
+                "SELECT 1 FROM generations WHERE artist_key = ? AND theme_key = ? AND created_at = ?",
+                (_key(song_data.get('artist_style')), _key(song_data.get('theme')), created_at)
+            ).fetchone()
+            if not imported:
+                songs.append(song_data)
+                dates.append(created_at)
+        return len(self.add_many(songs, kind, dates))
@@ -1,27 +1,59 @@
-import google.generativeai as genai
 import json
 import re
-from typing import Dict, List, Optional
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 
+from analyzers.languages import count_terms, detect_language, get_resources, keyword_terms
+from analyzers.token_corpus import TokenCorpus
+from generators.backends import GeminiBackend, ModelBackend
+from generators.candidate_ranker import CandidateRanker
+from utils.lyrics_sections import normalize_sections, parse_sections, sections_text
+from utils.metrics import METRICS, MetricsRegistry
+
+# Nombres de los idiomas del perfil (language_profile) para el prompt
+LANGUAGE_NAMES = {'en': 'inglés', 'es': 'español'}
+
+
+def _abandon(executor: ThreadPoolExecutor, futures: List) -> None:
+    """Cancela los candidatos pendientes y suelta el pool sin esperar a las llamadas en curso"""
+    for future in futures:
+        future.cancel()
+    if sys.version_info >= (3, 9):
+        executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        executor.shutdown(wait=False)
+
+
 class LyricsGenerator:
-    """Generador de letras usando Gemini API basado en estilos de artistas"""
+    """Generador de letras basado en estilos de artistas (Gemini u otro backend)"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str = None, backend: ModelBackend = None, metrics: MetricsRegistry = None,
+                 corpus: TokenCorpus = None, candidate_workers: int = 4):
         """
-        Inicializa el generador con la API key de Gemini
+        Inicializa el generador con un backend de modelo
         
         Args:
-            api_key: API key de Google Gemini
+            api_key: API key de Google Gemini (si no se pasa backend)
+            backend: Backend de generación; por defecto Gemini
+            metrics: Registro de métricas; por defecto el global
+            corpus: Corpus compilado de la caché; con él, la originalidad
+                penaliza los n-gramas copiados de letras existentes
+            candidate_workers: Llamadas simultáneas al modelo en best-of-N
         """
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.backend = backend or GeminiBackend(api_key)
+        self.metrics = metrics or METRICS
+        self.corpus = corpus
+        self.candidate_workers = max(1, candidate_workers)
         self.generation_config = {
             "temperature": 0.8,
             "top_p": 0.9,
             "top_k": 40,
             "max_output_tokens": 2000,
         }
+        self.ranker = CandidateRanker()
     
     def _create_style_prompt(self, style_profile: Dict, original_song_info: Dict = None) -> str:
         """
@@ -41,6 +73,7 @@ class LyricsGenerator:
         sentiment = style_profile.get('sentiment_profile', {})
         structure = style_profile.get('structure_profile', {})
         themes = sentiment.get('dominant_themes', [])
+        language = style_profile.get('language_profile', {}).get('dominant_language')
         
         # Construir descripción del estilo
         style_description = f"""
@@ -50,6 +83,7 @@ CARACTERÍSTICAS PRINCIPALES:
 - Vocabulario: {"rico y diverso" if vocab.get('vocabulary_richness', 0) > 0.4 else "directo y accesible"}
 - Tono emocional: {sentiment.get('average_sentiment', {}).get('compound', 0):.2f} ({"positivo" if sentiment.get('average_sentiment', {}).get('compound', 0) > 0 else "melancólico" if sentiment.get('average_sentiment', {}).get('compound', 0) < 0 else "neutral"})
 - Estructura preferida: {structure.get('common_structures', [{}])[0].get('structure', 'Verse-Chorus')}
+- Idioma de las letras: {LANGUAGE_NAMES.get(language, language or 'el del artista')}
 
 TEMAS RECURRENTES:
 {chr(10).join([f"- {theme['theme'].title()}: {theme['percentage']:.1f}% de prevalencia" for theme in themes[:5]])}
@@ -153,7 +187,10 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
                        emotion: str = None,
                        structure: str = None,
                        length: str = "standard",
-                       original_song_info: Dict = None) -> Dict:
+                       original_song_info: Dict = None,
+                       candidate_count: int = 1,
+                       parallel_candidates: bool = True,
+                       progress: Callable[[int, int], None] = None) -> Dict:
         """
         Genera letras originales basadas en el estilo de un artista
         
@@ -164,33 +201,48 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
             structure: Estructura deseada
             length: Longitud deseada
             original_song_info: Info de canción original (para reescritura de estilo)
+            candidate_count: Número de candidatos a generar (best-of-N)
+            parallel_candidates: Si True, pide los candidatos con llamadas concurrentes;
+                si False, en una sola llamada usando candidate_count del modelo
+            progress: Callback (candidatos recibidos, total) llamado con cada
+                respuesta; si lanza una excepción la generación se detiene
             
         Returns:
             Diccionario con la letra generada y metadatos
         """
+        stage = 'prompt_build'
+        start = time.perf_counter()
         try:
             # Crear prompts
-            style_description = self._create_style_prompt(style_profile, original_song_info)
-            generation_prompt = self._create_generation_prompt(
-                style_description, new_theme, emotion, structure, length
-            )
+            with self.metrics.timer('prompt_build'):
+                style_description = self._create_style_prompt(style_profile, original_song_info)
+                generation_prompt = self._create_generation_prompt(
+                    style_description, new_theme, emotion, structure, length
+                )
             
             print(f"Generando letra al estilo de {style_profile['artist_name']}...")
             print(f"Tema: {new_theme}")
             
             # Generar con Gemini
-            response = self.model.generate_content(
-                generation_prompt,
-                generation_config=self.generation_config
-            )
-            
-            generated_text = response.text
+            stage = 'model_call'
+            candidate_count = max(1, candidate_count)
+            with self.metrics.timer('model_call'):
+                texts, usage = self._request_candidates(generation_prompt, candidate_count, parallel_candidates,
+                                                        progress)
+            for token_type, count in usage.items():
+                self.metrics.inc('tokens_total', count, {'type': token_type})
             
-            # Procesar y estructurar la respuesta
-            structured_lyrics = self._parse_lyrics_response(generated_text)
-            
-            # Validar originalidad básica
-            originality_score = self._check_originality(structured_lyrics, style_profile)
+            # Procesar, validar originalidad y ordenar candidatos
+            stage = 'parse'
+            with self.metrics.timer('parse'):
+                parsed = [self._parse_lyrics_response(text) for text in texts]
+            stage = 'originality'
+            with self.metrics.timer('originality'):
+                originality = [self._check_originality(lyrics, style_profile) for lyrics in parsed]
+            stage = 'rank'
+            with self.metrics.timer('rank'):
+                ranking = self.ranker.rank(texts, parsed, originality, style_profile)
+            best = ranking[0]['candidate']
             
             result = {
                 'success': True,
@@ -198,19 +250,29 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
                 'theme': new_theme,
                 'emotion': emotion,
                 'structure': structure,
-                'lyrics': structured_lyrics,
-                'raw_response': generated_text,
-                'originality_score': originality_score,
+                'lyrics': parsed[best],
+                'raw_response': texts[best],
+                'originality_score': originality[best],
                 'generation_metadata': {
-                    'model': 'gemini-pro',
+                    'model': self.backend.model_name,
+                    'backend': self.backend.name,
                     'temperature': self.generation_config['temperature'],
-                    'max_tokens': self.generation_config['max_output_tokens']
+                    'max_tokens': self.generation_config['max_output_tokens'],
+                    'candidate_count': len(texts),
+                    'usage': usage
                 }
             }
             
+            if len(texts) > 1:
+                result['candidate_scores'] = ranking
+            
+            self.metrics.inc('generations_total', labels={'status': 'success'})
+            self.metrics.observe('generation_seconds', time.perf_counter() - start)
             return result
             
         except Exception as e:
+            self.metrics.inc('generations_total', labels={'status': 'error'})
+            self.metrics.inc('errors_total', labels={'type': type(e).__name__, 'stage': stage})
             return {
                 'success': False,
                 'error': str(e),
@@ -218,72 +280,72 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
                 'theme': new_theme
             }
     
-    def _parse_lyrics_response(self, response_text: str) -> Dict:
+    def _request_candidates(self, prompt: str, count: int, parallel: bool,
+                            progress: Callable[[int, int], None] = None) -> Tuple[List[str], Dict]:
         """
-        Procesa la respuesta de Gemini y estructura las letras
+        Obtiene uno o varios textos candidatos del backend
         
         Args:
-            response_text: Texto crudo de Gemini
+            prompt: Prompt de generación
+            count: Número de candidatos
+            parallel: Si True, lanza una llamada por candidato de forma concurrente
+            progress: Callback (candidatos recibidos, total); si lanza una
+                excepción (p. ej. JobCancelled) se cancelan los pendientes
             
         Returns:
-            Diccionario con letras estructuradas
+            Tupla (texto de cada candidato, tokens consumidos en total). En
+            paralelo se descartan los candidatos que fallan; solo se lanza el
+            error si fallan todos
         """
-        sections = {}
-        current_section = None
-        current_lines = []
-        
-        lines = response_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
+        progress = progress or (lambda done, total: None)
+        if count > 1 and parallel:
+            executor = ThreadPoolExecutor(max_workers=min(count, self.candidate_workers))
+            futures = [executor.submit(self.backend.generate, prompt, self.generation_config)
+                       for _ in range(count)]
+            failures = []
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    error = future.exception()
+                    if error is not None:
+                        failures.append(error)
+                        self.metrics.inc('errors_total', labels={'type': type(error).__name__, 'stage': 'candidate'})
+                    progress(done, count)
+            except BaseException:
+                _abandon(executor, futures)
+                raise
+            executor.shutdown()
             
-            # Detectar encabezados de sección
-            if line.startswith('[') and line.endswith(']'):
-                # Guardar sección anterior
-                if current_section and current_lines:
-                    sections[current_section] = '\n'.join(current_lines)
-                
-                # Iniciar nueva sección
-                current_section = line
-                current_lines = []
-            elif line and not line.startswith('TAREA') and not line.startswith('ESTILO'):
-                current_lines.append(line)
-        
-        # Guardar última sección
-        if current_section and current_lines:
-            sections[current_section] = '\n'.join(current_lines)
+            if len(failures) == count:
+                raise failures[0]
+            if failures:
+                print(f"⚠️ {len(failures)} de {count} candidatos fallaron: {failures[0]}")
+            responses = [future.result() for future in futures if future.exception() is None]
+        else:
+            config = dict(self.generation_config, candidate_count=count) if count > 1 else self.generation_config
+            responses = [self.backend.generate(prompt, config)]
+            progress(count, count)
         
-        # Si no se detectaron secciones, intentar extraer versos y coros
-        if not sections:
-            sections = self._fallback_parsing(response_text)
+        texts = [text for response in responses for text in response.texts]
+        usage = {}
+        for response in responses:
+            for key, value in response.usage.items():
+                usage[key] = usage.get(key, 0) + value
         
-        return sections
+        return texts, usage
     
-    def _fallback_parsing(self, text: str) -> Dict:
-        """Análisis alternativo si no se detectan secciones claras"""
-        sections = {}
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        
-        if not lines:
-            return {}
-        
-        # Dividir en secciones iguales
-        total_lines = len(lines)
-        
-        if total_lines >= 12:
-            sections['[Verse 1]'] = '\n'.join(lines[:4])
-            sections['[Chorus]'] = '\n'.join(lines[4:8])
-            sections['[Verse 2]'] = '\n'.join(lines[8:12])
-            if total_lines > 16:
-                sections['[Chorus]'] += '\n' + '\n'.join(lines[12:16])
-                if total_lines > 20:
-                    sections['[Outro]'] = '\n'.join(lines[16:])
-        else:
-            sections['[Full Song]'] = '\n'.join(lines)
+    def _parse_lyrics_response(self, response_text: str) -> List[Tuple[str, List[str]]]:
+        """
+        Procesa la respuesta de Gemini y estructura las letras
         
-        return sections
+        Args:
+            response_text: Texto crudo de Gemini
+            
+        Returns:
+            Lista ordenada de secciones (etiqueta, líneas), con repeticiones
+        """
+        return parse_sections(response_text)
     
-    def _check_originality(self, lyrics: Dict, style_profile: Dict) -> float:
+    def _check_originality(self, lyrics: List[Tuple[str, List[str]]], style_profile: Dict) -> float:
         """
         Verificación básica de originalidad
         
@@ -294,7 +356,7 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
         Returns:
             Score de originalidad (0-1)
         """
-        all_text = '\n'.join(lyrics.values())
+        all_text = sections_text(lyrics)
         
         # Verificaciones básicas
         if not all_text or len(all_text) < 50:
@@ -319,12 +381,20 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
         # Score basado en diversidad de vocabulario y complejidad
         originality_score = min(vocabulary_diversity * 1.5, 1.0)
         
+        # Fracción de n-gramas que ya aparecen en alguna letra de la caché
+        if self.corpus is not None:
+            copied, total = self.corpus.copied_ngrams(all_text.split('\n'))
+            if total:
+                originality_score *= 1 - copied / total
+        
         return originality_score
     
     def rewrite_song_in_style(self, 
                              style_profile: Dict,
                              original_song: Dict,
-                             new_angle: str = None) -> Dict:
+                             new_angle: str = None,
+                             candidate_count: int = 1,
+                             progress: Callable[[int, int], None] = None) -> Dict:
         """
         Reescribe una canción existente al estilo de otro artista
         
@@ -332,6 +402,8 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
             style_profile: Perfil del artista cuyo estilo se adoptará
             original_song: Información de la canción original
             new_angle: Nuevo enfoque o perspectiva
+            candidate_count: Número de candidatos a generar (best-of-N)
+            progress: Callback (candidatos recibidos, total)
             
         Returns:
             Letras reescritas manteniendo el espíritu pero con nuevo estilo
@@ -347,11 +419,18 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
             style_profile=style_profile,
             new_theme=original_info['theme'],
             emotion=original_info['emotion'],
-            original_song_info=original_info
+            original_song_info=original_info,
+            candidate_count=candidate_count,
+            progress=progress
         )
     
+    @staticmethod
+    def _lyric_words(lyrics: str) -> List[str]:
+        """Palabras de una letra con el tokenizador de su idioma (como en StyleAnalyzer)"""
+        return get_resources(detect_language(lyrics)).words(lyrics)
+    
     def _extract_theme(self, lyrics: str) -> str:
-        """Extrae el tema principal de una letra"""
+        """Extrae el tema principal de una letra (palabras completas: 'sun' no cuenta en 'sunday')"""
         # Análisis simple de palabras clave
         themes = {
             'love': ['love', 'heart', 'kiss', 'romance'],
@@ -362,25 +441,20 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
             'nature': ['sky', 'sun', 'moon', 'stars']
         }
         
-        lyrics_lower = lyrics.lower()
-        theme_scores = {}
+        theme_scores = count_terms(self._lyric_words(lyrics), keyword_terms(themes))
         
-        for theme, keywords in themes.items():
-            score = sum(lyrics_lower.count(keyword) for keyword in keywords)
-            if score > 0:
-                theme_scores[theme] = score
-        
-        return max(theme_scores.items(), key=lambda x: x[1])[0] if theme_scores else 'life'
+        return max(themes, key=lambda theme: theme_scores.get(theme, 0)) if theme_scores else 'life'
     
     def _extract_emotion(self, lyrics: str) -> str:
         """Extrae la emoción principal de una letra"""
-        positive_words = ['happy', 'joy', 'love', 'bright', 'smile']
-        negative_words = ['sad', 'pain', 'cry', 'dark', 'tears']
-        
-        lyrics_lower = lyrics.lower()
+        emotion_words = {
+            'positive': ['happy', 'joy', 'love', 'bright', 'smile'],
+            'negative': ['sad', 'pain', 'cry', 'dark', 'tears']
+        }
         
-        pos_count = sum(lyrics_lower.count(word) for word in positive_words)
-        neg_count = sum(lyrics_lower.count(word) for word in negative_words)
+        scores = count_terms(self._lyric_words(lyrics), keyword_terms(emotion_words))
+        pos_count = scores.get('positive', 0)
+        neg_count = scores.get('negative', 0)
         
         if pos_count > neg_count:
             return 'positive'
@@ -391,8 +465,9 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
     
     def save_generated_song(self, song_data: Dict, output_path: str):
         """Guarda la canción generada en un archivo"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(song_data, f, ensure_ascii=False, indent=2)
+        with self.metrics.timer('save'):
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(song_data, f, ensure_ascii=False, indent=2)
     
     def format_song_for_display(self, song_data: Dict) -> str:
         """Formatea la canción para visualización"""
@@ -405,15 +480,15 @@ IMPORTANTE: Cada línea debe ser 100% original. No incluir ninguna letra o frase
 Tema: {song_data['theme']}
 Emoción: {song_data.get('emotion', 'Natural del artista')}
 Score Originalidad: {song_data.get('originality_score', 0):.2f}
+Candidatos evaluados: {song_data.get('generation_metadata', {}).get('candidate_count', 1)}
 
 {'='*50}
 
 """
         
-        lyrics = song_data.get('lyrics', {})
-        for section_name, section_content in lyrics.items():
+        for section_name, section_lines in normalize_sections(song_data.get('lyrics')):
             formatted += f"\n{section_name}\n"
-            formatted += f"{section_content}\n"
+            formatted += '\n'.join(section_lines) + '\n'
         
         formatted += f"\n{'='*50}\n"
         formatted += f"Generado con Gemini AI | Modelo: {song_data.get('generation_metadata', {}).get('model', 'Unknown')}"
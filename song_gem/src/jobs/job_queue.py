@@ -0,0 +1,223 @@
+"""
+Cola persistente de trabajos en segundo plano
+
+Los trabajos (análisis, generación y reescritura) se guardan en una tabla
+SQLite con sus parámetros, estado, progreso y resultado. Varios procesos
+worker reclaman trabajos de forma atómica por prioridad; la cancelación es
+cooperativa: se marca en la fila y el worker la detecta al informar progreso.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.sqlite import ThreadLocalConnection
+
+# Estados posibles de un trabajo
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+JOB_KINDS = ('analyze', 'generate', 'rewrite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs (status, priority DESC, id);
+"""
+
+
+class JobCancelled(Exception):
+    """Se lanza dentro de un trabajo cuando se solicitó su cancelación"""
+
+
+class JobQueue:
+    """Cola persistente de trabajos respaldada por SQLite"""
+
+    def __init__(self, db_path: str):
+        """
+        Abre (o crea) la cola
+
+        Args:
+            db_path: Ruta del archivo SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = ThreadLocalConnection(self.db_path, row_factory=sqlite3.Row)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conexión de este hilo y proceso (ver utils.sqlite)"""
+        return self._connection.get()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+    def submit(self, kind: str, params: Dict, priority: int = 0) -> int:
+        """
+        Encola un trabajo
+
+        Args:
+            kind: Tipo de trabajo ('analyze', 'generate' o 'rewrite')
+            params: Parámetros del trabajo
+            priority: Prioridad (mayor se ejecuta antes)
+
+        Returns:
+            ID del trabajo
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Tipo de trabajo desconocido: {kind}")
+        cursor = self._connect().execute(
+            "INSERT INTO jobs (kind, params, status, priority, created_at) VALUES (?, ?, ?, ?, ?)",
+            (kind, json.dumps(params, ensure_ascii=False), QUEUED, priority, time.time())
+        )
+        return cursor.lastrowid
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """Devuelve el estado completo de un trabajo (None si no existe)"""
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, status: str = None, limit: int = 50) -> List[Dict]:
+        """Lista trabajos recientes, opcionalmente filtrados por estado"""
+        query = ("SELECT id, kind, params, status, priority, progress, message, error, "
+                 "cancel_requested, worker, created_at, started_at, finished_at, NULL AS result FROM jobs")
+        args = []
+        if status:
+            query += " WHERE status = ?"
+            args.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        args.append(limit)
+        return [self._to_dict(row) for row in self._connect().execute(query, args)]
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """
+        Toma de forma atómica el trabajo pendiente de mayor prioridad
+
+        Args:
+            worker: Identificador del worker que lo ejecutará
+
+        Returns:
+            El trabajo reclamado, o None si no hay pendientes
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY priority DESC, id LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started_at = ? WHERE id = ?",
+                (RUNNING, worker, time.time(), row['id'])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row['id'])
+
+    def update_progress(self, job_id: int, progress: float, message: str = None) -> bool:
+        """
+        Actualiza el progreso de un trabajo en ejecución
+
+        Returns:
+            True si se solicitó la cancelación del trabajo
+        """
+        conn = self._connect()
+        conn.execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?",
+            (max(0.0, min(progress, 1.0)), message, job_id)
+        )
+        row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def complete(self, job_id: int, result):
+        """Marca un trabajo como terminado con éxito y guarda su resultado"""
+        self._finish(job_id, SUCCEEDED, result=json.dumps(result, ensure_ascii=False, default=str))
+
+    def fail(self, job_id: int, error: str):
+        """Marca un trabajo como fallido"""
+        self._finish(job_id, FAILED, error=error)
+
+    def mark_cancelled(self, job_id: int):
+        """Marca como cancelado un trabajo que se detuvo a petición"""
+        self._finish(job_id, CANCELLED, error='Cancelado')
+
+    def _finish(self, job_id: int, status: str, result: str = None, error: str = None):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+            "progress = CASE WHEN ? = ? THEN 1.0 ELSE progress END WHERE id = ?",
+            (status, result, error, time.time(), status, SUCCEEDED, job_id)
+        )
+
+    def cancel(self, job_id: int) -> Optional[str]:
+        """
+        Cancela un trabajo
+
+        Los trabajos en cola se cancelan inmediatamente; los que están en
+        ejecución se detienen en su siguiente punto de control.
+
+        Returns:
+            Nuevo estado del trabajo (None si no existe)
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            status = row['status']
+            if status == QUEUED:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (CANCELLED, 'Cancelado', time.time(), job_id)
+                )
+                status = CANCELLED
+            elif status == RUNNING:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return status
+
+    def requeue_orphans(self, workers: List[str]):
+        """Devuelve a la cola los trabajos 'running' de workers que ya no existen"""
+        if not workers:
+            return 0
+        placeholders = ','.join('?' for _ in workers)
+        cursor = self._connect().execute(
+            f"UPDATE jobs SET status = ?, worker = NULL, started_at = NULL "
+            f"WHERE status = ? AND worker IN ({placeholders})",
+            [QUEUED, RUNNING] + list(workers)
+        )
+        return cursor.rowcount
@@ -0,0 +1,107 @@
+"""
+Reconstrucción masiva de perfiles desde la caché de letras
+
+Reparte los artistas cacheados entre procesos worker empezando por los de
+más canciones: cada worker toma el siguiente artista al terminar el
+anterior, así los catálogos grandes no quedan para el final alargando la
+cola. Cada worker construye su propio sistema y rehace los perfiles con
+SongGemSystem.rebuild_profile, que salta los que ya están al día.
+"""
+
+import multiprocessing
+import time
+from typing import Callable, Dict, Tuple
+
+from utils.metrics import METRICS
+
+# Sistema de cada proceso worker (construido en _init_worker)
+_system = None
+
+
+def _init_worker(system_factory: Callable):
+    global _system
+    _system = system_factory()
+
+
+def _rebuild(task: Tuple[str, int, bool]) -> Dict:
+    """Rehace un perfil en el worker; los errores se devuelven, no se lanzan"""
+    artist, song_count, force = task
+    start = time.perf_counter()
+    try:
+        result = _system.rebuild_profile(artist, force)
+    except Exception as e:
+        result = {'artist': artist, 'songs': song_count, 'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _format_eta(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def rebuild_profiles(song_counts: Dict[str, int], system_factory: Callable, workers: int = 1,
+                     force: bool = False) -> Dict:
+    """
+    Rehace los perfiles de muchos artistas en paralelo
+
+    Args:
+        song_counts: Canciones cacheadas por artista (para repartir la carga)
+        system_factory: Callable (picklable) que construye un SongGemSystem
+        workers: Procesos worker (1 = en este proceso)
+        force: Rehace también los perfiles al día
+
+    Returns:
+        Artistas por resultado ('rebuilt', 'skipped', 'empty', 'failed'),
+        canciones analizadas, segundos y errores por artista
+    """
+    # Los artistas más grandes primero (reparto voraz de la cola)
+    tasks = [(artist, count, force) for artist, count in
+             sorted(song_counts.items(), key=lambda item: (-item[1], item[0]))]
+    total_songs = sum(song_counts.values())
+    summary = {'rebuilt': 0, 'skipped': 0, 'empty': 0, 'failed': 0, 'songs_analyzed': 0, 'errors': {}}
+    print(f"🔁 Reconstruyendo perfiles de {len(tasks)} artistas ({total_songs} canciones) "
+          f"con {workers} worker{'s' if workers != 1 else ''}")
+
+    start = time.perf_counter()
+    pending_songs = total_songs
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(system_factory,))
+        # chunksize=1: cada worker pide un artista cada vez, en el orden de la lista
+        results = pool.imap_unordered(_rebuild, tasks, chunksize=1)
+    else:
+        _init_worker(system_factory)
+        results = map(_rebuild, tasks)
+
+    try:
+        for done, result in enumerate(results, 1):
+            status = result['status']
+            summary[status] += 1
+            METRICS.inc('profile_rebuilds_total', labels={'result': status})
+            pending_songs -= song_counts.get(result['artist'], 0)
+            if status == 'failed':
+                summary['errors'][result['artist']] = result['error']
+                print(f"❌ [{done}/{len(tasks)}] {result['artist']}: {result['error']}")
+            if status != 'rebuilt':
+                continue
+
+            summary['songs_analyzed'] += result['songs']
+            METRICS.observe('profile_rebuild_seconds', result['seconds'])
+            elapsed = time.perf_counter() - start
+            rate = summary['songs_analyzed'] / elapsed if elapsed else 0.0
+            eta = _format_eta(pending_songs / rate) if rate else '?'
+            print(f"✅ [{done}/{len(tasks)}] {result['artist']}: {result['songs']} canciones "
+                  f"en {result['seconds']:.1f}s · {rate:.0f} canciones/s · ETA {eta}")
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+    summary['seconds'] = time.perf_counter() - start
+    rate = summary['songs_analyzed'] / summary['seconds'] if summary['seconds'] else 0.0
+    print(f"🏁 {summary['rebuilt']} perfiles rehechos, {summary['skipped']} al día, "
+          f"{summary['empty']} sin canciones, {summary['failed']} con error "
+          f"en {_format_eta(summary['seconds'])} ({rate:.0f} canciones/s)")
+    return summary
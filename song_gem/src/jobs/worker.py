@@ -0,0 +1,158 @@
+"""
+Procesos worker de la cola de trabajos
+
+Cada worker construye su propio SongGemSystem, reclama trabajos de la cola y
+los ejecuta informando progreso en puntos de control, donde también se
+detecta la cancelación. Al arrancar se devuelven a la cola los trabajos de
+workers de esta máquina que murieron a mitad.
+"""
+
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+from typing import Callable, Dict, List
+
+from jobs.job_queue import JobCancelled, JobQueue, RUNNING
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _run_job(system, job: Dict, progress: Callable[[float, str], None]):
+    """Ejecuta un trabajo sobre el sistema y devuelve su resultado"""
+    params = job['params']
+
+    if job['kind'] == 'analyze':
+        return system.analyze_artist(params['artist'], params.get('max_songs'), progress=progress)
+
+    if job['kind'] == 'generate':
+        progress(0.05, 'Preparando perfil y generación')
+        return system.generate_song(
+            params['artist'],
+            params['theme'],
+            params.get('emotion'),
+            params.get('structure'),
+            params.get('recreate_style', False),
+            params.get('candidates', 1),
+            progress=progress
+        )
+
+    if job['kind'] == 'rewrite':
+        progress(0.05, 'Buscando canción original')
+        return system.rewrite_song_in_style(
+            params['target_artist'],
+            params['original_artist'],
+            params['original_title'],
+            params.get('new_angle'),
+            params.get('candidates', 1),
+            progress=progress
+        )
+
+    raise ValueError(f"Tipo de trabajo desconocido: {job['kind']}")
+
+
+def worker_loop(db_path: str, system_factory: Callable, poll_interval: float = 1.0, max_jobs: int = None):
+    """
+    Bucle de un worker: reclama trabajos de la cola y los ejecuta
+
+    Args:
+        db_path: Ruta de la cola SQLite
+        system_factory: Callable que construye el SongGemSystem del worker
+        poll_interval: Segundos de espera cuando la cola está vacía
+        max_jobs: Termina tras ejecutar este número de trabajos (None = sin límite)
+    """
+    queue = JobQueue(db_path)
+    worker = _worker_id()
+    system = system_factory()
+    done = 0
+
+    print(f"👷 Worker {worker} listo")
+    while max_jobs is None or done < max_jobs:
+        job = queue.claim(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        job_id = job['id']
+        print(f"▶️  Trabajo {job_id} ({job['kind']}) en {worker}")
+
+        def progress(value: float, message: str = None):
+            if queue.update_progress(job_id, value, message):
+                raise JobCancelled(f"Trabajo {job_id} cancelado")
+
+        try:
+            progress(0.0, 'Iniciando')
+            result = _run_job(system, job, progress)
+            # Última comprobación: la cancelación pudo llegar después del último
+            # punto de control (o interrumpir una generación que la convirtió en error)
+            if queue.get(job_id)['cancel_requested']:
+                raise JobCancelled(f"Trabajo {job_id} cancelado")
+            if not result:
+                queue.fail(job_id, 'El trabajo no produjo resultado')
+            elif isinstance(result, dict) and result.get('success') is False:
+                queue.fail(job_id, result.get('error', 'Error desconocido'))
+            else:
+                queue.complete(job_id, result)
+        except JobCancelled:
+            queue.mark_cancelled(job_id)
+            print(f"⏹️  Trabajo {job_id} cancelado")
+        except Exception as e:
+            queue.fail(job_id, f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+            print(f"❌ Trabajo {job_id} falló: {e}")
+        done += 1
+
+
+def requeue_dead_workers(queue: JobQueue) -> int:
+    """Reencola trabajos 'running' de workers de esta máquina que ya no existen"""
+    host = socket.gethostname()
+    dead = set()
+    for job in queue.list(status=RUNNING, limit=10000):
+        worker = job.get('worker') or ''
+        worker_host, _, pid = worker.rpartition(':')
+        if worker_host == host and pid.isdigit() and not _pid_alive(int(pid)):
+            dead.add(worker)
+    return queue.requeue_orphans(sorted(dead))
+
+
+def start_workers(count: int, db_path: str, system_factory: Callable,
+                  poll_interval: float = 1.0) -> List[multiprocessing.Process]:
+    """
+    Lanza procesos worker sobre la cola
+
+    Args:
+        count: Número de procesos
+        db_path: Ruta de la cola SQLite
+        system_factory: Callable (picklable) que construye un SongGemSystem
+        poll_interval: Segundos de espera cuando la cola está vacía
+
+    Returns:
+        Procesos lanzados
+    """
+    requeued = requeue_dead_workers(JobQueue(db_path))
+    if requeued:
+        print(f"♻️  {requeued} trabajos huérfanos devueltos a la cola")
+
+    processes = []
+    for i in range(count):
+        process = multiprocessing.Process(
+            target=worker_loop,
+            args=(db_path, system_factory, poll_interval),
+            name=f"songgem-job-worker-{i}",
+            daemon=True
+        )
+        process.start()
+        processes.append(process)
+    return processes
@@ -7,101 +7,482 @@ Crea canciones originales al estilo de cualquier artista
 import os
 import sys
 import json
+import asyncio
 import argparse
+import functools
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, Dict, List, Optional
 
-# Agregar el directorio src al path
+# Agregar el directorio src (y la raíz del proyecto, para config/) al path
 sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
 
 from scrapers.lyrics_scraper import LyricsScraper
+from analyzers.feature_store import FeatureStore
+from analyzers.languages import preload_languages
+from analyzers.rollup import build_rollup
 from analyzers.style_analyzer import StyleAnalyzer
+from analyzers.token_corpus import TokenCorpus
+from generators.backends import ModelBackend, create_backend
+from generators.generation_store import GENERATION_KINDS, GenerationStore
 from generators.lyrics_generator import LyricsGenerator
+from jobs.job_queue import JOB_KINDS, JobQueue
+from jobs.rebuild import rebuild_profiles
+from jobs.worker import start_workers
+from utils.metrics import METRICS
+from utils.profile_cache import ProfileCache
+from utils.profiling import PROFILE_MODES, format_breakdown, run_profiled, stage_breakdown
+from utils.singleflight import SingleFlight
 from config.settings import *
 
 class SongGemSystem:
     """Sistema principal de SongGem"""
     
-    def __init__(self, gemini_api_key: str, genius_api_key: str):
+    def __init__(self, gemini_api_key: str, genius_api_key: str, backend: ModelBackend = None,
+                 analysis_mode: str = ANALYSIS_MODE, memory_budget_mb: float = STREAMING_MEMORY_BUDGET_MB,
+                 genius_url: str = GENIUS_API_URL):
         """
         Inicializa el sistema
         
         Args:
             gemini_api_key: API key de Google Gemini
             genius_api_key: API key de Genius
+            backend: Backend de generación; por defecto Gemini con gemini_api_key
+            analysis_mode: 'exact', 'streaming', 'approximate' (vocabulario con
+                sketches) o 'auto' (streaming en catálogos grandes)
+            memory_budget_mb: Presupuesto de memoria del análisis en streaming o aproximado
+            genius_url: URL base de la API de Genius
         """
-        self.scraper = LyricsScraper(genius_api_key, LYRICS_CACHE_DIR)
-        self.analyzer = StyleAnalyzer()
-        self.generator = LyricsGenerator(gemini_api_key)
+        self.scraper = LyricsScraper(genius_api_key, LYRICS_CACHE_DIR, client=GENIUS_CLIENT,
+                                     max_connections=GENIUS_MAX_CONNECTIONS, base_url=genius_url,
+                                     lookup_ttl=SONG_LOOKUP_TTL, negative_lookup_ttl=SONG_LOOKUP_NEGATIVE_TTL,
+                                     fresh_ttl=LYRICS_CACHE_FRESH_TTL, hard_expiry=LYRICS_CACHE_HARD_EXPIRY,
+                                     rate_limit=GENIUS_RATE_LIMIT)
+        self.analyzer = StyleAnalyzer(
+            approximate=analysis_mode == 'approximate',
+            memory_budget_mb=memory_budget_mb,
+            sketch_precision=VOCAB_SKETCH_PRECISION,
+            sketch_top_words=VOCAB_SKETCH_TOP_WORDS,
+            default_language=DEFAULT_LANGUAGE,
+            feature_store=FeatureStore(FEATURE_STORE_PATH) if FEATURE_STORE_PATH else None
+        )
+        self.corpus = TokenCorpus(TOKEN_CORPUS_DIR) if TOKEN_CORPUS_DIR else None
+        self.generator = LyricsGenerator(gemini_api_key, backend=backend, corpus=self.corpus,
+                                         candidate_workers=CANDIDATE_WORKERS)
+        self.generations = GenerationStore(GENERATIONS_DB_PATH)
+        self.analysis_mode = analysis_mode
+        self.memory_budget_mb = memory_budget_mb
+        
+        # Peticiones concurrentes idénticas comparten un único cálculo en curso
+        self._flights = SingleFlight()
+        # Perfiles ya cargados o analizados, validados contra el archivo en disco
+        self._profiles = ProfileCache(PROFILE_CACHE_SIZE)
         
         # Crear directorios necesarios
         Path(LYRICS_CACHE_DIR).mkdir(parents=True, exist_ok=True)
         Path(STYLE_PROFILES_DIR).mkdir(parents=True, exist_ok=True)
     
-    def analyze_artist(self, artist_name: str, max_songs: int = None) -> Dict:
+    @staticmethod
+    def _artist_key(artist_name: str) -> str:
+        """Clave normalizada de un artista para rutas y coalescencia"""
+        return artist_name.lower().replace(' ', '_')
+    
+    def _profile_path(self, artist_name: str) -> Path:
+        """Ruta del perfil de estilo de un artista"""
+        return Path(STYLE_PROFILES_DIR) / f"{self._artist_key(artist_name)}_style.json"
+    
+    def analyze_artist(self, artist_name: str, max_songs: int = None,
+                       progress: Callable[[float, str], None] = None) -> Dict:
         """
         Analiza el estilo de un artista
         
+        Llamadas concurrentes para el mismo artista comparten un único
+        scraping + análisis.
+        
         Args:
             artist_name: Nombre del artista
             max_songs: Número máximo de canciones a analizar
+            progress: Callback (fracción, mensaje) llamado entre etapas
             
         Returns:
             Perfil de estilo del artista
         """
         max_songs = max_songs or MAX_SONGS_PER_ARTIST
-        
+        key = ('analyze', self._artist_key(artist_name), max_songs)
+        return self._flights.do(key, self._analyze_artist, artist_name, max_songs, progress)
+    
+    async def analyze_artist_async(self, artist_name: str, max_songs: int = None) -> Dict:
+        """Versión asyncio de analyze_artist (coalescida con las llamadas síncronas)"""
+        max_songs = max_songs or MAX_SONGS_PER_ARTIST
+        key = ('analyze', self._artist_key(artist_name), max_songs)
+        return await self._flights.do_async(key, self._analyze_artist, artist_name, max_songs)
+    
+    def _analyze_artist(self, artist_name: str, max_songs: int,
+                        progress: Callable[[float, str], None] = None) -> Dict:
+        """Scraping, análisis y guardado del perfil (sin coalescencia)"""
+        progress = progress or (lambda fraction, message=None: None)
         print(f"🎵 Analizando estilo de {artist_name}...")
         
-        # Extraer canciones
-        songs = self.scraper.get_artist_songs(artist_name, max_songs)
+        # Extraer canciones; un catálogo cacheado que se analizará en streaming
+        # se lee canción a canción en lugar de cargar el JSON entero
+        progress(0.05, 'Extrayendo canciones')
+        cached_count = self.scraper.cached_song_count(artist_name)
+        # La caché fresca o antigua se sirve tal cual: su huella es la de antes
+        # de un posible refresco en segundo plano; si se descarga, la del JSON nuevo
+        info = self.scraper.cache_info(artist_name)
+        served_digest = self.scraper.cache_digest(artist_name) if info and info['state'] != 'expired' else None
+        with METRICS.timer('scrape'):
+            songs = self.scraper.get_artist_songs(
+                artist_name, max_songs,
+                progress=lambda done, total: progress(0.05 + 0.55 * done / total,
+                                                      f'Extrayendo canciones ({done}/{total})'),
+                stream=bool(cached_count) and self._use_streaming(cached_count)
+            )
+        song_count = len(songs) if isinstance(songs, list) else cached_count
         
-        if not songs:
+        if not song_count:
             print(f"❌ No se encontraron canciones para {artist_name}")
             return {}
         
-        print(f"✅ Se encontraron {len(songs)} canciones")
+        print(f"✅ Se encontraron {song_count} canciones")
+        digest = served_digest or self.scraper.cache_digest(artist_name)
+        if digest and not served_digest and self.corpus is not None:
+            # Catálogo recién descargado: al corpus antes de buscar sus palabras distintivas
+            self.build_corpus()
+        fingerprint = self._source_fingerprint(digest, song_count)
         
         # Analizar estilo
-        style_profile = self.analyzer.generate_style_profile(artist_name, songs)
+        progress(0.6, f'Analizando {song_count} canciones')
+        with METRICS.timer('analyze'):
+            if self._use_streaming(song_count):
+                style_profile = self.analyzer.generate_style_profile_streaming(
+                    artist_name, songs, self.memory_budget_mb
+                )
+            else:
+                style_profile = self.analyzer.generate_style_profile(artist_name, songs)
+            if not style_profile:
+                print(f"❌ No se encontraron canciones para {artist_name}")
+                return {}
+            self._add_corpus_profile(artist_name, style_profile)
+        if fingerprint:
+            style_profile['source_fingerprint'] = fingerprint
         
         # Guardar perfil
-        profile_path = Path(STYLE_PROFILES_DIR) / f"{artist_name.lower().replace(' ', '_')}_style.json"
-        self.analyzer.save_style_profile(style_profile, str(profile_path))
+        progress(0.95, 'Guardando perfil')
+        profile_path = self._profile_path(artist_name)
+        with METRICS.timer('profile_save'):
+            self.analyzer.save_style_profile(style_profile, str(profile_path))
+        self._profiles.put(self._artist_key(artist_name), profile_path, style_profile)
         
         print(f"✅ Perfil de estilo guardado en {profile_path}")
         
         return style_profile
     
+    def _source_fingerprint(self, digest: Optional[str], song_count: int) -> Optional[str]:
+        """
+        Huella de todo lo que determina un perfil ('source_fingerprint')
+        
+        Args:
+            digest: Hash del JSON de la caché analizado (None si no hay caché)
+            song_count: Canciones analizadas (deciden el modo de análisis)
+            
+        Returns:
+            "hash:versión del analizador[:c<generación del corpus>]", o None sin hash
+        """
+        if not digest:
+            return None
+        if self._use_streaming(song_count):
+            mode = 'streaming'
+        else:
+            mode = 'approximate' if self.analyzer.approximate else 'exact'
+        fingerprint = f"{digest}:{self.analyzer.analyzer_version(mode, self.memory_budget_mb)}"
+        if self.corpus is not None:
+            # Las palabras distintivas dependen de toda la caché
+            fingerprint += f":c{self.corpus.generation()}"
+        return fingerprint
+    
+    def _add_corpus_profile(self, artist_name: str, style_profile: Dict):
+        """Añade las palabras que distinguen al artista del resto de la caché (si está en el corpus)"""
+        if self.corpus is None:
+            return
+        language = style_profile.get('language_profile', {}).get('dominant_language')
+        corpus_profile = self.analyzer.analyze_corpus_vocabulary(self.corpus, self._artist_key(artist_name), language)
+        if corpus_profile:
+            style_profile['corpus_profile'] = corpus_profile
+    
+    def build_corpus(self) -> Dict:
+        """
+        Compila la caché de letras en el corpus de IDs de tokens
+        
+        Es incremental: solo se tokenizan los artistas nuevos o cuyo JSON
+        cambió desde la última compilación.
+        
+        Returns:
+            Artistas añadidos, actualizados y retirados (vacío sin corpus)
+        """
+        if self.corpus is None:
+            print("❌ No hay directorio de corpus configurado (TOKEN_CORPUS_DIR)")
+            return {}
+        with METRICS.timer('corpus_build'):
+            result = self.corpus.update(LYRICS_CACHE_DIR)
+        stats = self.corpus.stats()
+        print(f"✅ Corpus: {result['added']} artistas añadidos, {result['updated']} actualizados, "
+              f"{result['removed']} retirados{' (compactado)' if result['compacted'] else ''}")
+        print(f"   {stats['artists']} artistas, {stats['songs']} canciones, {stats['tokens']} tokens, "
+              f"{stats['vocabulary']} palabras distintas, {stats['ngrams']} n-gramas")
+        if stats['dead_tokens']:
+            print(f"   {stats['dead_tokens']} tokens obsoletos pendientes de compactar")
+        return result
+    
+    def _use_streaming(self, song_count: int) -> bool:
+        """Decide si el análisis se hace en streaming con memoria acotada"""
+        if self.analysis_mode == 'auto':
+            return song_count >= STREAMING_ANALYSIS_THRESHOLD
+        return self.analysis_mode == 'streaming'
+    
+    def _get_style_profile(self, artist_name: str, recreate_style: bool = False) -> Dict:
+        """
+        Carga el perfil existente o analiza al artista si no existe
+        
+        Args:
+            artist_name: Nombre del artista
+            recreate_style: Si True, reanaliza aunque exista el perfil
+            
+        Returns:
+            Perfil de estilo (vacío si no se pudo obtener)
+        """
+        key = ('profile', self._artist_key(artist_name), recreate_style)
+        return self._flights.do(key, self._load_or_analyze, artist_name, recreate_style)
+    
+    def profile_cache_info(self) -> Dict:
+        """Estado de la caché de perfiles en memoria"""
+        return self._profiles.info()
+    
+    def _load_or_analyze(self, artist_name: str, recreate_style: bool) -> Dict:
+        """Carga el perfil de memoria o disco, o lo crea (sin coalescencia)"""
+        key = self._artist_key(artist_name)
+        profile_path = self._profile_path(artist_name)
+        
+        if not recreate_style:
+            cached = self._profiles.get(key, profile_path)
+            if cached:
+                return cached
+        
+        if profile_path.exists() and not recreate_style:
+            print("📂 Cargando perfil de estilo existente...")
+            with METRICS.timer('profile_load'):
+                return self._profiles.load(key, profile_path, self.analyzer.load_style_profile)
+        
+        print("🔍 Analizando nuevo perfil de estilo...")
+        return self.analyze_artist(artist_name)
+    
+    def sync_cache(self, artists: List[str] = None) -> Dict[str, int]:
+        """
+        Trae las canciones nuevas de los artistas cacheados y actualiza sus perfiles
+        
+        Solo se descargan las canciones publicadas desde la última descarga;
+        los artistas con novedades y perfil guardado se reanalizan desde la
+        caché, ya al día, sin volver a pedir su catálogo a Genius.
+        
+        Args:
+            artists: Artistas a sincronizar (por defecto, todos los cacheados)
+            
+        Returns:
+            Canciones nuevas por artista
+        """
+        with METRICS.timer('sync'):
+            added = self.scraper.sync_artists(artists, SYNC_MAX_NEW_SONGS)
+        
+        changed = [artist for artist, count in added.items() if count]
+        print(f"✅ {sum(added.values())} canciones nuevas en {len(changed)} de {len(added)} artistas")
+        if changed and self.corpus is not None:
+            self.build_corpus()
+        for artist in changed:
+            if self._profile_path(artist).exists():
+                self.analyze_artist(artist)
+        return added
+    
+    def rebuild_profile(self, artist_name: str, force: bool = False) -> Dict:
+        """
+        Rehace el perfil de un artista cacheado desde la caché de letras
+    
+        Los perfiles (también los de analyze_artist y sync_cache) guardan en
+        'source_fingerprint' el hash del JSON de la caché, la versión del
+        analizador y la generación del corpus de tokens con que se hicieron;
+        si nada ha cambiado se deja como está sin parsear la caché. Nunca pide
+        nada a Genius.
+    
+        Args:
+            artist_name: Artista cacheado
+            force: Rehace el perfil aunque su huella coincida
+    
+        Returns:
+            artist, songs y status ('rebuilt', 'skipped' o 'empty')
+        """
+        cached_count = self.scraper.cached_song_count(artist_name)
+        profile_path = self._profile_path(artist_name)
+        current = None
+        if not force and profile_path.exists():
+            current = (self.analyzer.load_style_profile(str(profile_path)) or {}).get('source_fingerprint')
+        # Con el número de canciones del índice basta el hash del JSON para saltarlo, sin parsearlo
+        if current and cached_count and \
+                current == self._source_fingerprint(self.scraper.cache_digest(artist_name), cached_count):
+            return {'artist': artist_name, 'songs': cached_count, 'status': 'skipped'}
+    
+        stream = bool(cached_count) and self._use_streaming(cached_count)
+        songs, digest = self.scraper.get_cached_catalog(artist_name, stream=stream)
+        song_count = cached_count if stream else len(songs or [])
+        if not song_count:
+            return {'artist': artist_name, 'songs': 0, 'status': 'empty'}
+        fingerprint = self._source_fingerprint(digest, song_count)
+        if current and not stream and current == fingerprint:
+            return {'artist': artist_name, 'songs': song_count, 'status': 'skipped'}
+    
+        streaming = stream or self._use_streaming(song_count)
+        with METRICS.timer('analyze'):
+            if streaming:
+                style_profile = self.analyzer.generate_style_profile_streaming(
+                    artist_name, songs, self.memory_budget_mb
+                )
+            else:
+                style_profile = self.analyzer.generate_style_profile(artist_name, songs)
+            if not style_profile:
+                return {'artist': artist_name, 'songs': 0, 'status': 'empty'}
+            self._add_corpus_profile(artist_name, style_profile)
+        style_profile['source_fingerprint'] = fingerprint
+        with METRICS.timer('profile_save'):
+            self.analyzer.save_style_profile(style_profile, str(profile_path))
+        self._profiles.put(self._artist_key(artist_name), profile_path, style_profile)
+        return {'artist': artist_name, 'songs': song_count, 'status': 'rebuilt'}
+    
+    def rollup_artists(self, name: str, artists: List[str]) -> Dict:
+        """
+        Agrega el vocabulario de varios artistas (género, sello...)
+        
+        Combina los resúmenes guardados en sus perfiles (analizando a los
+        que aún no tengan perfil) y guarda el resultado en
+        STYLE_PROFILES_DIR/rollups/<nombre>.json.
+        
+        Args:
+            name: Nombre del agregado
+            artists: Artistas que lo forman
+            
+        Returns:
+            Agregado de vocabulario (vacío si no se pudo construir)
+        """
+        print(f"🧮 Agregando vocabulario de {len(artists)} artistas en '{name}'...")
+        profiles = [profile for profile in (self._get_style_profile(a) for a in artists) if profile]
+        if not profiles:
+            print("❌ No se pudo obtener el perfil de ningún artista")
+            return {}
+        
+        try:
+            rollup = build_rollup(name, profiles, VOCAB_SKETCH_TOP_WORDS)
+        except ValueError as e:
+            print(f"❌ No se pudo crear el agregado: {e}")
+            return {}
+        
+        if rollup['skipped_artists']:
+            print(f"⚠️  Perfiles sin resúmenes de vocabulario (reanalízalos): {', '.join(rollup['skipped_artists'])}")
+        
+        rollup_path = Path(STYLE_PROFILES_DIR) / "rollups" / f"{self._artist_key(name)}.json"
+        rollup_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(rollup_path, 'w', encoding='utf-8') as f:
+            json.dump(rollup, f, ensure_ascii=False, indent=2)
+        
+        vocab = rollup['vocabulary_profile']
+        print(f"✅ {len(rollup['artists'])} artistas, {vocab['total_words']} palabras, "
+              f"~{vocab['unique_words']} distintas (solapamiento {vocab['vocabulary_overlap']:.0%})")
+        print(f"   Más frecuentes: {', '.join(word for word, _ in vocab['most_common_words'][:10])}")
+        print(f"💾 Agregado guardado en {rollup_path}")
+        return rollup
+    
     def generate_song(self, 
                      artist_name: str,
                      theme: str,
                      emotion: str = None,
                      structure: str = None,
-                     recreate_style: bool = False) -> Dict:
+                     recreate_style: bool = False,
+                     candidate_count: int = 1,
+                     progress: Callable[[float, str], None] = None) -> Dict:
         """
         Genera una canción al estilo de un artista
         
+        Peticiones concurrentes idénticas (mismo artista, tema, emoción,
+        estructura, recreate_style y candidatos) comparten una única generación.
+        
         Args:
             artist_name: Artista cuyo estilo se usará
             theme: Tema de la nueva canción
             emotion: Emoción deseada
             structure: Estructura deseada
             recreate_style: Si True, reanaliza al artista
+            candidate_count: Número de candidatos a generar y reordenar (best-of-N)
+            progress: Callback (fracción, mensaje) llamado con cada candidato
             
         Returns:
             Canción generada
         """
         print(f"🎵 Generando canción al estilo de {artist_name}...")
         
-        # Cargar o crear perfil de estilo
-        profile_path = Path(STYLE_PROFILES_DIR) / f"{artist_name.lower().replace(' ', '_')}_style.json"
+        key = self._generation_key(artist_name, theme, emotion, structure, recreate_style, candidate_count)
+        song_data = self._flights.do(
+            key, self._generate_and_save,
+            artist_name, theme, emotion, structure, recreate_style, candidate_count, progress
+        )
         
-        if profile_path.exists() and not recreate_style:
-            print("📂 Cargando perfil de estilo existente...")
-            style_profile = self.analyzer.load_style_profile(str(profile_path))
-        else:
-            print("🔍 Analizando nuevo perfil de estilo...")
-            style_profile = self.analyze_artist(artist_name)
+        if song_data.get('success'):
+            # Mostrar resultado
+            print("\n" + "="*60)
+            print(self.generator.format_song_for_display(song_data))
+            print("="*60)
+        elif song_data:
+            print(f"❌ Error generando canción: {song_data.get('error')}")
+        
+        return song_data
+    
+    async def generate_song_async(self,
+                                  artist_name: str,
+                                  theme: str,
+                                  emotion: str = None,
+                                  structure: str = None,
+                                  recreate_style: bool = False,
+                                  candidate_count: int = 1) -> Dict:
+        """Versión asyncio de generate_song (sin salida por consola, coalescida)"""
+        key = self._generation_key(artist_name, theme, emotion, structure, recreate_style, candidate_count)
+        return await self._flights.do_async(
+            key, self._generate_and_save,
+            artist_name, theme, emotion, structure, recreate_style, candidate_count
+        )
+    
+    def _generation_key(self, artist_name: str, theme: str, emotion: str,
+                        structure: str, recreate_style: bool, candidate_count: int) -> tuple:
+        """Clave de coalescencia de una petición de generación"""
+        normalize = lambda value: (value or '').strip().lower()
+        # recreate_style forma parte de la clave: una petición que fuerza el
+        # reanálisis no debe conformarse con una generación sobre el perfil viejo
+        return ('generate', self._artist_key(artist_name), normalize(theme),
+                normalize(emotion), normalize(structure), bool(recreate_style), candidate_count)
+    
+    @staticmethod
+    def _candidate_progress(progress: Optional[Callable[[float, str], None]]) -> Optional[Callable[[int, int], None]]:
+        """Traduce los candidatos recibidos al progreso (0.1-0.9) de un trabajo"""
+        if progress is None:
+            return None
+        return lambda done, total: progress(0.1 + 0.8 * done / total, f'Candidato {done}/{total}')
+    
+    def _generate_and_save(self,
+                           artist_name: str,
+                           theme: str,
+                           emotion: str,
+                           structure: str,
+                           recreate_style: bool,
+                           candidate_count: int,
+                           progress: Callable[[float, str], None] = None) -> Dict:
+        """Obtiene el perfil, genera y guarda la canción (sin coalescencia)"""
+        # Cargar o crear perfil de estilo
+        style_profile = self._get_style_profile(artist_name, recreate_style)
         
         if not style_profile:
             print(f"❌ No se pudo obtener el perfil de estilo de {artist_name}")
@@ -112,26 +493,16 @@ class SongGemSystem:
             style_profile=style_profile,
             new_theme=theme,
             emotion=emotion,
-            structure=structure
+            structure=structure,
+            candidate_count=candidate_count,
+            progress=self._candidate_progress(progress)
         )
         
         if song_data.get('success'):
-            # Guardar canción
-            output_dir = Path("data/generated_songs")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            filename = f"{artist_name.lower().replace(' ', '_')}_{theme.lower().replace(' ', '_')}.json"
-            output_path = output_dir / filename
-            
-            self.generator.save_generated_song(song_data, str(output_path))
-            print(f"✅ Canción guardada en {output_path}")
-            
-            # Mostrar resultado
-            print("\n" + "="*60)
-            print(self.generator.format_song_for_display(song_data))
-            print("="*60)
-        else:
-            print(f"❌ Error generando canción: {song_data.get('error')}")
+            # Guardar canción (cada generación con su ID, sin sobrescribir las anteriores)
+            with METRICS.timer('save'):
+                generation_id = self.generations.add(song_data, kind='generate')
+            print(f"✅ Canción guardada con ID {generation_id}")
         
         return song_data
     
@@ -139,7 +510,9 @@ class SongGemSystem:
                              target_artist: str,
                              original_artist: str,
                              original_song_title: str,
-                             new_angle: str = None) -> Dict:
+                             new_angle: str = None,
+                             candidate_count: int = 1,
+                             progress: Callable[[float, str], None] = None) -> Dict:
         """
         Reescribe una canción al estilo de otro artista
         
@@ -148,12 +521,55 @@ class SongGemSystem:
             original_artist: Artista de la canción original
             original_song_title: Título de la canción original
             new_angle: Nuevo enfoque para la canción
+            candidate_count: Número de candidatos a generar y reordenar (best-of-N)
+            progress: Callback (fracción, mensaje) llamado con cada candidato
             
         Returns:
             Canción reescrita
         """
         print(f"🔄 Reescribiendo '{original_song_title}' al estilo de {target_artist}...")
         
+        rewritten_data = self._rewrite_and_save(
+            target_artist, original_artist, original_song_title, new_angle, candidate_count, progress
+        )
+        
+        if rewritten_data.get('success'):
+            # Mostrar resultado
+            print("\n" + "="*60)
+            print("🎵 CANCIÓN REESCRITA 🎵")
+            print(f"Original: '{rewritten_data['original_song']['title']}' por {original_artist}")
+            print(f"Estilo: {target_artist}")
+            if new_angle:
+                print(f"Nuevo enfoque: {new_angle}")
+            print("="*60)
+            print(self.generator.format_song_for_display(rewritten_data))
+            print("="*60)
+        elif rewritten_data:
+            print(f"❌ Error reescribiendo canción: {rewritten_data.get('error')}")
+        
+        return rewritten_data
+    
+    async def rewrite_song_async(self,
+                                 target_artist: str,
+                                 original_artist: str,
+                                 original_song_title: str,
+                                 new_angle: str = None,
+                                 candidate_count: int = 1) -> Dict:
+        """Versión asyncio de rewrite_song_in_style (sin salida por consola)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._rewrite_and_save,
+            target_artist, original_artist, original_song_title, new_angle, candidate_count
+        )
+    
+    def _rewrite_and_save(self,
+                          target_artist: str,
+                          original_artist: str,
+                          original_song_title: str,
+                          new_angle: str,
+                          candidate_count: int,
+                          progress: Callable[[float, str], None] = None) -> Dict:
+        """Busca la original, reescribe y guarda el resultado"""
         # Obtener canción original
         original_song = self.scraper.search_song(original_artist, original_song_title)
         
@@ -163,43 +579,28 @@ class SongGemSystem:
         
         print(f"✅ Canción original encontrada: '{original_song['title']}'")
         
-        # Analizar estilo del artista objetivo
-        style_profile = self.analyze_artist(target_artist)
+        # Reutilizar el perfil del artista objetivo (solo se analiza si no existe)
+        style_profile = self._get_style_profile(target_artist)
         
         if not style_profile:
-            print(f"❌ No se pudo analizar el estilo de {target_artist}")
+            print(f"❌ No se pudo obtener el perfil de estilo de {target_artist}")
             return {}
         
         # Reescribir canción
         rewritten_data = self.generator.rewrite_song_in_style(
             style_profile=style_profile,
             original_song=original_song,
-            new_angle=new_angle
+            new_angle=new_angle,
+            candidate_count=candidate_count,
+            progress=self._candidate_progress(progress)
         )
+        rewritten_data['original_song'] = {'title': original_song['title'], 'artist': original_artist}
         
         if rewritten_data.get('success'):
             # Guardar resultado
-            output_dir = Path("data/rewritten_songs")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            filename = f"{original_artist.lower().replace(' ', '_')}_{original_song_title.lower().replace(' ', '_')}_as_{target_artist.lower().replace(' ', '_')}.json"
-            output_path = output_dir / filename
-            
-            self.generator.save_generated_song(rewritten_data, str(output_path))
-            print(f"✅ Canción reescrita guardada en {output_path}")
-            
-            # Mostrar resultado
-            print("\n" + "="*60)
-            print("🎵 CANCIÓN REESCRITA 🎵")
-            print(f"Original: '{original_song['title']}' por {original_artist}")
-            print(f"Estilo: {target_artist}")
-            if new_angle:
-                print(f"Nuevo enfoque: {new_angle}")
-            print("="*60)
-            print(self.generator.format_song_for_display(rewritten_data))
-            print("="*60)
-        else:
-            print(f"❌ Error reescribiendo canción: {rewritten_data.get('error')}")
+            with METRICS.timer('save'):
+                generation_id = self.generations.add(rewritten_data, kind='rewrite')
+            print(f"✅ Canción reescrita guardada con ID {generation_id}")
         
         return rewritten_data
     
@@ -257,47 +658,335 @@ class SongGemSystem:
             else:
                 print("❌ Opción no válida. Intenta de nuevo.")
     
-    def show_analyzed_artists(self):
-        """Muestra los artistas que han sido analizados"""
-        profiles_dir = Path(STYLE_PROFILES_DIR)
+    def list_analyzed_artists(self) -> List[Dict]:
+        """
+        Lista los artistas con perfil de estilo guardado
         
+        Returns:
+            Resumen (artista, canciones analizadas, estilo) de cada perfil
+        """
+        profiles_dir = Path(STYLE_PROFILES_DIR)
         if not profiles_dir.exists():
-            print("No hay artistas analizados aún.")
-            return
+            return []
         
-        profiles = list(profiles_dir.glob("*_style.json"))
+        artists = []
+        for profile_file in sorted(profiles_dir.glob("*_style.json")):
+            try:
+                profile = self.analyzer.load_style_profile(str(profile_file))
+            except Exception as e:
+                artists.append({'file': profile_file.name, 'error': str(e)})
+                continue
+            if profile:
+                artists.append({
+                    'artist_name': profile.get('artist_name', 'Unknown'),
+                    'total_songs_analyzed': profile.get('total_songs_analyzed', 0),
+                    'writing_style_summary': profile.get('writing_style_summary', '')
+                })
+        return artists
+    
+    def show_analyzed_artists(self):
+        """Muestra los artistas que han sido analizados"""
+        artists = self.list_analyzed_artists()
         
-        if not profiles:
+        if not artists:
             print("No hay artistas analizados aún.")
             return
         
         print("\n🎵 Artistas Analizados:")
         print("-" * 30)
         
-        for profile_file in profiles:
+        for entry in artists:
+            if 'error' in entry:
+                print(f"Error leyendo {entry['file']}: {entry['error']}")
+                continue
+            
+            print(f"• {entry['artist_name']}")
+            print(f"  Canciones analizadas: {entry['total_songs_analyzed']}")
+            print(f"  Estilo: {entry['writing_style_summary']}")
+            print()
+
+
+def print_metrics(output_format: str = 'text'):
+    """Muestra las métricas acumuladas en el formato pedido"""
+    if output_format == 'json':
+        print(METRICS.to_json())
+    elif output_format == 'prometheus':
+        print(METRICS.to_prometheus())
+    else:
+        print("\n" + METRICS.summary())
+
+
+def build_system(gemini_key: str, genius_key: str, backend_name: str,
+                 stub_outputs: str = None, stub_latency: float = 0.0,
+                 analysis_mode: str = ANALYSIS_MODE,
+                 memory_budget_mb: float = STREAMING_MEMORY_BUDGET_MB,
+                 genius_url: str = GENIUS_API_URL) -> SongGemSystem:
+    """Construye un SongGemSystem con su backend (usado también por los workers)"""
+    backend = create_backend(backend_name, gemini_key, stub_outputs, stub_latency)
+    return SongGemSystem(gemini_key, genius_key, backend=backend,
+                         analysis_mode=analysis_mode, memory_budget_mb=memory_budget_mb,
+                         genius_url=genius_url)
+
+
+def system_factory(args) -> Callable[[], SongGemSystem]:
+    """Constructor picklable del sistema de la CLI para los procesos worker"""
+    return functools.partial(
+        build_system, args.gemini_key, args.genius_key, args.backend,
+        args.stub_outputs, args.stub_latency, args.analysis_mode, args.memory_budget,
+        args.genius_url
+    )
+
+
+def job_params(args) -> Dict:
+    """Parámetros de un trabajo a partir de los argumentos de la CLI"""
+    if args.job_submit == 'analyze':
+        return {'artist': args.analyze or args.artist, 'max_songs': args.max_songs}
+    if args.job_submit == 'generate':
+        return {
+            'artist': args.artist,
+            'theme': args.theme,
+            'emotion': args.emotion,
+            'structure': args.structure,
+            'candidates': args.candidates,
+        }
+    return {
+        'target_artist': args.target_artist,
+        'original_artist': args.original_artist,
+        'original_title': args.original_title,
+        'new_angle': args.new_angle,
+        'candidates': args.candidates,
+    }
+
+
+def show_job(job: Dict, with_result: bool = False):
+    """Muestra el estado de un trabajo"""
+    print(f"🧾 Trabajo {job['id']} ({job['kind']}, prioridad {job['priority']})")
+    print(f"  Estado: {job['status']}{' (cancelación solicitada)' if job['cancel_requested'] else ''}")
+    print(f"  Progreso: {job['progress'] * 100:.0f}%{' - ' + job['message'] if job['message'] else ''}")
+    if job['worker']:
+        print(f"  Worker: {job['worker']}")
+    if job['error'] and job['status'] != 'cancelled':
+        print(f"  Error: {job['error'].splitlines()[0]}")
+    if with_result and job['result'] is not None:
+        print(json.dumps(job['result'], ensure_ascii=False, indent=2))
+
+
+def run_job_command(args, parser) -> int:
+    """Ejecuta los comandos de la cola de trabajos que no necesitan el sistema"""
+    queue = JobQueue(args.jobs_db)
+
+    if args.job_submit:
+        params = job_params(args)
+        required = {
+            'analyze': ['artist'],
+            'generate': ['artist', 'theme'],
+            'rewrite': ['target_artist', 'original_artist', 'original_title'],
+        }[args.job_submit]
+        missing = [name for name in required if not params.get(name)]
+        if missing:
+            parser.error(f"--job-submit {args.job_submit} requiere: {', '.join(missing)}")
+        job_id = queue.submit(args.job_submit, params, args.priority)
+        print(f"📥 Trabajo {job_id} encolado ({args.job_submit}, prioridad {args.priority})")
+        return 0
+
+    if args.job_list:
+        jobs = queue.list()
+        if not jobs:
+            print("No hay trabajos en la cola.")
+        for job in jobs:
+            print(f"{job['id']:>5}  {job['kind']:<9} {job['status']:<10} "
+                  f"{job['progress'] * 100:>3.0f}%  p={job['priority']:<3} {job['message'] or ''}")
+        return 0
+
+    job_id = args.job_status or args.job_result or args.job_cancel
+    if args.job_cancel:
+        status = queue.cancel(job_id)
+        if status is None:
+            print(f"❌ No existe el trabajo {job_id}")
+            return 1
+        print(f"⏹️  Trabajo {job_id}: {status}"
+              f"{' (se detendrá en el siguiente punto de control)' if status == 'running' else ''}")
+        return 0
+
+    job = queue.get(job_id)
+    if job is None:
+        print(f"❌ No existe el trabajo {job_id}")
+        return 1
+    show_job(job, with_result=bool(args.job_result))
+    return 0 if job['status'] != 'failed' else 1
+
+
+def parse_date(value: str) -> float:
+    """Fecha ISO de la CLI ('2024-05-01' o '2024-05-01T18:30') como timestamp"""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def run_generation_command(args, parser) -> int:
+    """Consulta e importación del almacén de generaciones (no necesitan el sistema)"""
+    store = GenerationStore(args.generations_db)
+    
+    if args.import_generations:
+        imported = sum(
+            store.import_files(sorted(Path(directory).glob('*.json')), kind)
+            for directory, kind in (("data/generated_songs", 'generate'), ("data/rewritten_songs", 'rewrite'))
+        )
+        print(f"📥 {imported} generaciones importadas en {args.generations_db}")
+        return 0
+    
+    if args.generation:
+        song_data = store.get(args.generation)
+        if song_data is None:
+            print(f"❌ No existe la generación {args.generation}")
+            return 1
+        print(json.dumps(song_data, ensure_ascii=False, indent=2))
+        return 0
+    
+    try:
+        filters = {
+            'artist': args.artist,
+            'theme': args.theme,
+            'kind': args.kind,
+            'since': parse_date(args.since) if args.since else None,
+            'until': parse_date(args.until) if args.until else None,
+            'min_originality': args.min_originality,
+        }
+    except ValueError as e:
+        parser.error(f"Fecha inválida: {e}")
+    generations = store.query(order=args.order, limit=args.limit, **filters)
+    print(f"🗂️  {store.count(**filters)} generaciones (mostrando {len(generations)})")
+    for generation in generations:
+        created = datetime.fromtimestamp(generation['created_at']).strftime('%Y-%m-%d %H:%M')
+        score = generation['originality_score']
+        subject = (f"'{generation['original_title']}' de {generation['original_artist']}"
+                   if generation['kind'] == 'rewrite' else generation['theme'])
+        print(f"{generation['id']}  {created}  {'-' if score is None else f'{score:.2f}':>5}  "
+              f"{generation['kind']:<8} {generation['artist']} · {subject}")
+    return 0
+
+
+def run_rebuild_command(args) -> int:
+    """Rehace en paralelo los perfiles de los artistas cacheados (--rebuild-profiles)"""
+    factory = system_factory(args)
+    try:
+        system = factory()
+    except Exception as e:
+        print(f"❌ Error inicializando el sistema: {e}")
+        return 1
+    song_counts = system.scraper.cached_song_counts()
+    # Las palabras distintivas de cada perfil se calculan contra la caché actual
+    if system.corpus is not None:
+        system.build_corpus()
+    
+    if args.artists:
+        wanted = {a.strip().lower() for a in args.artists.split(',') if a.strip()}
+        song_counts = {artist: count for artist, count in song_counts.items() if artist.lower() in wanted}
+    if not song_counts:
+        print("❌ No hay artistas cacheados que reconstruir")
+        return 1
+    
+    # Cargados en el padre, los recursos de idioma se comparten con los hijos
+    preload_languages(PRELOAD_LANGUAGES)
+    summary = rebuild_profiles(song_counts, factory, args.rebuild_workers or os.cpu_count() or 1, args.force)
+    if args.metrics:
+        print_metrics(args.metrics)
+    return 1 if summary['failed'] else 0
+
+
+def run_command(args, parser) -> int:
+    """Inicializa el sistema y ejecuta el modo pedido en la CLI"""
+    # Inicializar sistema
+    try:
+        system = build_system(args.gemini_key, args.genius_key, args.backend,
+                              args.stub_outputs, args.stub_latency,
+                              args.analysis_mode, args.memory_budget, args.genius_url)
+    except Exception as e:
+        print(f"❌ Error inicializando el sistema: {e}")
+        return 1
+    
+    # Ejecutar modo correspondiente
+    try:
+        if args.serve:
+            from server import run_server
+            run_server(system, args.host, args.port, args.workers, MAX_CANDIDATES)
+        
+        elif args.interactive:
+            system.interactive_mode()
+        
+        elif args.analyze:
+            system.analyze_artist(args.analyze, args.max_songs)
+        
+        elif args.search or args.ending:
             try:
-                profile = self.analyzer.load_style_profile(str(profile_file))
-                if profile:
-                    artist = profile.get('artist_name', 'Unknown')
-                    songs = profile.get('total_songs_analyzed', 0)
-                    summary = profile.get('writing_style_summary', '')
-                    
-                    print(f"• {artist}")
-                    print(f"  Canciones analizadas: {songs}")
-                    print(f"  Estilo: {summary}")
-                    print()
-            except Exception as e:
-                print(f"Error leyendo {profile_file.name}: {e}")
+                songs = system.scraper.search_lyrics(args.search, args.ending, args.artist, args.limit)
+            except (ValueError, RuntimeError) as e:
+                parser.error(str(e))
+            if not songs:
+                print("🔍 Ninguna letra cacheada coincide")
+            for song in songs:
+                print(f"🎵 {song['artist']} - {song['title']} ({song['matches']} líneas)")
+                for line in song['lines']:
+                    print(f"   {line['line_no'] + 1:>4}: {line['line']}")
+        
+        elif args.build_corpus:
+            if not system.build_corpus():
+                return 1
+        
+        elif args.sync is not None:
+            artists = [a.strip() for a in args.sync.split(',') if a.strip()]
+            system.sync_cache(artists or None)
+        
+        elif args.rollup:
+            artists = [a.strip() for a in (args.artists or '').split(',') if a.strip()]
+            if not artists:
+                parser.error('--rollup requiere --artists "Artista 1,Artista 2"')
+            if not system.rollup_artists(args.rollup, artists):
+                return 1
+        
+        elif args.generate and args.artist and args.theme:
+            system.generate_song(
+                args.artist,
+                args.theme,
+                args.emotion,
+                args.structure,
+                candidate_count=args.candidates
+            )
+        
+        elif args.rewrite and all([args.target_artist, args.original_artist, args.original_title]):
+            system.rewrite_song_in_style(
+                args.target_artist,
+                args.original_artist,
+                args.original_title,
+                args.new_angle,
+                candidate_count=args.candidates
+            )
+        
+        else:
+            parser.print_help()
+            return 1
+    finally:
+        # Fuera del servidor, los refrescos de caché en segundo plano se
+        # terminan antes de salir (el proceso mataría sus hilos a medias)
+        if not args.serve:
+            system.scraper.wait_for_refreshes()
+    
+    return 0
 
 
 def main():
     """Función principal del sistema"""
     parser = argparse.ArgumentParser(description='SongGem - Generador de Canciones con IA')
-    parser.add_argument('--gemini-key', required=True, help='API key de Google Gemini')
-    parser.add_argument('--genius-key', required=True, help='API key de Genius')
+    parser.add_argument('--gemini-key', help='API key de Google Gemini (requerida con --backend gemini)')
+    parser.add_argument('--genius-key', help='API key de Genius (requerida salvo en los comandos de la cola)')
+    parser.add_argument('--genius-url', default=GENIUS_API_URL,
+                        help='URL base de la API de Genius (p. ej. benchmarks/mock_genius.py)')
+    parser.add_argument('--backend', choices=['gemini', 'stub'], default=GENERATION_BACKEND,
+                        help='Backend de generación (stub = local, sin red)')
+    parser.add_argument('--stub-latency', type=float, default=0.0,
+                        help='Latencia simulada por llamada del backend stub (segundos)')
+    parser.add_argument('--stub-outputs', help='JSON o directorio de .txt con salidas del backend stub')
     parser.add_argument('--interactive', action='store_true', help='Modo interactivo')
     parser.add_argument('--analyze', help='Analizar estilo de un artista')
-    parser.add_argument('--generate', help='Generar canción (requiere --artist y --theme)')
+    parser.add_argument('--generate', action='store_true', help='Generar canción (requiere --artist y --theme)')
     parser.add_argument('--artist', help='Artista para generación')
     parser.add_argument('--theme', help='Tema para nueva canción')
     parser.add_argument('--emotion', help='Emoción deseada')
@@ -307,42 +996,106 @@ def main():
     parser.add_argument('--original-artist', help='Artista original')
     parser.add_argument('--original-title', help='Título original')
     parser.add_argument('--new-angle', help='Nuevo enfoque para reescritura')
+    parser.add_argument('--serve', action='store_true', help='Modo servicio HTTP con el sistema en memoria')
+    parser.add_argument('--host', default=SERVER_HOST, help='Dirección de escucha del servicio')
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help='Puerto del servicio')
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help='Workers del servicio')
+    parser.add_argument('--metrics', nargs='?', const='text', choices=['text', 'json', 'prometheus'],
+                        help='Muestra métricas de latencia y throughput al terminar')
+    parser.add_argument('--candidates', type=int, default=GENERATION_CANDIDATES,
+                        help='Candidatos a generar en paralelo; se devuelve el mejor')
+    parser.add_argument('--max-songs', type=int, help='Máximo de canciones a analizar')
+    parser.add_argument('--analysis-mode', choices=['auto', 'exact', 'streaming', 'approximate'],
+                        default=ANALYSIS_MODE,
+                        help='Análisis exacto, en streaming o con vocabulario aproximado (memoria acotada)')
+    parser.add_argument('--memory-budget', type=float, default=STREAMING_MEMORY_BUDGET_MB, metavar='MB',
+                        help='Presupuesto de memoria del análisis en streaming o aproximado')
+    parser.add_argument('--rollup', metavar='NOMBRE',
+                        help='Agrega el vocabulario de --artists (género, sello) sin releer las letras')
+    parser.add_argument('--artists', help='Artistas separados por comas (para --rollup y --rebuild-profiles)')
+    parser.add_argument('--search', metavar='TEXTO',
+                        help='Busca en las letras cacheadas (todas las palabras en una línea)')
+    parser.add_argument('--ending', metavar='SUFIJO',
+                        help='Líneas que terminan así, p. ej. "ight" (con --search o solo)')
+    parser.add_argument('--limit', type=int, default=20,
+                        help='Máximo de resultados en --search/--ending y --generations')
+    parser.add_argument('--generations-db', default=GENERATIONS_DB_PATH, help='Ruta del almacén de generaciones')
+    parser.add_argument('--generations', action='store_true',
+                        help='Lista las canciones generadas (filtros: --artist, --theme, --kind, '
+                             '--since, --until, --min-originality, --order)')
+    parser.add_argument('--generation', metavar='ID', help='Muestra una generación completa')
+    parser.add_argument('--import-generations', action='store_true',
+                        help='Importa al almacén los JSON de data/generated_songs y data/rewritten_songs')
+    parser.add_argument('--kind', choices=list(GENERATION_KINDS), help='Tipo de generación (para --generations)')
+    parser.add_argument('--since', metavar='FECHA', help='Generaciones desde esta fecha ISO')
+    parser.add_argument('--until', metavar='FECHA', help='Generaciones hasta esta fecha ISO (excluida)')
+    parser.add_argument('--min-originality', type=float, help='Score de originalidad mínimo')
+    parser.add_argument('--order', choices=['recent', 'oldest', 'originality'], default='recent',
+                        help='Orden de --generations')
+    parser.add_argument('--sync', nargs='?', const='', metavar='ARTISTAS',
+                        help='Trae solo las canciones nuevas de los artistas cacheados '
+                             '(todos, o los indicados separados por comas)')
+    parser.add_argument('--build-corpus', action='store_true',
+                        help='Compila (incrementalmente) la caché de letras en el corpus de IDs de tokens')
+    parser.add_argument('--rebuild-profiles', action='store_true',
+                        help='Rehace desde la caché los perfiles de todos los artistas cacheados '
+                             '(o de --artists), saltando los que ya están al día')
+    parser.add_argument('--rebuild-workers', type=int, default=REBUILD_WORKERS, metavar='N',
+                        help='Procesos de --rebuild-profiles (0 = uno por CPU)')
+    parser.add_argument('--force', action='store_true',
+                        help='Con --rebuild-profiles, rehace también los perfiles al día')
+    parser.add_argument('--jobs-db', default=JOBS_DB_PATH, help='Ruta de la cola de trabajos')
+    parser.add_argument('--job-submit', choices=list(JOB_KINDS),
+                        help='Encola un trabajo en segundo plano con los parámetros dados')
+    parser.add_argument('--priority', type=int, default=0, help='Prioridad del trabajo (mayor = antes)')
+    parser.add_argument('--job-status', type=int, metavar='ID', help='Estado y progreso de un trabajo')
+    parser.add_argument('--job-result', type=int, metavar='ID', help='Resultado de un trabajo terminado')
+    parser.add_argument('--job-cancel', type=int, metavar='ID', help='Cancela un trabajo')
+    parser.add_argument('--job-list', action='store_true', help='Lista los trabajos recientes')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=list(PROFILE_MODES),
+                        help='Perfila la ejecución: cprofile (pstats) o sample (speedscope)')
+    parser.add_argument('--profile-output', help='Archivo de salida del perfil')
+    parser.add_argument('--job-workers', type=int, nargs='?', const=JOB_WORKERS, metavar='N',
+                        help='Arranca N procesos worker de la cola y espera hasta Ctrl+C')
     
     args = parser.parse_args()
+    if not 1 <= args.candidates <= MAX_CANDIDATES:
+        parser.error(f'--candidates debe estar entre 1 y {MAX_CANDIDATES}')
     
-    # Inicializar sistema
-    try:
-        system = SongGemSystem(args.genius_key, args.gemini_key)
-    except Exception as e:
-        print(f"❌ Error inicializando el sistema: {e}")
-        return 1
+    # Comandos de la cola que no necesitan inicializar el sistema
+    if args.job_submit or args.job_list or args.job_status or args.job_result or args.job_cancel:
+        return run_job_command(args, parser)
+    if args.generations or args.generation or args.import_generations:
+        return run_generation_command(args, parser)
     
-    # Ejecutar modo correspondiente
-    if args.interactive:
-        system.interactive_mode()
-    
-    elif args.analyze:
-        system.analyze_artist(args.analyze)
-    
-    elif args.generate and args.artist and args.theme:
-        system.generate_song(
-            args.artist,
-            args.theme,
-            args.emotion,
-            args.structure
-        )
+    if not args.genius_key:
+        parser.error('--genius-key es requerida')
     
-    elif args.rewrite and all([args.target_artist, args.original_artist, args.original_title]):
-        system.rewrite_song_in_style(
-            args.target_artist,
-            args.original_artist,
-            args.original_title,
-            args.new_angle
-        )
+    if args.job_workers:
+        # Cargados en el padre, los recursos de idioma se comparten con los hijos
+        preload_languages(PRELOAD_LANGUAGES)
+        processes = start_workers(args.job_workers, args.jobs_db, system_factory(args), JOB_POLL_INTERVAL)
+        print(f"👷 {len(processes)} workers atendiendo {args.jobs_db} (Ctrl+C para detener)")
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            print("\n👋 Workers detenidos")
+        return 0
     
+    if args.rebuild_profiles:
+        return run_rebuild_command(args)
+    
+    if args.profile:
+        code = run_profiled(lambda: run_command(args, parser), args.profile, args.profile_output)
+        print("\n" + format_breakdown(stage_breakdown()))
     else:
-        parser.print_help()
-        return 1
+        code = run_command(args, parser)
+    if code:
+        return code
+    
+    if args.metrics:
+        print_metrics(args.metrics)
     
     return 0
 
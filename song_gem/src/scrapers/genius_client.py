@@ -0,0 +1,556 @@
+"""
+Cliente asíncrono de la API de Genius
+
+Alternativa a lyricsgenius para la extracción de letras:
+- Un único httpx.AsyncClient con pool de conexiones keep-alive para la API
+  (búsqueda, canciones del artista, metadatos) y las páginas de letras.
+- Peticiones concurrentes acotadas por un semáforo (y, opcionalmente, por
+  un límite de peticiones por segundo), con reintentos ante 429/5xx que
+  respetan Retry-After.
+- Las letras se extraen de la página con lxml si está instalado y, si no,
+  con un parser incremental de la biblioteca estándar que solo recorre los
+  contenedores de letra, sin construir el árbol completo como BeautifulSoup.
+
+GeniusClient expone el cliente a código síncrono: lo ejecuta en un event
+loop propio en segundo plano, así el pool de conexiones sobrevive entre
+llamadas y lo comparten todos los hilos del proceso.
+"""
+
+import asyncio
+import os
+import re
+import threading
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import httpx
+except ImportError:  # Dependencia opcional: sin ella se usa lyricsgenius
+    httpx = None
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # Dependencia opcional: parser de la biblioteca estándar
+    lxml_html = None
+
+API_URL = "https://api.genius.com"
+# Códigos que justifican reintentar la petición
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Espera máxima entre reintentos (segundos)
+MAX_RETRY_DELAY = 30.0
+DEFAULT_EXCLUDED_TERMS = ["(Remix)", "(Live)", "(Acoustic)", "(Demo)"]
+
+_BR_RE = re.compile(r'<br\s*/?>', re.IGNORECASE)
+_CONTAINER_MARK = 'data-lyrics-container="true"'
+# Caracteres entregados al parser en cada paso
+_FEED_CHUNK = 8192
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+              'source', 'track', 'wbr'}
+
+
+def available() -> bool:
+    """Indica si el cliente asíncrono puede usarse (httpx instalado)"""
+    return httpx is not None
+
+
+class GeniusSong:
+    """Canción de Genius con los mismos atributos que usa LyricsScraper de lyricsgenius.Song"""
+
+    def __init__(self, body: Dict, lyrics: str):
+        """
+        Args:
+            body: Metadatos de la canción devueltos por la API (/songs/{id})
+            lyrics: Letra en bruto, con encabezados de sección
+        """
+        self.lyrics = lyrics
+        self.id = body.get('id')
+        self.title = body['title']
+        self.artist = body['primary_artist']['name']
+        self.primary_artist = body['primary_artist']
+        self.url = body.get('url')
+        self.release_date_for_display = body.get('release_date_for_display')
+        self.featured_artists = body.get('featured_artists', [])
+        self.producer_artists = body.get('producer_artists', [])
+        self.writer_artists = body.get('writer_artists', [])
+
+
+class _LyricsExtractor(HTMLParser):
+    """
+    Extrae el texto de los contenedores de letra en una sola pasada
+
+    Reproduce lo que hace lyricsgenius con BeautifulSoup: <br> pasa a salto
+    de línea, se ignoran las cabeceras LyricsHeader y los hijos marcados con
+    data-exclude-from-selection, y un contenedor vacío aporta un salto.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.found = False
+        self.closed = 0              # Contenedores ya cerrados
+        self._stack: List[str] = []  # Etiquetas abiertas dentro del contenedor
+        self._skip = 0               # Profundidad del elemento ignorado en curso
+        self._container_start = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip:
+            if tag not in _VOID_TAGS:
+                self._skip += 1
+            return
+        if not self._stack:
+            if tag == 'div' and ('data-lyrics-container', 'true') in attrs:
+                self.found = True
+                self._stack.append(tag)
+                self._container_start = len(self.parts)
+            return
+        if tag == 'br':
+            self.parts.append('\n')
+            return
+        if tag in _VOID_TAGS:
+            return
+        attrs = dict(attrs)
+        excluded = len(self._stack) == 1 and attrs.get('data-exclude-from-selection') == 'true'
+        if excluded or (tag == 'div' and 'LyricsHeader' in (attrs.get('class') or '')):
+            self._skip = 1
+            return
+        self._stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS:
+            return
+        if self._skip:
+            self._skip -= 1
+            return
+        if not self._stack:
+            return
+        # Tolerar HTML mal cerrado: cerrar hasta la etiqueta correspondiente
+        while self._stack and self._stack.pop() != tag:
+            pass
+        if not self._stack:
+            self.closed += 1
+            if len(self.parts) == self._container_start:
+                self.parts.append('\n')
+
+    def handle_data(self, data):
+        if self._stack and not self._skip:
+            self.parts.append(data)
+
+
+def _extract_stdlib(html: str) -> Optional[str]:
+    """
+    Extracción con html.parser limitada a la zona de las letras
+
+    Empieza en el primer contenedor y deja de leer en cuanto se cierran
+    todos, sin recorrer los scripts y el pie de la página.
+    """
+    first = html.find(_CONTAINER_MARK)
+    if first < 0:
+        return None
+    expected = html.count(_CONTAINER_MARK, first)
+    parser = _LyricsExtractor()
+    position = html.rfind('<', 0, first)
+    while position < len(html) and parser.closed < expected:
+        parser.feed(html[position:position + _FEED_CHUNK])
+        position += _FEED_CHUNK
+    parser.close()
+    return ''.join(parser.parts) if parser.found else None
+
+
+def _extract_lxml(html: str) -> Optional[str]:
+    """Extracción con lxml (árbol en C, mucho más rápido que BeautifulSoup)"""
+    root = lxml_html.fromstring(_BR_RE.sub('\n', html))
+    for header in root.xpath('//div[contains(@class, "LyricsHeader")]'):
+        header.drop_tree()
+    containers = root.xpath('//div[@data-lyrics-container="true"]')
+    if not containers:
+        return None
+    parts = []
+    for container in containers:
+        if not container.text and not len(container):
+            parts.append('\n')
+            continue
+        parts.append(container.text or '')
+        for child in container:
+            if isinstance(child.tag, str) and child.get('data-exclude-from-selection') != 'true':
+                parts.append(child.text_content())
+            parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def extract_lyrics(html: str) -> Optional[str]:
+    """
+    Extrae la letra en bruto de una página de canción de Genius
+
+    Args:
+        html: HTML de la página
+
+    Returns:
+        Letra con encabezados de sección, o None si la página no tiene
+        contenedores de letra
+    """
+    if _CONTAINER_MARK not in html:
+        return None
+    lyrics = _extract_lxml(html) if lxml_html is not None else _extract_stdlib(html)
+    if lyrics is None:
+        return None
+    return lyrics.strip('\n') or None
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+class _RateLimiter:
+    """Espaciado mínimo entre peticiones, compartido por todas las corrutinas del cliente"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncGeniusClient:
+    """Cliente asíncrono de Genius con conexiones reutilizables"""
+
+    def __init__(self, access_token: str, api_url: str = API_URL, max_connections: int = 10,
+                 timeout: float = 15.0, retries: int = 3, excluded_terms: List[str] = None,
+                 rate_limit: float = 0.0):
+        """
+        Args:
+            access_token: Access Token de la API de Genius
+            api_url: URL base de la API (configurable para servidores de pruebas)
+            max_connections: Conexiones simultáneas (y peticiones en curso) como máximo
+            timeout: Tiempo máximo por petición en segundos
+            retries: Reintentos ante errores de red o respuestas 429/5xx
+            excluded_terms: Términos del título que descartan una canción
+            rate_limit: Peticiones por segundo como máximo (0 = sin límite)
+        """
+        if httpx is None:
+            raise ImportError("El cliente asíncrono de Genius necesita httpx (pip install httpx)")
+        self.api_url = api_url.rstrip('/')
+        self.retries = retries
+        self.excluded_terms = [t.lower() for t in (excluded_terms or DEFAULT_EXCLUDED_TERMS)]
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            timeout=timeout,
+            follow_redirects=True,
+            headers={'User-Agent': 'SongGem'},
+        )
+        self._auth = {'Authorization': f'Bearer {access_token}'}
+        self._slots = asyncio.Semaphore(max_connections)
+        self._rate = _RateLimiter(rate_limit) if rate_limit else None
+
+    async def _get(self, url: str, params: Dict = None, headers: Dict = None) -> 'httpx.Response':
+        """GET con reintentos y retroceso exponencial"""
+        attempt = 0
+        while True:
+            if self._rate:
+                await self._rate.wait()
+            async with self._slots:
+                try:
+                    response = await self.http.get(url, params=params, headers=headers)
+                except httpx.TransportError:
+                    if attempt >= self.retries:
+                        raise
+                    retry_after = None
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                        response.raise_for_status()
+                        return response
+                    retry_after = response.headers.get('Retry-After')
+            # Esperar fuera del semáforo para no bloquear otras peticiones
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = 0.5 * 2 ** attempt
+            await asyncio.sleep(min(delay, MAX_RETRY_DELAY))
+            attempt += 1
+
+    async def api(self, path: str, **params) -> Dict:
+        """Llama a un endpoint de la API y devuelve su campo 'response'"""
+        response = await self._get(f"{self.api_url}/{path}", params=params or None, headers=self._auth)
+        return response.json()['response']
+
+    def _is_lyrics(self, song: Dict) -> bool:
+        """Descarta lo que no son letras (incompletas, instrumentales, términos excluidos)"""
+        if song.get('lyrics_state', 'complete') != 'complete' or song.get('instrumental'):
+            return False
+        title = song.get('title', '').lower()
+        return not any(term in title for term in self.excluded_terms)
+
+    async def search_artist(self, artist_name: str) -> Optional[Dict]:
+        """
+        Busca un artista por nombre
+
+        Returns:
+            Artista cuyo nombre coincide (o el primer artista principal de los
+            resultados), o None si no hay resultados
+        """
+        hits = (await self.api('search', q=artist_name))['hits']
+        artists = [hit['result']['primary_artist'] for hit in hits if hit.get('type') == 'song']
+        wanted = _normalize(artist_name)
+        for artist in artists:
+            if _normalize(artist['name']) == wanted:
+                return artist
+        return artists[0] if artists else None
+
+    async def artist_songs(self, artist_id: int, max_songs: int = 50, sort: str = 'popularity',
+                           per_page: int = 50) -> List[Dict]:
+        """
+        Canciones de un artista como artista principal, paginando la API
+
+        Args:
+            artist_id: ID de Genius del artista
+            max_songs: Máximo de canciones
+            sort: Orden de la API ('popularity', 'title' o 'release_date')
+            per_page: Canciones por página (máximo de la API: 50)
+
+        Returns:
+            Resúmenes de canción de la API, ya filtrados
+        """
+        songs = []
+        page = 1
+        while page and len(songs) < max_songs:
+            data = await self.api(f'artists/{artist_id}/songs', sort=sort, per_page=per_page, page=page)
+            for song in data['songs']:
+                if song['primary_artist']['id'] == artist_id and self._is_lyrics(song):
+                    songs.append(song)
+            page = data.get('next_page')
+        return songs[:max_songs]
+
+    async def song(self, song_id: int) -> Dict:
+        """Metadatos completos de una canción"""
+        return (await self.api(f'songs/{song_id}'))['song']
+
+    async def lyrics(self, url: str) -> Optional[str]:
+        """Descarga la página de una canción y extrae la letra en bruto"""
+        response = await self._get(url)
+        return extract_lyrics(response.text)
+
+    async def fetch_song(self, summary: Dict) -> Optional[GeniusSong]:
+        """Metadatos y letra de una canción, descargados en paralelo"""
+        body, lyrics = await asyncio.gather(self.song(summary['id']), self.lyrics(summary['url']))
+        if not lyrics or not self._is_lyrics(body):
+            return None
+        return GeniusSong(body, lyrics)
+
+    async def fetch_songs(self, summaries: List[Dict],
+                          progress: Callable[[int, int], None] = None) -> List[GeniusSong]:
+        """
+        Descarga varias canciones en paralelo conservando el orden; los fallos se omiten
+
+        Args:
+            summaries: Resúmenes de canción de la API
+            progress: Callback (descargadas, total) llamado con cada canción; si
+                lanza una excepción se cancelan las descargas pendientes
+        """
+        tasks = [asyncio.ensure_future(self.fetch_song(s)) for s in summaries]
+        if progress:
+            try:
+                for done, finished in enumerate(asyncio.as_completed(tasks), 1):
+                    await asyncio.gather(finished, return_exceptions=True)
+                    progress(done, len(tasks))
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        songs = []
+        for summary, result in zip(summaries, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ Error descargando '{summary.get('title')}': {result}")
+            elif result is not None:
+                songs.append(result)
+        return songs
+
+    async def search_artist_songs(self, artist_name: str, max_songs: int = 50,
+                                  progress: Callable[[int, int], None] = None) -> Optional[List[GeniusSong]]:
+        """
+        Canciones de un artista con letra y metadatos
+
+        Args:
+            artist_name: Nombre del artista
+            max_songs: Máximo de canciones
+            progress: Callback (descargadas, total), ver fetch_songs
+
+        Returns:
+            Canciones descargadas, o None si no se encuentra el artista
+        """
+        artist = await self.search_artist(artist_name)
+        if not artist:
+            return None
+        summaries = await self.artist_songs(artist['id'], max_songs)
+        return await self.fetch_songs(summaries, progress)
+
+    async def new_artist_songs(self, artist_name: str, artist_id: Optional[int], known_ids: Set[int],
+                               known_titles: Set[str], max_song_id: int = None,
+                               max_new: int = 50) -> Tuple[Optional[int], List[GeniusSong]]:
+        """
+        Canciones publicadas después de las ya cacheadas de un artista
+
+        Recorre las canciones por fecha de publicación (más recientes primero)
+        y se detiene en la primera ya conocida: por ID, por título o por tener
+        un ID no mayor que el mayor cacheado (ya existía en la última descarga).
+
+        Args:
+            artist_name: Nombre del artista (para buscarlo si no se conoce su ID)
+            artist_id: ID de Genius del artista, si se conoce
+            known_ids: IDs de canción ya cacheados
+            known_titles: Títulos ya cacheados
+            max_song_id: Mayor ID de canción de la última descarga
+            max_new: Máximo de canciones nuevas a descargar
+
+        Returns:
+            (ID del artista o None si no se encuentra, canciones nuevas descargadas)
+        """
+        if artist_id is None:
+            artist = await self.search_artist(artist_name)
+            if not artist:
+                return None, []
+            artist_id = artist['id']
+
+        known_titles = {_normalize(title) for title in known_titles}
+        new = []
+        page = 1
+        while page and len(new) < max_new:
+            data = await self.api(f'artists/{artist_id}/songs', sort='release_date', per_page=20, page=page)
+            page = data.get('next_page')
+            for song in data['songs']:
+                if song['primary_artist']['id'] != artist_id:
+                    continue
+                if song['id'] in known_ids or _normalize(song['title']) in known_titles or \
+                        (max_song_id is not None and song['id'] <= max_song_id):
+                    page = None
+                    break
+                if self._is_lyrics(song):
+                    new.append(song)
+        return artist_id, await self.fetch_songs(new[:max_new])
+
+    async def sync_artists(self, plans: List[Dict], max_new: int = 50) -> List:
+        """
+        Canciones nuevas de varios artistas en paralelo (con el límite de peticiones compartido)
+
+        Args:
+            plans: Argumentos de new_artist_songs por artista (artist_name,
+                artist_id, known_ids, known_titles, max_song_id)
+            max_new: Máximo de canciones nuevas por artista
+
+        Returns:
+            Por artista, el resultado de new_artist_songs o la excepción si falló
+        """
+        return await asyncio.gather(*(self.new_artist_songs(max_new=max_new, **plan) for plan in plans),
+                                    return_exceptions=True)
+
+    async def search_song(self, title: str, artist_name: str = "") -> Optional[GeniusSong]:
+        """
+        Busca una canción por título y artista
+
+        Returns:
+            Canción cuyo título coincide o, si no, el primer resultado; con
+            artista solo se aceptan resultados de ese artista principal (como
+            lyricsgenius). None si no hay resultado válido con letra
+        """
+        hits = (await self.api('search', q=f"{title} {artist_name}".strip()))['hits']
+        results = [hit['result'] for hit in hits if hit.get('type') == 'song']
+        wanted_title, wanted_artist = _normalize(title), _normalize(artist_name)
+        if wanted_artist:
+            results = [r for r in results if _normalize(r['primary_artist']['name']) == wanted_artist]
+        match = next((r for r in results if _normalize(r['title']) == wanted_title),
+                     results[0] if results else None)
+        if match is None or not self._is_lyrics(match):
+            return None
+        return await self.fetch_song(match)
+
+    async def search_songs(self, queries: List[Tuple[str, str]]) -> List:
+        """
+        Busca varias canciones en paralelo
+
+        Args:
+            queries: Pares (título, artista)
+
+        Returns:
+            Por cada par, la canción, None si no se encontró o la excepción
+            si la búsqueda falló
+        """
+        return await asyncio.gather(*(self.search_song(title, artist) for title, artist in queries),
+                                    return_exceptions=True)
+
+    async def aclose(self):
+        """Cierra las conexiones del pool"""
+        await self.http.aclose()
+
+
+class GeniusClient:
+    """Fachada síncrona de AsyncGeniusClient sobre un event loop en segundo plano"""
+
+    def __init__(self, access_token: str, **options):
+        """
+        Args:
+            access_token: Access Token de la API de Genius
+            **options: Opciones de AsyncGeniusClient (api_url, max_connections, ...)
+        """
+        if httpx is None:
+            raise ImportError("El cliente asíncrono de Genius necesita httpx (pip install httpx)")
+        self.access_token = access_token
+        self.options = options
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client = None
+        self._pid = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Arranca el loop al primer uso (y de nuevo tras un fork: el hilo no se hereda)"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='genius-client', daemon=True).start()
+                self._client = asyncio.run_coroutine_threadsafe(self._create_client(), loop).result()
+                self._loop, self._pid = loop, os.getpid()
+            return self._loop
+
+    async def _create_client(self) -> AsyncGeniusClient:
+        return AsyncGeniusClient(self.access_token, **self.options)
+
+    def _run(self, method: str, *args):
+        loop = self._ensure_started()
+        coroutine = getattr(self._client, method)(*args)
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    def search_artist_songs(self, artist_name: str, max_songs: int = 50,
+                            progress: Callable[[int, int], None] = None) -> Optional[List[GeniusSong]]:
+        """Ver AsyncGeniusClient.search_artist_songs (progress se llama desde el hilo del loop)"""
+        return self._run('search_artist_songs', artist_name, max_songs, progress)
+
+    def search_song(self, title: str, artist_name: str = "") -> Optional[GeniusSong]:
+        """Ver AsyncGeniusClient.search_song"""
+        return self._run('search_song', title, artist_name)
+
+    def search_songs(self, queries: List[Tuple[str, str]]) -> List:
+        """Ver AsyncGeniusClient.search_songs"""
+        return self._run('search_songs', queries)
+
+    def sync_artists(self, plans: List[Dict], max_new: int = 50) -> List:
+        """Ver AsyncGeniusClient.sync_artists"""
+        return self._run('sync_artists', plans, max_new)
+
+    def close(self):
+        """Cierra las conexiones y detiene el loop"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            loop, self._loop = self._loop, None
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
@@ -1,15 +1,95 @@
 import lyricsgenius
+import hashlib
+import io
 import json
 import os
-import time
 import re
-from typing import List, Dict, Optional
+import tempfile
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
 from pathlib import Path
 
+from scrapers import genius_client
+from scrapers.genius_client import GeniusClient
+from scrapers.song_index import SongIndex, normalize_name, song_key
+from utils.lyrics_sections import Section, parse_sections
+from utils.metrics import METRICS
+from utils.profiling import span
+from utils.singleflight import SingleFlight
+
+# Bloque de lectura de los JSON de la caché al recorrerlos canción a canción
+_STREAM_CHUNK = 1 << 16
+
+
+def _iter_json_array(f: io.TextIOBase, chunk_size: int = _STREAM_CHUNK) -> Iterator[Dict]:
+    """
+    Objetos de un array JSON leídos por bloques (sin cargar el archivo entero)
+
+    Solo se mantiene en memoria el bloque en curso y el objeto que se está
+    decodificando. Los elementos deben ser objetos: un objeto incompleto no
+    decodifica hasta su llave de cierre, así que un fallo pide más texto.
+
+    Args:
+        f: Archivo de texto posicionado al principio del array
+        chunk_size: Caracteres leídos cada vez
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    while not buffer:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        buffer = chunk.lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("La caché no contiene un array JSON")
+    position = 1
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position == len(buffer):
+            buffer, position = f.read(chunk_size), 0
+            if not buffer:
+                raise ValueError("Array JSON sin cerrar en la caché")
+            continue
+        if buffer[position] == ']':
+            return
+        try:
+            song, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Objeto partido entre bloques: se lee al menos otro tanto de lo pendiente
+            chunk = f.read(max(chunk_size, len(buffer) - position))
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield song
+
+
+def _file_digest(f) -> str:
+    """Hash SHA-256 de un archivo abierto en binario, leído por bloques"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(1 << 20), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stream_cache_file(f) -> Iterator[Dict]:
+    """Canciones de un JSON de la caché ya abierto en binario (lo cierra al terminar)"""
+    with f, io.TextIOWrapper(f, encoding='utf-8') as text:
+        yield from _iter_json_array(text)
+
+
 class LyricsScraper:
     """Clase para extraer letras de canciones usando Genius API"""
     
-    def __init__(self, api_key: str, cache_dir: str = None, redirect_uri: str = None):
+    EXCLUDED_TERMS = ["(Remix)", "(Live)", "(Acoustic)", "(Demo)"]
+    
+    def __init__(self, api_key: str, cache_dir: str = None, redirect_uri: str = None,
+                 client: str = 'async', max_connections: int = 10, base_url: str = None,
+                 lookup_ttl: float = 30 * 86400, negative_lookup_ttl: float = 86400,
+                 fresh_ttl: float = 7 * 86400, hard_expiry: float = 90 * 86400,
+                 rate_limit: float = 0.0):
         """
         Inicializa el scraper de letras
         
@@ -17,20 +97,57 @@ class LyricsScraper:
             api_key: API key de Genius (Access Token)
             cache_dir: Directorio para caché de letras
             redirect_uri: URI de redirección para OAuth (si es necesario)
+            client: 'async' (cliente propio con conexiones reutilizables) o 'lyricsgenius'
+            max_connections: Conexiones simultáneas del cliente asíncrono
+            base_url: URL base de la API de Genius (p. ej. el servidor simulado de
+                benchmarks/mock_genius.py); solo con el cliente asíncrono
+            lookup_ttl: Vigencia en segundos de las canciones sueltas encontradas en Genius
+            negative_lookup_ttl: Vigencia en segundos de las búsquedas sin resultado
+            fresh_ttl: Edad en segundos hasta la que la caché de un artista se sirve
+                sin más; después se sirve mientras se refresca en segundo plano
+            hard_expiry: Edad en segundos a partir de la que la caché ya no se sirve
+                sin refrescarla antes (0 = nunca caduca)
+            rate_limit: Peticiones por segundo a Genius como máximo con el cliente
+                asíncrono (0 = sin límite)
         """
+        if client == 'async' and not genius_client.available():
+            print("⚠️ httpx no está instalado; se usa lyricsgenius para extraer letras")
+            client = 'lyricsgenius'
+        self.client = GeniusClient(
+            api_key, api_url=base_url or genius_client.API_URL, max_connections=max_connections,
+            excluded_terms=self.EXCLUDED_TERMS, rate_limit=rate_limit
+        ) if client == 'async' else None
+        
         self.genius = lyricsgenius.Genius(api_key)
-        self.genius.remove_section_headers = True  # Eliminar headers como [Verse], [Chorus]
+        # Conservar headers como [Verse], [Chorus]: se guardan como secciones
+        # estructuradas y clean_lyrics los quita del texto plano
+        self.genius.remove_section_headers = False
         self.genius.skip_non_songs = True          # Saltar resultados que no son canciones
-        self.genius.excluded_terms = ["(Remix)", "(Live)", "(Acoustic)", "(Demo)"]
+        self.genius.excluded_terms = list(self.EXCLUDED_TERMS)
         
         self.cache_dir = Path(cache_dir) if cache_dir else Path("data/lyrics_cache")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Índice (artista, título) de la caché y búsquedas remotas recientes
+        self.index = SongIndex(self.cache_dir / "song_index.sqlite3")
+        self.lookup_ttl = lookup_ttl
+        self.negative_lookup_ttl = negative_lookup_ttl
+        self._index_lock = threading.Lock()
+        self._index_ready = False
+        
+        # Política de frescura de la caché de artistas (stale-while-revalidate)
+        self.fresh_ttl = fresh_ttl
+        self.hard_expiry = hard_expiry
+        self._fetches = SingleFlight()
+        self._refreshes: List[threading.Thread] = []
+        self._refresh_lock = threading.Lock()
     
     def clean_lyrics(self, lyrics: str) -> str:
         """Limpia las letras de caracteres no deseados y formato"""
         if not lyrics:
             return ""
         
+        lyrics = self._strip_genius_chrome(lyrics)
         # Eliminar corchetes y su contenido
         lyrics = re.sub(r'\[.*?\]', '', lyrics)
         # Eliminar paréntesis con información técnica
@@ -43,80 +160,475 @@ class LyricsScraper:
         
         return lyrics
     
+    @staticmethod
+    def _strip_genius_chrome(lyrics: str) -> str:
+        """
+        Elimina la cabecera ("12 ContributorsTítulo Lyrics", o "Título Lyrics"
+        pegado al primer encabezado) y el pie ("34Embed") que Genius añade a la
+        letra; el pie rompería la última repetición del coro
+        """
+        lyrics = re.sub(r'^\s*\d+\s*Contributors?.*?Lyrics', '', lyrics)
+        lyrics = re.sub(r'^[^\n\[]*Lyrics(?=\[)', '', lyrics)
+        return re.sub(r'\d*Embed\s*$', '', lyrics)
+    
+    def extract_sections(self, lyrics: str) -> List[Section]:
+        """
+        Extrae las secciones etiquetadas de una letra en bruto
+        
+        Usa los encabezados de Genius ([Verse 1], [Chorus: ...]); si no hay,
+        separa por estrofas. Cada línea se limpia igual que en clean_lyrics, sin
+        los filtros de parse_sections pensados para la salida del modelo.
+        
+        Args:
+            lyrics: Letra sin limpiar, con encabezados y líneas vacías
+            
+        Returns:
+            Lista ordenada de [etiqueta, líneas]
+        """
+        sections = []
+        if not lyrics:
+            return sections
+        for label, lines in parse_sections(self._strip_genius_chrome(lyrics), filter_model_artifacts=False):
+            lines = [cleaned for cleaned in map(self.clean_lyrics, lines) if cleaned]
+            if lines:
+                sections.append([label, lines])
+        return sections
+    
+    def _song_data(self, song) -> Dict:
+        """Campos comunes de una canción de Genius (letra plana y secciones)"""
+        cleaned_lyrics = self.clean_lyrics(song.lyrics)
+        return {
+            'genius_id': getattr(song, 'id', None),
+            'title': song.title,
+            'artist': song.artist,
+            'lyrics': cleaned_lyrics,
+            'sections': self.extract_sections(song.lyrics),
+            'url': song.url,
+            'word_count': len(cleaned_lyrics.split()),
+            'line_count': len(cleaned_lyrics.split('\n'))
+        }
+    
+    def _catalog_songs(self, found: List, progress: Callable[[int, int], None] = None) -> List[Dict]:
+        """Canciones de Genius con letra suficiente, con los campos del catálogo de un artista"""
+        songs = []
+        for done, song in enumerate(found, 1):
+            if progress:
+                progress(done, len(found))
+            song_data = self._song_data(song)
+            
+            if len(song_data['lyrics']) > 100:  # Solo incluir canciones con contenido suficiente
+                song_data.update({
+                    'release_date': getattr(song, 'release_date_for_display', None),
+                    'featured_artists': getattr(song, 'featured_artists', []),
+                    'producer_artists': getattr(song, 'producer_artists', []),
+                    'writer_artists': getattr(song, 'writer_artists', []),
+                })
+                songs.append(song_data)
+        return songs
+    
+    def _cache_file(self, artist_name: str) -> Path:
+        return self.cache_dir / f"{artist_name.lower().replace(' ', '_')}.json"
+    
     def get_cached_songs(self, artist_name: str) -> Optional[List[Dict]]:
         """Obtiene canciones cacheadas para un artista"""
-        cache_file = self.cache_dir / f"{artist_name.lower().replace(' ', '_')}.json"
+        cache_file = self._cache_file(artist_name)
         if cache_file.exists():
             with open(cache_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         return None
     
+    def iter_cached_songs(self, artist_name: str) -> Iterator[Dict]:
+        """
+        Canciones cacheadas de un artista leídas una a una del JSON
+        
+        A diferencia de get_cached_songs no carga el catálogo entero: para el
+        análisis en streaming de catálogos grandes. Sin caché no produce nada.
+        """
+        try:
+            f = open(self._cache_file(artist_name), 'rb')
+        except FileNotFoundError:
+            return iter(())
+        return _stream_cache_file(f)
+    
+    def cached_song_count(self, artist_name: str) -> Optional[int]:
+        """
+        Canciones del JSON cacheado de un artista, sin leerlo
+        
+        Del índice si indexó la versión actual del archivo; si no, de los
+        metadatos de la última descarga. None si no se conoce.
+        """
+        cache_file = self._cache_file(artist_name)
+        count = self.index.file_song_count(cache_file)
+        if count is None:
+            count = (self.index.cache_metadata(cache_file) or {}).get('song_count')
+        return count
+    
+    def get_cached_catalog(self, artist_name: str,
+                           stream: bool = False) -> Tuple[Optional[Iterable[Dict]], Optional[str]]:
+        """
+        Canciones cacheadas de un artista y el hash SHA-256 del JSON del que se leyeron
+        
+        Args:
+            artist_name: Artista cacheado
+            stream: Si True, el hash se calcula por bloques y las canciones se
+                devuelven como iterador (ver iter_cached_songs) del mismo archivo
+            
+        Returns:
+            (canciones, hash), o (None, None) si no está cacheado
+        """
+        try:
+            f = open(self._cache_file(artist_name), 'rb')
+        except FileNotFoundError:
+            return None, None
+        if not stream:
+            with f:
+                data = f.read()
+            return json.loads(data), hashlib.sha256(data).hexdigest()
+        digest = _file_digest(f)
+        f.seek(0)
+        return _stream_cache_file(f), digest
+    
+    def cache_digest(self, artist_name: str) -> Optional[str]:
+        """Hash SHA-256 del JSON cacheado de un artista, por bloques y sin parsearlo (None si no está)"""
+        try:
+            with open(self._cache_file(artist_name), 'rb') as f:
+                return _file_digest(f)
+        except FileNotFoundError:
+            return None
+    
     def cache_songs(self, artist_name: str, songs: List[Dict]):
         """Guarda canciones en caché"""
-        cache_file = self.cache_dir / f"{artist_name.lower().replace(' ', '_')}.json"
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(songs, f, ensure_ascii=False, indent=2)
+        cache_file = self._cache_file(artist_name)
+        # Escritura atómica: un refresco en segundo plano interrumpido no deja JSON
+        # a medias; cada escritor usa su propio temporal (hilos y procesos concurrentes)
+        fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, prefix=cache_file.name + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(songs, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            os.unlink(tmp_file)
+            raise
+        self.index.index_file(cache_file, songs)
+    
+    def _ensure_index(self):
+        """Indexa una vez por instancia los JSON de la caché escritos por otros procesos"""
+        with self._index_lock:
+            if not self._index_ready:
+                self.index.refresh(self.cache_dir)
+                self._index_ready = True
+    
+    def find_cached_song(self, artist_name: str, song_title: str) -> Optional[Dict]:
+        """
+        Busca una canción en la caché de letras de los artistas
+        
+        Args:
+            artist_name: Nombre del artista
+            song_title: Título de la canción
+            
+        Returns:
+            Canción cacheada o None
+        """
+        self._ensure_index()
+        location = self.index.find_cached(artist_name, song_title)
+        if location is None:
+            return None
+        cache_file, position = location
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                songs = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # El archivo pudo cambiar tras indexarlo: comprobar que es la misma canción
+        if position < len(songs) and normalize_name(songs[position]['title']) == normalize_name(song_title):
+            return songs[position]
+        return None
+    
+    def search_lyrics(self, query: str = None, ending: str = None, artist_name: str = None,
+                      limit: int = 20) -> List[Dict]:
+        """
+        Busca en las letras cacheadas de todos los artistas
+        
+        Args:
+            query: Palabras que deben aparecer en una misma línea ('*' final = prefijo)
+            ending: Terminación de la última palabra de la línea (p. ej. 'ight')
+            artist_name: Limitar a un artista
+            limit: Máximo de canciones
+            
+        Returns:
+            Canciones ordenadas por relevancia, con sus líneas coincidentes
+        """
+        self._ensure_index()
+        with span('scrape.search_lyrics'):
+            return self.index.search_lyrics(query, ending, artist_name, limit)
+    
+    def search_lines(self, query: str = None, ending: str = None, artist_name: str = None,
+                     limit: int = 50) -> List[Dict]:
+        """Como search_lyrics, pero devuelve líneas sueltas (ver SongIndex.search_lines)"""
+        self._ensure_index()
+        with span('scrape.search_lyrics'):
+            return self.index.search_lines(query, ending, artist_name, limit)
+    
+    def cache_info(self, artist_name: str) -> Optional[Dict]:
+        """
+        Frescura de la caché de un artista
+        
+        Args:
+            artist_name: Nombre del artista
+            
+        Returns:
+            Momento de descarga, edad, canciones, mayor ID de Genius y estado
+            ('fresh', 'stale' o 'expired'), o None si no está cacheado. Las
+            cachés sin metadatos (anteriores a ellos) usan la fecha del archivo.
+        """
+        cache_file = self._cache_file(artist_name)
+        if not cache_file.exists():
+            return None
+        info = self.index.cache_metadata(cache_file) or {
+            'cache_file': str(cache_file),
+            'artist_name': artist_name,
+            'fetched_at': cache_file.stat().st_mtime,
+            'song_count': None,
+            'max_song_id': None,
+            'max_songs': None,
+            'artist_id': None,
+        }
+        age = max(0.0, time.time() - info['fetched_at'])
+        if age < self.fresh_ttl:
+            state = 'fresh'
+        elif not self.hard_expiry or age < self.hard_expiry:
+            state = 'stale'
+        else:
+            state = 'expired'
+        info.update({'age_seconds': age, 'state': state})
+        return info
     
-    def get_artist_songs(self, artist_name: str, max_songs: int = 50) -> List[Dict]:
+    def get_artist_songs(self, artist_name: str, max_songs: int = 50,
+                         progress: Callable[[int, int], None] = None,
+                         stream: bool = False) -> Iterable[Dict]:
         """
         Obtiene todas las canciones de un artista
         
+        La caché fresca se sirve directamente; la antigua se sirve igualmente
+        mientras se refresca en segundo plano, y la caducada se refresca antes
+        de responder (si el refresco falla, se sirve la antigua).
+        
         Args:
             artist_name: Nombre del artista
             max_songs: Máximo número de canciones a obtener
+            progress: Callback (canciones descargadas, total) durante la descarga;
+                si lanza una excepción la descarga se interrumpe y se propaga
+            stream: Si la caché se puede servir (y se conoce su número de
+                canciones), devolver un iterador que la lee canción a canción
             
         Returns:
-            Lista de diccionarios con información de las canciones
+            Lista de diccionarios con información de las canciones (o iterador
+            con stream)
         """
         # Verificar caché primero
-        cached = self.get_cached_songs(artist_name)
-        if cached:
-            print(f"Usando {len(cached)} canciones cacheadas para {artist_name}")
-            return cached
+        with span('scrape.cache_read'):
+            info = self.cache_info(artist_name)
+            count = self.cached_song_count(artist_name) if stream and info else None
+            if count and info['state'] != 'expired':
+                cached = self.iter_cached_songs(artist_name)
+            else:
+                cached = self.get_cached_songs(artist_name) if info else None
+                count = len(cached) if cached else 0
+        if count:
+            METRICS.inc('lyrics_cache_total', labels={'state': info['state']})
+            if info['state'] == 'fresh':
+                print(f"Usando {count} canciones cacheadas para {artist_name}")
+                return cached
+            if info['state'] == 'stale':
+                print(f"Usando {count} canciones cacheadas para {artist_name} (refrescando en segundo plano)")
+                self.refresh_in_background(artist_name, info['max_songs'] or max_songs)
+                return cached
+            print(f"La caché de {artist_name} ha caducado; refrescando...")
+        
+        songs = self._fetch_artist(artist_name, max_songs, progress)
+        if songs is None:
+            if count:
+                print(f"Usando {count} canciones cacheadas (caducadas) para {artist_name}")
+                return cached
+            return []
+        return songs
+    
+    def refresh_in_background(self, artist_name: str, max_songs: int = 50) -> bool:
+        """
+        Vuelve a descargar el catálogo de un artista en un hilo aparte
+        
+        Returns:
+            False si ya había una descarga en curso para ese artista
+        """
+        if self._fetches.in_flight(self._cache_file(artist_name)):
+            return False
+        thread = threading.Thread(target=self._fetch_artist, args=(artist_name, max_songs),
+                                  name=f'refresh-{artist_name}', daemon=True)
+        thread.start()
+        with self._refresh_lock:
+            self._refreshes = [t for t in self._refreshes if t.is_alive()] + [thread]
+        return True
+    
+    def wait_for_refreshes(self, timeout: float = None):
+        """
+        Espera a que terminen los refrescos en segundo plano en curso
+        
+        Los hilos de refresco son daemon (no retienen al servidor); un proceso
+        de la CLI debe llamar a esto antes de salir para no cortarlos.
+        
+        Args:
+            timeout: Segundos máximos de espera en total (None = sin límite)
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._refresh_lock:
+            threads, self._refreshes = self._refreshes, []
+        for thread in threads:
+            if thread.is_alive():
+                print(f"⏳ Esperando al refresco en curso ({thread.name})...")
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+    
+    def _fetch_artist(self, artist_name: str, max_songs: int,
+                      progress: Callable[[int, int], None] = None) -> Optional[List[Dict]]:
+        """Descarga y cachea el catálogo (una sola descarga por artista a la vez)"""
+        return self._fetches.do(self._cache_file(artist_name), self._scrape_artist, artist_name, max_songs, progress)
+    
+    def _scrape_artist(self, artist_name: str, max_songs: int,
+                       progress: Callable[[int, int], None] = None) -> Optional[List[Dict]]:
+        """
+        Descarga el catálogo de Genius y lo cachea (None si falla)
         
+        Con el cliente asíncrono progress se llama con cada canción descargada;
+        lyricsgenius descarga el catálogo de una vez y se llama al procesarlas.
+        Las excepciones de progress no se tratan como fallo: se propagan.
+        """
+        interrupted = []
+        
+        def report(done: int, total: int):
+            try:
+                progress(done, total)
+            except Exception as e:
+                interrupted.append(e)
+                raise
+        
+        reporter = report if progress else None
         try:
             print(f"Buscando canciones de {artist_name}...")
-            artist = self.genius.search_artist(artist_name, max_songs=max_songs)
+            with span('scrape.fetch_artist'):
+                if self.client:
+                    found = self.client.search_artist_songs(artist_name, max_songs, reporter)
+                else:
+                    artist = self.genius.search_artist(artist_name, max_songs=max_songs)
+                    found = artist.songs if artist else None
             
-            if not artist:
+            if found is None:
                 raise ValueError(f"No se encontró al artista: {artist_name}")
             
-            songs = []
-            for song in artist.songs:
-                cleaned_lyrics = self.clean_lyrics(song.lyrics)
-                
-                if len(cleaned_lyrics) > 100:  # Solo incluir canciones con contenido suficiente
-                    song_data = {
-                        'title': song.title,
-                        'artist': song.artist,
-                        'lyrics': cleaned_lyrics,
-                        'url': song.url,
-                        'release_date': getattr(song, 'release_date_for_display', None),
-                        'featured_artists': getattr(song, 'featured_artists', []),
-                        'producer_artists': getattr(song, 'producer_artists', []),
-                        'writer_artists': getattr(song, 'writer_artists', []),
-                        'word_count': len(cleaned_lyrics.split()),
-                        'line_count': len(cleaned_lyrics.split('\n'))
-                    }
-                    songs.append(song_data)
-                
-                # Pequeña pausa para evitar rate limiting
-                time.sleep(0.1)
+            songs = self._catalog_songs(found, None if self.client else reporter)
+            primary = getattr(found[0], 'primary_artist', None) if found else None
             
             # Guardar en caché
-            self.cache_songs(artist_name, songs)
+            with span('scrape.cache_write'):
+                self.cache_songs(artist_name, songs)
+                self.index.record_fetch(self._cache_file(artist_name), artist_name, songs, max_songs,
+                                        artist_id=primary['id'] if primary else None)
             print(f"Se extrajeron y cachearon {len(songs)} canciones de {artist_name}")
             
             return songs
             
         except Exception as e:
+            if interrupted:
+                raise
             print(f"Error extrayendo canciones de {artist_name}: {str(e)}")
-            return []
+            return None
+    
+    def cached_artists(self) -> List[str]:
+        """Artistas con catálogo en la caché, con el nombre con el que se pidieron"""
+        artists = []
+        for cache_file in sorted(self.cache_dir.glob('*.json')):
+            metadata = self.index.cache_metadata(cache_file)
+            artists.append(metadata['artist_name'] if metadata else cache_file.stem.replace('_', ' '))
+        return artists
+    
+    def cached_song_counts(self) -> Dict[str, int]:
+        """Canciones cacheadas por artista, según el índice (sin leer los JSON)"""
+        self._ensure_index()
+        counts = self.index.song_counts()
+        return {artist: counts.get(str(self._cache_file(artist)), 0) for artist in self.cached_artists()}
+    
+    def sync_artists(self, artist_names: List[str] = None, max_new: int = 50) -> Dict[str, int]:
+        """
+        Añade a la caché solo las canciones publicadas desde la última descarga
+        
+        Para cada artista cacheado pide a Genius sus canciones por fecha de
+        publicación y se detiene en la primera ya cacheada, en lugar de volver
+        a descargar el catálogo completo. Los artistas se sincronizan en
+        paralelo respetando el límite de conexiones y de peticiones por segundo.
+        
+        Args:
+            artist_names: Artistas a sincronizar (por defecto, todos los cacheados)
+            max_new: Máximo de canciones nuevas por artista
+            
+        Returns:
+            Canciones nuevas añadidas por artista (los que fallan no aparecen)
+        """
+        if not self.client:
+            print("⚠️ La sincronización de novedades necesita el cliente asíncrono (httpx)")
+            return {}
+        
+        artist_names = self.cached_artists() if artist_names is None else artist_names
+        artists, plans = [], []
+        for artist_name in artist_names:
+            cached = self.get_cached_songs(artist_name)
+            if cached is None:
+                print(f"⚠️ {artist_name} no está en la caché; usa el análisis normal para descargarlo")
+                continue
+            info = self.cache_info(artist_name)
+            artists.append((artist_name, cached, info))
+            plans.append({
+                'artist_name': artist_name,
+                'artist_id': info['artist_id'],
+                'known_ids': {song['genius_id'] for song in cached if song.get('genius_id')},
+                'known_titles': {song['title'] for song in cached},
+                'max_song_id': info['max_song_id'],
+            })
+        
+        print(f"🔄 Buscando canciones nuevas de {len(plans)} artistas...")
+        with span('scrape.sync_artists'):
+            results = self.client.sync_artists(plans, max_new)
+        
+        added = {}
+        for (artist_name, cached, info), result in zip(artists, results):
+            if isinstance(result, Exception):
+                print(f"Error sincronizando {artist_name}: {str(result)}")
+                continue
+            artist_id, found = result
+            if artist_id is None:
+                print(f"Error sincronizando {artist_name}: no se encontró al artista")
+                continue
+            
+            new_songs = self._catalog_songs(found)
+            songs = new_songs + cached if new_songs else cached
+            with span('scrape.cache_write'):
+                if new_songs:
+                    self.cache_songs(artist_name, songs)
+                # La caché queda al día: vuelve a ser fresca
+                self.index.record_fetch(self._cache_file(artist_name), artist_name, songs,
+                                        info['max_songs'], artist_id=artist_id)
+            added[artist_name] = len(new_songs)
+            if new_songs:
+                print(f"✨ {artist_name}: {len(new_songs)} canciones nuevas")
+        
+        METRICS.inc('lyrics_sync_new_songs_total', sum(added.values()))
+        return added
     
     def search_song(self, artist_name: str, song_title: str) -> Optional[Dict]:
         """
         Busca una canción específica
         
+        Consulta primero la caché de letras y las búsquedas remotas recientes
+        (incluidas las que no encontraron nada); solo si no hay nada vigente
+        pregunta a Genius.
+        
         Args:
             artist_name: Nombre del artista
             song_title: Título de la canción
@@ -124,22 +636,64 @@ class LyricsScraper:
         Returns:
             Diccionario con información de la canción o None si no se encuentra
         """
+        return self.search_songs([(artist_name, song_title)])[0]
+    
+    def search_songs(self, queries: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+        """
+        Busca varias canciones; las que no están en caché se piden a Genius en paralelo
+        
+        Args:
+            queries: Pares (artista, título)
+            
+        Returns:
+            Por cada par, la canción o None si no se encuentra
+        """
+        results: Dict[Tuple[str, str], Optional[Dict]] = {}
+        misses: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        with span('scrape.song_lookup'):
+            for artist_name, song_title in queries:
+                key = song_key(artist_name, song_title)
+                if key in results or key in misses:
+                    continue
+                song = self.find_cached_song(artist_name, song_title)
+                if song is None:
+                    found, song = self.index.get_lookup(artist_name, song_title, self.lookup_ttl,
+                                                        self.negative_lookup_ttl)
+                    if not found:
+                        misses[key] = (artist_name, song_title)
+                        continue
+                results[key] = song
+        
+        if misses:
+            pending = list(misses.values())
+            with span('scrape.fetch_song'):
+                if self.client:
+                    fetched = self.client.search_songs([(title, artist) for artist, title in pending])
+                else:
+                    fetched = [self._search_song_lyricsgenius(artist, title) for artist, title in pending]
+            for (artist_name, song_title), song in zip(pending, fetched):
+                key = song_key(artist_name, song_title)
+                if isinstance(song, Exception):
+                    # Los errores no se cachean: se reintentará en la próxima búsqueda
+                    print(f"Error buscando la canción {song_title}: {str(song)}")
+                    results[key] = None
+                    continue
+                # Un resultado de respaldo con otro título o artista no es la
+                # canción pedida: se descarta y se guarda como fallo (TTL corto),
+                # así la búsqueda devuelve lo mismo que leerá después del índice
+                if song and song_key(song.artist, song.title) != key:
+                    song = None
+                results[key] = self._song_data(song) if song else None
+                self.index.store_lookup(artist_name, song_title, results[key])
+        
+        return [results[song_key(artist_name, song_title)] for artist_name, song_title in queries]
+    
+    def _search_song_lyricsgenius(self, artist_name: str, song_title: str):
+        """Búsqueda con lyricsgenius (devuelve la excepción en lugar de lanzarla)"""
         try:
-            song = self.genius.search_song(song_title, artist_name)
-            if song:
-                cleaned_lyrics = self.clean_lyrics(song.lyrics)
-                return {
-                    'title': song.title,
-                    'artist': song.artist,
-                    'lyrics': cleaned_lyrics,
-                    'url': song.url,
-                    'word_count': len(cleaned_lyrics.split()),
-                    'line_count': len(cleaned_lyrics.split('\n'))
-                }
+            return self.genius.search_song(song_title, artist_name)
         except Exception as e:
-            print(f"Error buscando la canción {song_title}: {str(e)}")
-        
-        return None
+            return e
     
     def get_lyrics_stats(self, songs: List[Dict]) -> Dict:
         """
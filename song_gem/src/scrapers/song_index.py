@@ -0,0 +1,490 @@
+"""
+Índice de canciones para búsquedas sin red
+
+Guarda en SQLite, junto a la caché de letras:
+- Un índice (artista, título) normalizado -> posición de la canción en el
+  JSON cacheado del artista, actualizado al escribir la caché y, para los
+  archivos escritos por otros procesos, al comparar su tamaño y fecha.
+- Cuándo se descargó o sincronizó cada artista cacheado, cuántas canciones,
+  el mayor ID de canción de Genius y el ID del artista, para decidir si la
+  caché sigue fresca y buscar solo las canciones nuevas.
+- Los resultados de búsquedas remotas de canciones sueltas, incluidas las
+  no encontradas, con caducidad.
+- Un índice de texto completo (FTS5) de las líneas de las letras cacheadas,
+  con la última palabra de cada línea invertida para buscar terminaciones
+  (rimas) por rango de un índice B-tree.
+"""
+
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils.sqlite import ThreadLocalConnection
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cached_songs (
+    artist_key TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    cache_file TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (artist_key, title_key)
+);
+CREATE INDEX IF NOT EXISTS idx_cached_songs_file ON cached_songs (cache_file);
+CREATE TABLE IF NOT EXISTS indexed_files (
+    cache_file TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    song_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS artist_caches (
+    cache_file TEXT PRIMARY KEY,
+    artist_name TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    song_count INTEGER NOT NULL,
+    max_song_id INTEGER,
+    max_songs INTEGER,
+    artist_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS lookups (
+    artist_key TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    song TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (artist_key, title_key)
+);
+"""
+
+# Sin FTS5 en el SQLite del sistema, el índice sigue funcionando sin búsqueda de texto
+_FULLTEXT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lyric_songs (
+    id INTEGER PRIMARY KEY,
+    cache_file TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    artist TEXT NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lyric_songs_file ON lyric_songs (cache_file);
+CREATE TABLE IF NOT EXISTS lyric_lines (
+    id INTEGER PRIMARY KEY,
+    song_id INTEGER NOT NULL,
+    line_no INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    ending TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lyric_lines_song ON lyric_lines (song_id);
+CREATE INDEX IF NOT EXISTS idx_lyric_lines_ending ON lyric_lines (ending);
+CREATE VIRTUAL TABLE IF NOT EXISTS lyric_lines_fts USING fts5(
+    text, content='lyric_lines', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS lyric_lines_ai AFTER INSERT ON lyric_lines BEGIN
+    INSERT INTO lyric_lines_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS lyric_lines_ad AFTER DELETE ON lyric_lines BEGIN
+    INSERT INTO lyric_lines_fts (lyric_lines_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Mayor carácter Unicode: cota superior de las búsquedas por prefijo
+_MAX_CHAR = '\U0010ffff'
+
+_FEATURING_RE = re.compile(r'[(\[]\s*(?:feat|ft|featuring|with)\b[^)\]]*[)\]]', re.IGNORECASE)
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+
+def normalize_name(text: str) -> str:
+    """Normaliza un nombre de artista o título (minúsculas, sin puntuación ni 'feat.')"""
+    text = _FEATURING_RE.sub(' ', text or '')
+    return ' '.join(_PUNCTUATION_RE.sub(' ', text.lower()).split())
+
+
+def song_key(artist: str, title: str) -> Tuple[str, str]:
+    """Clave normalizada (artista, título)"""
+    return normalize_name(artist), normalize_name(title)
+
+
+def _fold(text: str) -> str:
+    """Minúsculas sin tildes ni diacríticos"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def line_ending(line: str) -> str:
+    """Última palabra de una línea, normalizada e invertida (clave de terminación)"""
+    words = re.findall(r'\w+', _fold(line))
+    return words[-1][::-1] if words else ''
+
+
+def _match_expression(query: str) -> str:
+    """
+    Convierte texto libre en una expresión MATCH de FTS5 segura
+
+    Cada palabra se cita (sin sintaxis FTS5 accidental) y todas deben
+    aparecer; un '*' final busca por prefijo ("noch*").
+    """
+    terms = re.findall(r'(\w+)(\*?)', query)
+    return ' '.join(f'"{word}"{star}' for word, star in terms)
+
+
+class SongIndex:
+    """Índice persistente de canciones cacheadas y búsquedas remotas"""
+
+    def __init__(self, db_path: str):
+        """
+        Abre (o crea) el índice
+
+        Args:
+            db_path: Ruta del archivo SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = ThreadLocalConnection(self.db_path)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Índices creados antes de guardar el ID de artista de Genius
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(artist_caches)")}
+            if 'artist_id' not in columns:
+                conn.execute("ALTER TABLE artist_caches ADD COLUMN artist_id INTEGER")
+            # Índices creados antes de guardar las canciones de cada archivo: reindexarlos
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(indexed_files)")}
+            if 'song_count' not in columns:
+                conn.execute("ALTER TABLE indexed_files ADD COLUMN song_count INTEGER")
+                conn.execute("DELETE FROM indexed_files")
+            self.fulltext = self._create_fulltext(conn)
+
+    @staticmethod
+    def _create_fulltext(conn: sqlite3.Connection) -> bool:
+        """Crea las tablas de texto completo; False si este SQLite no tiene FTS5"""
+        existed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'lyric_lines_fts'"
+        ).fetchone() is not None
+        try:
+            conn.executescript(_FULLTEXT_SCHEMA)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Búsqueda de letras desactivada (SQLite sin FTS5): {e}")
+            return False
+        if not existed:
+            # Los archivos ya indexados no tienen sus líneas: reindexarlos en el próximo refresh
+            conn.execute("DELETE FROM indexed_files")
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conexión de este hilo y proceso (ver utils.sqlite)"""
+        return self._connection.get()
+
+    # Canciones cacheadas
+
+    def index_file(self, cache_file: Path, songs: List[Dict]):
+        """
+        Indexa (o reindexa) el JSON cacheado de un artista
+
+        Cada canción se indexa con su artista y con el nombre del archivo (el
+        artista tal como se pidió), por si no coinciden.
+
+        Args:
+            cache_file: Archivo de la caché
+            songs: Canciones guardadas en él
+        """
+        stat = cache_file.stat()
+        file_artist = cache_file.stem.replace('_', ' ')
+        rows = []
+        for position, song in enumerate(songs):
+            title_key = normalize_name(song.get('title', ''))
+            for artist_key in {normalize_name(song.get('artist', '')), normalize_name(file_artist)}:
+                rows.append((artist_key, title_key, str(cache_file), position))
+
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._forget(conn, str(cache_file))
+            conn.executemany("INSERT OR REPLACE INTO cached_songs VALUES (?, ?, ?, ?)", rows)
+            if self.fulltext:
+                self._index_lines(conn, str(cache_file), songs)
+            conn.execute("INSERT OR REPLACE INTO indexed_files VALUES (?, ?, ?, ?)",
+                         (str(cache_file), stat.st_mtime_ns, stat.st_size, len(songs)))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _index_lines(conn: sqlite3.Connection, cache_file: str, songs: List[Dict]):
+        """Añade las líneas de las canciones de un archivo al índice de texto completo"""
+        lines = []
+        for position, song in enumerate(songs):
+            song_id = conn.execute(
+                "INSERT INTO lyric_songs (cache_file, position, artist, title) VALUES (?, ?, ?, ?)",
+                (cache_file, position, song.get('artist', ''), song.get('title', ''))
+            ).lastrowid
+            for line_no, line in enumerate((song.get('lyrics') or '').split('\n')):
+                line = line.strip()
+                if line:
+                    lines.append((song_id, line_no, line, line_ending(line)))
+        conn.executemany("INSERT INTO lyric_lines (song_id, line_no, text, ending) VALUES (?, ?, ?, ?)", lines)
+
+    def _forget(self, conn: sqlite3.Connection, cache_file: str):
+        """Borra del índice todo lo de un archivo (dentro de la transacción del llamador)"""
+        conn.execute("DELETE FROM cached_songs WHERE cache_file = ?", (cache_file,))
+        if self.fulltext:
+            conn.execute("DELETE FROM lyric_lines WHERE song_id IN "
+                         "(SELECT id FROM lyric_songs WHERE cache_file = ?)", (cache_file,))
+            conn.execute("DELETE FROM lyric_songs WHERE cache_file = ?", (cache_file,))
+
+    def refresh(self, cache_dir: Path) -> int:
+        """
+        Pone el índice al día con los archivos de la caché
+
+        Solo relee los JSON nuevos o modificados desde la última indexación y
+        olvida los borrados.
+
+        Args:
+            cache_dir: Directorio de la caché de letras
+
+        Returns:
+            Número de archivos reindexados
+        """
+        conn = self._connect()
+        indexed = {row[0]: (row[1], row[2])
+                   for row in conn.execute("SELECT cache_file, mtime_ns, size FROM indexed_files")}
+        present = set()
+        reindexed = 0
+        for cache_file in sorted(Path(cache_dir).glob('*.json')):
+            present.add(str(cache_file))
+            stat = cache_file.stat()
+            if indexed.get(str(cache_file)) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            try:
+                songs = json.loads(cache_file.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            if isinstance(songs, list):
+                self.index_file(cache_file, songs)
+                reindexed += 1
+
+        for cache_file in set(indexed) - present:
+            conn.execute('BEGIN IMMEDIATE')
+            self._forget(conn, cache_file)
+            conn.execute("DELETE FROM indexed_files WHERE cache_file = ?", (cache_file,))
+            conn.execute('COMMIT')
+        return reindexed
+
+    def find_cached(self, artist: str, title: str) -> Optional[Tuple[Path, int]]:
+        """
+        Localiza una canción en la caché de letras
+
+        Returns:
+            (archivo, posición) o None si no está cacheada
+        """
+        row = self._connect().execute(
+            "SELECT cache_file, position FROM cached_songs WHERE artist_key = ? AND title_key = ?",
+            song_key(artist, title)
+        ).fetchone()
+        return (Path(row[0]), row[1]) if row else None
+
+    # Búsqueda de texto completo en las letras
+
+    def _line_filter(self, query: str, ending: str, artist: str) -> Tuple[str, str, str, List]:
+        """
+        Origen, columna de ID de línea, condiciones SQL y parámetros comunes a las búsquedas
+
+        Las líneas de cada archivo se insertan juntas, así que un artista es
+        un rango de IDs de línea por archivo: FTS5 lo aplica dentro del índice
+        en lugar de filtrar cada coincidencia.
+        """
+        if not self.fulltext:
+            raise RuntimeError("La búsqueda de letras necesita SQLite con FTS5")
+        if query:
+            source = "lyric_lines_fts JOIN lyric_lines l ON l.id = lyric_lines_fts.rowid"
+            line_id = "lyric_lines_fts.rowid"
+        else:
+            source, line_id = "lyric_lines l", "l.id"
+
+        conditions, params = [], []
+        if query:
+            expression = _match_expression(query)
+            if not expression:
+                raise ValueError(f"Búsqueda sin palabras: {query!r}")
+            conditions.append("lyric_lines_fts MATCH ?")
+            params.append(expression)
+        if ending:
+            suffix = line_ending(ending)
+            if not suffix:
+                raise ValueError(f"Terminación sin letras: {ending!r}")
+            conditions.append("l.ending >= ? AND l.ending < ?")
+            params.extend([suffix, suffix + _MAX_CHAR])
+        if artist:
+            ranges = self._connect().execute(
+                "SELECT MIN(l.id), MAX(l.id) FROM lyric_songs s JOIN lyric_lines l ON l.song_id = s.id "
+                "WHERE s.cache_file IN (SELECT cache_file FROM cached_songs WHERE artist_key = ?) "
+                "GROUP BY s.cache_file", (normalize_name(artist),)
+            ).fetchall()
+            conditions.append('(' + (' OR '.join([f"{line_id} BETWEEN ? AND ?"] * len(ranges)) or '0') + ')')
+            params.extend(bound for line_range in ranges for bound in line_range)
+        if not (query or ending):
+            raise ValueError("Indica un texto o una terminación a buscar")
+        return source, line_id, ' AND '.join(conditions), params
+
+    def search_lines(self, query: str = None, ending: str = None, artist: str = None,
+                     limit: int = 50) -> List[Dict]:
+        """
+        Líneas de las letras cacheadas que contienen unas palabras o acaban de una forma
+
+        Args:
+            query: Palabras que deben aparecer en la línea ('*' final = prefijo)
+            ending: Terminación de la última palabra (p. ej. 'ight' o '-ado')
+            artist: Limitar a un artista
+            limit: Máximo de resultados
+
+        Returns:
+            Líneas (artist, title, line, line_no, cache_file, position, score)
+            ordenadas por relevancia BM25 (menor score = mejor) si hay texto, o
+            por terminación si solo se busca una
+        """
+        source, _, where, params = self._line_filter(query, ending, artist)
+        rank = "bm25(lyric_lines_fts)" if query else "NULL"
+        # Sin texto se recorre el índice de terminaciones en orden, sin ordenar todas las coincidencias
+        order = "score" if query else "l.ending, l.id"
+        rows = self._connect().execute(
+            f"SELECT s.artist, s.title, l.text, l.line_no, s.cache_file, s.position, {rank} AS score "
+            f"FROM {source} JOIN lyric_songs s ON s.id = l.song_id "
+            f"WHERE {where} ORDER BY {order} LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        columns = ('artist', 'title', 'line', 'line_no', 'cache_file', 'position', 'score')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def search_lyrics(self, query: str = None, ending: str = None, artist: str = None,
+                      limit: int = 20, lines_per_song: int = 3) -> List[Dict]:
+        """
+        Canciones cacheadas con líneas que coinciden, ordenadas por relevancia
+
+        Una canción puntúa por la suma de BM25 de sus líneas coincidentes (o
+        por su número, si solo se busca una terminación).
+
+        Args:
+            query: Palabras que deben aparecer en una misma línea
+            ending: Terminación de la última palabra de la línea
+            artist: Limitar a un artista
+            limit: Máximo de canciones
+            lines_per_song: Líneas de ejemplo por canción
+
+        Returns:
+            Canciones (artist, title, cache_file, position, score, matches, lines)
+        """
+        source, line_id, where, params = self._line_filter(query, ending, artist)
+        # bm25() no puede usarse dentro de un agregado: se agrupa sobre las
+        # líneas ya puntuadas (MATERIALIZED evita que SQLite aplane la consulta)
+        rank = "bm25(lyric_lines_fts)" if query else "-1"
+        conn = self._connect()
+        songs = conn.execute(
+            f"WITH m AS MATERIALIZED (SELECT l.song_id, {line_id} AS line_id, {rank} AS score "
+            f"FROM {source} WHERE {where}) "
+            f"SELECT s.id, s.artist, s.title, s.cache_file, s.position, SUM(m.score) AS total, COUNT(*), "
+            f"MIN(m.line_id), MAX(m.line_id) "
+            f"FROM m JOIN lyric_songs s ON s.id = m.song_id GROUP BY s.id ORDER BY total LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+
+        results = []
+        for song_id, artist_name, title, cache_file, position, score, matches, first, last in songs:
+            # Las coincidencias de la canción están entre first y last: la
+            # consulta se limita a ese rango en lugar de repetir la búsqueda entera
+            lines = conn.execute(
+                f"SELECT l.text, l.line_no FROM {source} WHERE {where} AND {line_id} BETWEEN ? AND ? "
+                f"ORDER BY {'rank' if query else 'l.line_no'} LIMIT ?",
+                (*params, first, last, lines_per_song)
+            ).fetchall()
+            results.append({
+                'artist': artist_name,
+                'title': title,
+                'cache_file': cache_file,
+                'position': position,
+                'score': score,
+                'matches': matches,
+                'lines': [{'line': text, 'line_no': line_no} for text, line_no in lines],
+            })
+        return results
+
+    # Frescura de la caché por artista
+
+    def record_fetch(self, cache_file: Path, artist_name: str, songs: List[Dict], max_songs: int = None,
+                     artist_id: int = None):
+        """
+        Registra que la caché de un artista está al día (descarga completa o sincronización)
+
+        Args:
+            cache_file: Archivo de la caché
+            artist_name: Artista tal como se pidió
+            songs: Canciones guardadas
+            max_songs: Máximo de canciones pedido en la descarga
+            artist_id: ID de Genius del artista
+        """
+        song_ids = [song['genius_id'] for song in songs if song.get('genius_id')]
+        self._connect().execute(
+            "INSERT OR REPLACE INTO artist_caches "
+            "(cache_file, artist_name, fetched_at, song_count, max_song_id, max_songs, artist_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (str(cache_file), artist_name, time.time(), len(songs), max(song_ids, default=None), max_songs,
+             artist_id)
+        )
+
+    def cache_metadata(self, cache_file: Path) -> Optional[Dict]:
+        """Metadatos de frescura de un artista cacheado (None si no hay registro)"""
+        cursor = self._connect().execute("SELECT * FROM artist_caches WHERE cache_file = ?", (str(cache_file),))
+        row = cursor.fetchone()
+        return dict(zip([column[0] for column in cursor.description], row)) if row else None
+
+    def file_song_count(self, cache_file: Path) -> Optional[int]:
+        """Canciones del archivo si el índice tiene su versión actual (None si no)"""
+        row = self._connect().execute(
+            "SELECT mtime_ns, size, song_count FROM indexed_files WHERE cache_file = ?", (str(cache_file),)
+        ).fetchone()
+        try:
+            stat = cache_file.stat()
+        except FileNotFoundError:
+            return None
+        if row is None or (row[0], row[1]) != (stat.st_mtime_ns, stat.st_size):
+            return None
+        return row[2]
+
+    def song_counts(self) -> Dict[str, int]:
+        """Canciones de cada archivo de la caché, tal como se indexó"""
+        rows = self._connect().execute("SELECT cache_file, song_count FROM indexed_files WHERE song_count IS NOT NULL")
+        return dict(rows.fetchall())
+
+    # Búsquedas remotas
+
+    def get_lookup(self, artist: str, title: str, ttl: float, negative_ttl: float) -> Tuple[bool, Optional[Dict]]:
+        """
+        Resultado guardado de una búsqueda remota
+
+        Args:
+            artist: Artista buscado
+            title: Título buscado
+            ttl: Vigencia de las canciones encontradas (segundos)
+            negative_ttl: Vigencia de las búsquedas sin resultado (segundos)
+
+        Returns:
+            (hay resultado vigente, canción o None si no se encontró)
+        """
+        row = self._connect().execute(
+            "SELECT song, fetched_at FROM lookups WHERE artist_key = ? AND title_key = ?",
+            song_key(artist, title)
+        ).fetchone()
+        if row is None:
+            return False, None
+        song, fetched_at = row
+        if time.time() - fetched_at > (ttl if song is not None else negative_ttl):
+            return False, None
+        return True, json.loads(song) if song is not None else None
+
+    def store_lookup(self, artist: str, title: str, song: Optional[Dict]):
+        """Guarda el resultado de una búsqueda remota (None = no encontrada)"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?)",
+            (*song_key(artist, title), json.dumps(song, ensure_ascii=False) if song is not None else None,
+             time.time())
+        )
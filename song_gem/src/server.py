@@ -0,0 +1,363 @@
+"""
+Modo servicio HTTP de SongGem
+
+Mantiene un único SongGemSystem caliente (NLTK, VADER y cliente del modelo
+cargados una vez, perfiles en memoria) y atiende peticiones
+concurrentes con asyncio. El trabajo bloqueante (scraping, análisis,
+generación) se ejecuta en un pool de hilos acotado.
+
+Endpoints:
+    GET  /health             Estado del servicio
+    GET  /metrics            Métricas (Prometheus; ?format=json para JSON)
+    GET  /artists            Artistas con perfil de estilo
+    GET  /lyrics/search      ?q=...&ending=...&artist=...&limit=... en las letras cacheadas
+    GET  /generations        ?id=... o filtros artist, theme, kind, since, until, min_originality, order, limit, offset
+    POST /analyze            {"artist", "max_songs"}
+    POST /generate           {"artist", "theme", "emotion", "structure", "candidates", "recreate_style"}
+    POST /rewrite            {"target_artist", "original_artist", "original_title", "new_angle", "candidates"}
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from utils.metrics import METRICS
+
+MAX_BODY_BYTES = 1024 * 1024
+
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable',
+}
+
+_TRUE = {'1', 'true', 'yes', 'si', 'sí', 'on'}
+_FALSE = {'0', 'false', 'no', 'off', ''}
+
+
+class HTTPError(Exception):
+    """Error con código HTTP asociado"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class SongGemServer:
+    """Servidor HTTP asíncrono sobre un SongGemSystem persistente"""
+
+    def __init__(self, system, host: str = '127.0.0.1', port: int = 8080, workers: int = 4,
+                 max_candidates: int = 8):
+        """
+        Inicializa el servidor
+
+        Args:
+            system: SongGemSystem ya inicializado (modelos cargados)
+            host: Dirección de escucha
+            port: Puerto de escucha
+            workers: Hilos del pool para trabajo bloqueante
+            max_candidates: Máximo de candidatos por generación (400 si se piden más)
+        """
+        self.system = system
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_candidates = max_candidates
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='songgem-worker')
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.started_at = time.time()
+
+        self._routes = {
+            ('GET', '/health'): self._health,
+            ('GET', '/metrics'): self._metrics,
+            ('GET', '/artists'): self._artists,
+            ('GET', '/lyrics/search'): self._search_lyrics,
+            ('GET', '/generations'): self._generations,
+            ('POST', '/analyze'): self._analyze,
+            ('POST', '/generate'): self._generate,
+            ('POST', '/rewrite'): self._rewrite,
+        }
+
+    async def start(self):
+        """Abre el socket de escucha"""
+        loop = asyncio.get_running_loop()
+        # Las llamadas coalescidas de SongGemSystem usan el executor por defecto
+        loop.set_default_executor(self.executor)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"🚀 SongGem escuchando en http://{self.host}:{self.port} ({self.workers} workers)")
+
+    async def serve_forever(self):
+        """Arranca y atiende peticiones hasta ser cancelado"""
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """Cierra el socket y el pool de workers"""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atiende una conexión (con keep-alive) hasta que el cliente la cierre"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, query, body, keep_alive = request
+                status, payload = await self._dispatch(method, path, query, body)
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple]:
+        """Lee y parsea una petición HTTP/1.1 (None si el cliente cerró)"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise HTTPError(400, 'Petición incompleta')
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, 'Cabeceras demasiado grandes')
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, 'Línea de petición inválida')
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HTTPError(400, 'Content-Length inválido')
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, 'Cuerpo demasiado grande')
+        body = await reader.readexactly(length) if length else b''
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return method.upper(), url.path.rstrip('/') or '/', query, body, keep_alive
+
+    async def _dispatch(self, method: str, path: str, query: Dict, body: bytes) -> Tuple[int, object]:
+        """Resuelve la ruta y ejecuta el handler, traduciendo errores a HTTP"""
+        handler = self._routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self._routes):
+                return 405, {'error': f'Método {method} no permitido en {path}'}
+            return 404, {'error': f'Ruta no encontrada: {path}'}
+
+        start = time.perf_counter()
+        status = 500
+        try:
+            params = json.loads(body) if body else {}
+            if not isinstance(params, dict):
+                raise HTTPError(400, 'El cuerpo debe ser un objeto JSON')
+            params.update(query)
+            status, payload = 200, await handler(params)
+        except json.JSONDecodeError:
+            status, payload = 400, {'error': 'JSON inválido'}
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            METRICS.inc('errors_total', labels={'type': type(e).__name__, 'stage': 'http'})
+            status, payload = 500, {'error': str(e)}
+        finally:
+            METRICS.inc('http_requests_total', labels={'path': path, 'status': status})
+            METRICS.observe('http_request_seconds', time.perf_counter() - start, {'path': path})
+        return status, payload
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        """Serializa y envía la respuesta"""
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _run_blocking(self, fn, *args):
+        """Ejecuta trabajo bloqueante en el pool de workers"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    @staticmethod
+    def _require(params: Dict, *names: str):
+        missing = [name for name in names if not params.get(name)]
+        if missing:
+            raise HTTPError(400, f"Faltan parámetros: {', '.join(missing)}")
+
+    @staticmethod
+    def _param(params: Dict, name: str, kind: type, default=None):
+        """
+        Parámetro convertido a int, float o bool (400 si no es válido)
+
+        Los de la query string llegan como texto y los del cuerpo JSON ya
+        tipados; ambos se aceptan ("10" y 10, "false" y false).
+
+        Args:
+            params: Parámetros de la petición (cuerpo y query)
+            name: Nombre del parámetro
+            kind: int, float o bool
+            default: Valor si falta o es null
+        """
+        value = params.get(name)
+        if value is None:
+            return default
+        if kind is bool:
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in _TRUE or text in _FALSE:
+                return text in _TRUE
+        elif not isinstance(value, bool):
+            try:
+                if kind is int and isinstance(value, float):
+                    if value.is_integer():
+                        return int(value)
+                else:
+                    return kind(value)
+            except (TypeError, ValueError):
+                pass
+        raise HTTPError(400, f"Parámetro {name} inválido: se esperaba {kind.__name__}, no {value!r}")
+
+    def _candidates(self, params: Dict) -> int:
+        """Candidatos pedidos (400 fuera de 1..max_candidates: cada uno es una llamada al modelo)"""
+        count = self._param(params, 'candidates', int, 1)
+        if not 1 <= count <= self.max_candidates:
+            raise HTTPError(400, f"Parámetro candidates inválido: debe estar entre 1 y {self.max_candidates}")
+        return count
+
+    # Handlers
+
+    async def _health(self, params: Dict) -> Dict:
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started_at, 3),
+            'backend': self.system.generator.backend.name,
+            'profile_cache': self.system.profile_cache_info(),
+            'workers': self.workers,
+        }
+
+    async def _metrics(self, params: Dict):
+        if params.get('format') == 'json':
+            return METRICS.snapshot()
+        return METRICS.to_prometheus()
+
+    async def _artists(self, params: Dict) -> Dict:
+        return {'artists': await self._run_blocking(self.system.list_analyzed_artists)}
+
+    async def _search_lyrics(self, params: Dict) -> Dict:
+        if not params.get('q') and not params.get('ending'):
+            raise HTTPError(400, "Faltan parámetros: q o ending")
+        try:
+            songs = await self._run_blocking(
+                self.system.scraper.search_lyrics, params.get('q'), params.get('ending'),
+                params.get('artist'), self._param(params, 'limit', int, 20)
+            )
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return {'songs': songs}
+
+    async def _generations(self, params: Dict) -> Dict:
+        store = self.system.generations
+        if params.get('id'):
+            song_data = await self._run_blocking(store.get, params['id'])
+            if song_data is None:
+                raise HTTPError(404, f"No existe la generación {params['id']}")
+            return song_data
+        try:
+            filters = {
+                'artist': params.get('artist'),
+                'theme': params.get('theme'),
+                'kind': params.get('kind'),
+                'since': self._param(params, 'since', float),
+                'until': self._param(params, 'until', float),
+                'min_originality': self._param(params, 'min_originality', float),
+            }
+            limit, offset = self._param(params, 'limit', int, 50), self._param(params, 'offset', int, 0)
+            generations = await self._run_blocking(
+                lambda: store.query(order=params.get('order', 'recent'), limit=limit, offset=offset, **filters)
+            )
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return {'total': await self._run_blocking(lambda: store.count(**filters)), 'generations': generations}
+
+    async def _analyze(self, params: Dict) -> Dict:
+        self._require(params, 'artist')
+        profile = await self.system.analyze_artist_async(params['artist'], self._param(params, 'max_songs', int))
+        if not profile:
+            raise HTTPError(404, f"No se encontraron canciones para {params['artist']}")
+        return profile
+
+    async def _generate(self, params: Dict) -> Dict:
+        self._require(params, 'artist', 'theme')
+        song_data = await self.system.generate_song_async(
+            params['artist'],
+            params['theme'],
+            params.get('emotion'),
+            params.get('structure'),
+            self._param(params, 'recreate_style', bool, False),
+            self._candidates(params)
+        )
+        return self._generation_result(song_data, f"No se pudo obtener el perfil de {params['artist']}")
+
+    async def _rewrite(self, params: Dict) -> Dict:
+        self._require(params, 'target_artist', 'original_artist', 'original_title')
+        song_data = await self.system.rewrite_song_async(
+            params['target_artist'],
+            params['original_artist'],
+            params['original_title'],
+            params.get('new_angle'),
+            self._candidates(params)
+        )
+        return self._generation_result(song_data, "No se encontró la canción original o el perfil objetivo")
+
+    @staticmethod
+    def _generation_result(song_data: Dict, not_found: str) -> Dict:
+        """Traduce el resultado de una generación a respuesta o error HTTP"""
+        if not song_data:
+            raise HTTPError(404, not_found)
+        if not song_data.get('success'):
+            raise HTTPError(502, song_data.get('error', 'Error del modelo'))
+        return song_data
+
+
+def run_server(system, host: str, port: int, workers: int, max_candidates: int = 8):
+    """Arranca el servidor y bloquea hasta Ctrl+C"""
+    server = SongGemServer(system, host, port, workers, max_candidates)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido")
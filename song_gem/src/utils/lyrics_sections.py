@@ -0,0 +1,208 @@
+"""
+Parseo de letras en secciones ordenadas
+
+Convierte el texto de una letra (respuesta del modelo o página de Genius) en
+una lista ordenada de secciones ``(etiqueta, líneas)``, conservando secciones
+repetidas como los coros. El texto se recorre una sola vez.
+"""
+
+import re
+from typing import Dict, Iterable, List, Tuple, Union
+
+Section = Tuple[str, List[str]]
+
+# Nombres de sección reconocidos (inglés y español)
+_SECTION_NAMES = (
+    r'verse|verso|estrofa|chorus|coro|estribillo|refr[aá]n|pre[- ]?chorus|pre[- ]?coro|'
+    r'post[- ]?chorus|bridge|outro|interlude|interludio|refrain|intro|instrumental'
+)
+# Nombres que también son palabras de una letra ("final", "break"): sin
+# corchetes ni paréntesis solo son encabezado si les sigue ':'
+_AMBIGUOUS_NAMES = r'puente|hook|gancho|break|final'
+_SECTION_WORDS = _SECTION_NAMES + '|' + _AMBIGUOUS_NAMES
+
+# [Verse 1], [Chorus: Artista], **[Bridge]**, ## Coro, **Verse 2:**, (Chorus), Outro:
+# Un encabezado sin corchetes ocupa toda la línea: "Coro: la la la" es letra
+_HEADER_RE = re.compile(
+    r'^[\s#*_]*'
+    r'(?:'
+    r'\[(?P<bracket>[^\[\]]{1,60})\]'
+    r'|\((?P<paren>(?:' + _SECTION_WORDS + r')[^()]{0,40})\)'
+    r'|(?P<bare>(?:' + _SECTION_NAMES + r')(?:\s*\d+)?'
+    r'|(?:' + _AMBIGUOUS_NAMES + r')(?:\s*\d+)?(?=[\s*_]*:))'
+    r')'
+    r'[\s*_:]*(?:\((?:opcional|optional)\))?[\s*_:]*$',
+    re.IGNORECASE
+)
+
+# Marcadores markdown a eliminar dentro de las líneas de letra; los guiones
+# bajos solo en el borde de una palabra (_énfasis_, no snake_case)
+_EMPHASIS_RE = re.compile(r'(\*\*|\*|(?<!\w)__?(?=\S)|(?<=\S)__?(?!\w))')
+_LIST_PREFIX_RE = re.compile(r'^\s*(?:[-•>]\s+|#{1,6}\s+)')
+_RULE_RE = re.compile(r'^\s*(?:-{3,}|\*{3,}|_{3,}|```.*)\s*$')
+
+# Líneas del prompt que el modelo a veces repite y no forman parte de la letra
+_PROMPT_ECHO = ('TAREA', 'ESTILO')
+# Comentarios del modelo alrededor de la letra ("Nota: ...", "Título: ...")
+_META_RE = re.compile(r'^(?:nota|note|t[ií]tulo|title)\s*:', re.IGNORECASE)
+
+# Encabezado entre corchetes pegado al final de una línea con texto
+# ("Song Title Lyrics[Intro]", "última línea[Chorus]")
+_GLUED_HEADER_RE = re.compile(r'(?<=\S)(?=\[[^\[\]\n]{1,60}\][ \t]*$)', re.MULTILINE)
+
+
+# Tipo de sección a partir de la etiqueta ("[Chorus: Drake]" -> Chorus); el
+# orden importa: pre/post-coro antes que coro
+_SECTION_KINDS = (
+    ('PreChorus', re.compile(r'pre[- ]?(?:chorus|coro)', re.IGNORECASE)),
+    ('PostChorus', re.compile(r'post[- ]?(?:chorus|coro)', re.IGNORECASE)),
+    ('Chorus', re.compile(r'chorus|coro|estribillo|refr[aá]n|refrain', re.IGNORECASE)),
+    ('Verse', re.compile(r'verse|verso|estrofa', re.IGNORECASE)),
+    ('Bridge', re.compile(r'bridge|puente', re.IGNORECASE)),
+    ('Hook', re.compile(r'hook|gancho', re.IGNORECASE)),
+    ('Intro', re.compile(r'intro', re.IGNORECASE)),
+    ('Outro', re.compile(r'outro|final', re.IGNORECASE)),
+    ('Interlude', re.compile(r'interlud|break|instrumental', re.IGNORECASE)),
+)
+
+
+def section_kind(label: str) -> str:
+    """
+    Tipo normalizado de una sección
+
+    Args:
+        label: Etiqueta tal como aparece ("[Verse 2: Artista]", "[Coro]"...)
+
+    Returns:
+        Verse, PreChorus, Chorus, PostChorus, Bridge, Hook, Intro, Outro,
+        Interlude u Other
+    """
+    name = label.strip('[] ').split(':', 1)[0]
+    for kind, pattern in _SECTION_KINDS:
+        if pattern.search(name):
+            return kind
+    return 'Other'
+
+
+def _normalize_label(raw: str) -> str:
+    """Normaliza una etiqueta de sección al formato [Etiqueta]"""
+    label = re.sub(r'\s+', ' ', raw.strip(' *_:#')).strip()
+    return f"[{label[:1].upper()}{label[1:]}]" if label else "[Section]"
+
+
+def _clean_line(line: str) -> str:
+    """Quita formato markdown de una línea de letra"""
+    line = _LIST_PREFIX_RE.sub('', line)
+    return _EMPHASIS_RE.sub('', line).strip()
+
+
+def parse_sections(text: str, filter_model_artifacts: bool = True) -> List[Section]:
+    """
+    Parsea una letra en secciones ordenadas en una sola pasada
+
+    Args:
+        text: Texto de la letra con o sin encabezados de sección
+        filter_model_artifacts: Quita lo que añade el modelo (markdown, eco del
+            prompt, "Nota:"/"Título:") y acepta encabezados sin corchetes. Con
+            False (letras de Genius) solo cuentan los encabezados [Etiqueta] y
+            las líneas se conservan tal cual
+
+    Returns:
+        Lista ordenada de (etiqueta, líneas); las secciones repetidas se
+        conservan y las líneas anteriores al primer encabezado forman una
+        sección [Section] inicial
+    """
+    sections: List[Section] = []
+    stanzas: List[List[str]] = []   # Estrofas separadas por líneas vacías (respaldo)
+    preamble: List[str] = []        # Líneas antes del primer encabezado
+    current: List[str] = preamble   # Líneas de la sección en curso
+    stanza: List[str] = []
+
+    for raw_line in _GLUED_HEADER_RE.sub('\n', text or '').splitlines():
+        if not raw_line.strip():
+            if stanza:
+                stanzas.append(stanza)
+                stanza = []
+            continue
+
+        if filter_model_artifacts and _RULE_RE.match(raw_line):
+            continue
+
+        header = _HEADER_RE.match(raw_line)
+        if header and (filter_model_artifacts or header.group('bracket')):
+            label = header.group('bracket') or header.group('paren') or header.group('bare')
+            current = []
+            sections.append((_normalize_label(label), current))
+            if stanza:
+                stanzas.append(stanza)
+                stanza = []
+            continue
+
+        if filter_model_artifacts:
+            line = _clean_line(raw_line)
+            if not line or line.startswith(_PROMPT_ECHO) or _META_RE.match(line):
+                continue
+            # Presentación del modelo antes de la letra ("Aquí tienes la canción:")
+            if current is preamble and not preamble and line.endswith(':'):
+                continue
+        else:
+            line = raw_line.strip()
+
+        stanza.append(line)
+        current.append(line)
+
+    if stanza:
+        stanzas.append(stanza)
+
+    sections = [(label, lines) for label, lines in sections if lines]
+    if sections:
+        return ([('[Section]', preamble)] if preamble else []) + sections
+
+    return _sections_from_stanzas(stanzas)
+
+
+def _sections_from_stanzas(stanzas: List[List[str]]) -> List[Section]:
+    """Etiqueta estrofas sin encabezados: las repetidas son coro, el resto versos"""
+    if not stanzas:
+        return []
+    if len(stanzas) == 1:
+        return [('[Full Song]', stanzas[0])]
+
+    seen = {}
+    for stanza in stanzas:
+        key = tuple(line.lower() for line in stanza)
+        seen[key] = seen.get(key, 0) + 1
+
+    sections = []
+    verse_number = 0
+    for stanza in stanzas:
+        if seen[tuple(line.lower() for line in stanza)] > 1:
+            sections.append(('[Chorus]', stanza))
+        else:
+            verse_number += 1
+            sections.append((f'[Verse {verse_number}]', stanza))
+    return sections
+
+
+def normalize_sections(lyrics: Union[List, Dict, None]) -> List[Section]:
+    """
+    Convierte letras estructuradas a la lista de secciones
+
+    Acepta el formato actual (lista de pares) y el antiguo (dict etiqueta -> texto).
+
+    Args:
+        lyrics: Letras estructuradas en cualquiera de los dos formatos
+
+    Returns:
+        Lista ordenada de (etiqueta, líneas)
+    """
+    if not lyrics:
+        return []
+    if isinstance(lyrics, dict):
+        return [(label, [l for l in content.split('\n') if l.strip()]) for label, content in lyrics.items()]
+    return [(label, list(lines)) for label, lines in lyrics]
+
+
+def sections_text(sections: Iterable[Section]) -> str:
+    """Une todas las líneas de las secciones en un solo texto"""
+    return '\n'.join(line for _, lines in sections for line in lines)
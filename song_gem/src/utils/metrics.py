@@ -0,0 +1,242 @@
+"""
+Métricas de throughput y latencia del pipeline
+
+Registro en memoria de contadores e histogramas con etiquetas, exportable en
+formato de texto de Prometheus o como snapshot JSON. Es seguro entre hilos.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Límites (segundos) de los buckets de latencia por defecto
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    """Convierte etiquetas en una clave ordenada e inmutable"""
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Dict[str, str] = None) -> str:
+    """Formatea etiquetas al estilo Prometheus: {a="1",b="2"}"""
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Histogram:
+    """Histograma acumulativo de buckets fijos"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        """Registra una observación"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estima un cuantil interpolando dentro del bucket correspondiente"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else (self.max or lower)
+            if cumulative + bucket_count >= target and bucket_count:
+                fraction = (target - cumulative) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += bucket_count
+            lower = upper
+        return self.max or 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': {str(b): c for b, c in zip(list(self.buckets) + ['+Inf'], self._cumulative())},
+        }
+
+    def _cumulative(self) -> List[int]:
+        total = 0
+        result = []
+        for c in self.counts:
+            total += c
+            result.append(total)
+        return result
+
+
+class MetricsRegistry:
+    """Registro de contadores e histogramas etiquetados"""
+
+    def __init__(self, prefix: str = 'songgem'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self.started_at = time.time()
+
+    def _name(self, name: str) -> str:
+        return f"{self.prefix}_{name}" if self.prefix else name
+
+    def describe(self, name: str, help_text: str):
+        """Asocia un texto de ayuda a una métrica (línea # HELP)"""
+        self._help[self._name(name)] = help_text
+
+    def inc(self, name: str, value: float = 1, labels: Dict[str, str] = None):
+        """Incrementa un contador"""
+        full = self._name(name)
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(full, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Dict[str, str] = None):
+        """Registra una observación en un histograma"""
+        full = self._name(name)
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(full, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str, name: str = 'stage_seconds',
+              cpu_name: Optional[str] = 'stage_cpu_seconds') -> Iterator[None]:
+        """
+        Mide la duración (reloj y CPU del hilo) de un bloque y la registra por etapa
+
+        También puede usarse como decorador.
+
+        Args:
+            stage: Nombre de la etapa (etiqueta 'stage')
+            name: Histograma donde se registra el tiempo de reloj
+            cpu_name: Histograma donde se registra el tiempo de CPU (None = no medir)
+        """
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, {'stage': stage})
+            if cpu_name:
+                self.observe(cpu_name, time.thread_time() - cpu_start, {'stage': stage})
+
+    def reset(self):
+        """Elimina todas las series registradas"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict:
+        """
+        Snapshot serializable de todas las métricas
+
+        Returns:
+            Diccionario con contadores e histogramas por serie
+        """
+        with self._lock:
+            counters = {
+                name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [dict(labels=dict(key), **hist.to_dict()) for key, hist in series.items()]
+                for name, series in self._histograms.items()
+            }
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def to_json(self, indent: int = 2) -> str:
+        """Exporta el snapshot como JSON"""
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Exporta las métricas en formato de texto de Prometheus"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(series.items()):
+                    bounds = [f"{b:g}" for b in hist.buckets] + ['+Inf']
+                    for bound, cumulative in zip(bounds, hist._cumulative()):
+                        lines.append(f"{name}_bucket{_format_labels(key, {'le': bound})} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> str:
+        """Resumen legible para mostrar al final de una ejecución"""
+        snapshot = self.snapshot()
+        lines = ["📈 Métricas de la ejecución", "-" * 60]
+
+        for name, series in sorted(snapshot['histograms'].items()):
+            lines.append(name)
+            for entry in sorted(series, key=lambda e: -e['sum']):
+                labels = ','.join(f"{k}={v}" for k, v in entry['labels'].items()) or '-'
+                lines.append(
+                    f"  {labels:<28} n={entry['count']:<5} total={entry['sum']:.3f}s "
+                    f"media={entry['mean'] * 1e3:.1f}ms p95={entry['p95'] * 1e3:.1f}ms"
+                )
+
+        for name, series in sorted(snapshot['counters'].items()):
+            lines.append(name)
+            for entry in series:
+                labels = ','.join(f"{k}={v}" for k, v in entry['labels'].items()) or '-'
+                lines.append(f"  {labels:<28} {entry['value']:g}")
+
+        return '\n'.join(lines)
+
+
+# Registro global usado por defecto en todo el pipeline
+METRICS = MetricsRegistry()
+METRICS.describe('stage_seconds', 'Duración de cada etapa del pipeline en segundos')
+METRICS.describe('stage_cpu_seconds', 'Tiempo de CPU (del hilo) de cada etapa del pipeline en segundos')
+METRICS.describe('generation_seconds', 'Duración total de cada generación en segundos')
+METRICS.describe('tokens_total', 'Tokens consumidos según los metadatos de uso del modelo')
+METRICS.describe('generations_total', 'Generaciones por resultado')
+METRICS.describe('errors_total', 'Errores por tipo de excepción y etapa')
+METRICS.describe('profile_cache_total', 'Consultas a la caché de perfiles por resultado (hit, miss, stale)')
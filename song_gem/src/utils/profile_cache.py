@@ -0,0 +1,158 @@
+"""
+Caché LRU en memoria de perfiles de estilo
+
+Evita releer y parsear el JSON del perfil en cada generación. Cada entrada
+recuerda la huella del archivo del que salió (mtime, tamaño y hash del
+contenido): si el archivo cambia en disco la entrada se descarta y se vuelve
+a cargar; si solo cambió el mtime pero el contenido es idéntico se conserva.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.metrics import METRICS
+
+# (mtime_ns, tamaño) del archivo; None si no existe
+Stat = Optional[Tuple[int, int]]
+
+
+def _stat(path: Path) -> Stat:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _digest(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class ProfileCache:
+    """LRU acotada de perfiles validada contra el archivo en disco"""
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entries: Número máximo de perfiles en memoria
+        """
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        # clave -> (perfil, stat, hash)
+        self._entries: 'OrderedDict[str, Tuple[Dict, Stat, Optional[str]]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, key: str, path: Path) -> Optional[Dict]:
+        """
+        Devuelve el perfil en caché si sigue coincidiendo con el archivo
+
+        Args:
+            key: Clave normalizada del artista
+            path: Archivo del perfil
+
+        Returns:
+            Perfil, o None si no está o quedó obsoleto
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            self._count('miss')
+            return None
+
+        profile, stat, digest = entry
+        current = _stat(path)
+        if current != stat:
+            # mtime o tamaño distintos: solo es válido si el contenido es el mismo
+            if current is None or stat is None or _digest(path) != digest:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                self._count('stale')
+                return None
+            entry = (profile, current, digest)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+        self._count('hit')
+        return profile
+
+    def load(self, key: str, path: Path, loader: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Carga el perfil desde disco y lo guarda en caché
+
+        La huella se toma antes de leer, de modo que una escritura concurrente
+        invalida la entrada en la siguiente consulta.
+
+        Args:
+            key: Clave normalizada del artista
+            path: Archivo del perfil
+            loader: Función que lee el perfil desde una ruta
+
+        Returns:
+            Perfil cargado (None si no existe)
+        """
+        stat, digest = _stat(path), _digest(path)
+        profile = loader(str(path))
+        if profile:
+            self._store(key, profile, stat, digest)
+        return profile
+
+    def put(self, key: str, path: Path, profile: Dict):
+        """Guarda un perfil recién escrito en disco"""
+        self._store(key, profile, _stat(path), _digest(path))
+
+    def invalidate(self, key: str = None):
+        """Descarta una entrada (o todas si key es None)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def info(self) -> Dict:
+        """Tamaño y contadores de la caché"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions,
+            }
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def _store(self, key: str, profile: Dict, stat: Stat, digest: Optional[str]):
+        with self._lock:
+            self._entries[key] = (profile, stat, digest)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _count(self, result: str):
+        with self._lock:
+            if result == 'hit':
+                self.hits += 1
+            elif result == 'miss':
+                self.misses += 1
+            else:
+                self.misses += 1
+                self.invalidations += 1
+        METRICS.inc('profile_cache_total', labels={'result': result})
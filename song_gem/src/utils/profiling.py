@@ -0,0 +1,203 @@
+"""
+Perfilado del pipeline
+
+- span(): instrumentación ligera (reloj + CPU) por etapa sobre el registro de
+  métricas; se usa como context manager o decorador.
+- stage_breakdown(): desglose por etapa de tiempo de reloj y de CPU.
+- run_profiled(): ejecuta una función bajo cProfile (salida pstats) o bajo un
+  perfilador por muestreo propio (salida speedscope).
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import METRICS, MetricsRegistry
+
+PROFILE_MODES = ('cprofile', 'sample')
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+def span(name: str, registry: MetricsRegistry = None):
+    """
+    Mide una etapa del pipeline (tiempo de reloj y de CPU)
+
+    Args:
+        name: Nombre de la etapa, con puntos para jerarquía (ej. 'analyze.vocabulary')
+        registry: Registro de métricas (por defecto el global)
+
+    Returns:
+        Context manager reutilizable también como decorador
+    """
+    return (registry or METRICS).timer(name)
+
+
+def stage_breakdown(registry: MetricsRegistry = None) -> List[Dict]:
+    """
+    Desglose por etapa de tiempo de reloj y de CPU
+
+    Args:
+        registry: Registro de métricas (por defecto el global)
+
+    Returns:
+        Lista ordenada por tiempo de reloj total descendente
+    """
+    snapshot = (registry or METRICS).snapshot()['histograms']
+    prefix = (registry or METRICS)._name('')
+
+    def by_stage(name: str) -> Dict[str, Dict]:
+        return {entry['labels'].get('stage'): entry for entry in snapshot.get(prefix + name, [])}
+
+    wall = by_stage('stage_seconds')
+    cpu = by_stage('stage_cpu_seconds')
+    rows = []
+    for stage, entry in wall.items():
+        cpu_total = cpu.get(stage, {}).get('sum', 0.0)
+        rows.append({
+            'stage': stage,
+            'calls': entry['count'],
+            'wall_seconds': entry['sum'],
+            'cpu_seconds': cpu_total,
+            'cpu_ratio': cpu_total / entry['sum'] if entry['sum'] else 0.0,
+        })
+    return sorted(rows, key=lambda row: -row['wall_seconds'])
+
+
+def format_breakdown(rows: List[Dict]) -> str:
+    """Tabla legible del desglose por etapa"""
+    lines = ["⏱️  Desglose por etapa (reloj / CPU)", "-" * 60]
+    for row in rows:
+        lines.append(
+            f"  {row['stage']:<30} n={row['calls']:<5} reloj={row['wall_seconds']:8.3f}s "
+            f"cpu={row['cpu_seconds']:8.3f}s ({row['cpu_ratio'] * 100:3.0f}%)"
+        )
+    return '\n'.join(lines)
+
+
+class SamplingProfiler:
+    """Perfilador por muestreo de las pilas de todos los hilos"""
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Args:
+            interval: Segundos entre muestras
+        """
+        self.interval = interval
+        self._frames: List[Dict] = []
+        self._frame_index: Dict[Tuple[str, str, int], int] = {}
+        # hilo -> (muestras, pesos)
+        self._samples: Dict[str, Tuple[List[List[int]], List[float]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='songgem-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _frame_id(self, frame) -> int:
+        code = frame.f_code
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self._frames)
+            self._frames.append({'name': key[0], 'file': key[1], 'line': key[2]})
+        return index
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_id(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                samples, weights = self._samples.setdefault(names.get(ident, str(ident)), ([], []))
+                samples.append(stack)
+                weights.append(weight)
+
+    def to_speedscope(self, name: str = 'songgem') -> Dict:
+        """Exporta las muestras en el formato de archivo de speedscope"""
+        profiles = []
+        for thread_name, (samples, weights) in sorted(self._samples.items()):
+            profiles.append({
+                'type': 'sampled',
+                'name': thread_name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            })
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': name,
+            'exporter': 'songgem',
+            'activeProfileIndex': 0,
+            'shared': {'frames': self._frames},
+            'profiles': profiles,
+        }
+
+
+def run_profiled(fn: Callable, mode: str = 'cprofile', output: str = None, top: int = 25):
+    """
+    Ejecuta fn bajo un perfilador y escribe el resultado
+
+    Args:
+        fn: Función sin argumentos a perfilar
+        mode: 'cprofile' (archivo pstats) o 'sample' (archivo speedscope JSON)
+        output: Ruta de salida (por defecto songgem.prof / songgem.speedscope.json)
+        top: Funciones a mostrar en el resumen de cProfile
+
+    Returns:
+        Valor devuelto por fn
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Modo de perfilado desconocido: {mode}")
+
+    if mode == 'cprofile':
+        output = output or 'songgem.prof'
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn)
+        finally:
+            profiler.dump_stats(output)
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+            print(stream.getvalue())
+            print(f"📊 Perfil pstats guardado en {output} (python -m pstats {output})")
+
+    output = output or 'songgem.speedscope.json'
+    profiler = SamplingProfiler()
+    profiler.start()
+    try:
+        return fn()
+    finally:
+        profiler.stop()
+        Path(output).write_text(json.dumps(profiler.to_speedscope()), encoding='utf-8')
+        print(f"📊 Perfil speedscope guardado en {output} ({profiler.duration:.2f}s muestreados; "
+              f"ábrelo en https://www.speedscope.app)")
@@ -0,0 +1,203 @@
+"""
+Detección de repeticiones en letras
+
+Cada línea normalizada (minúsculas, sin puntuación) se convierte en un
+identificador entero mediante un diccionario, de modo que la letra pasa a ser
+una secuencia de enteros. Sobre ella, un array de sufijos con su LCP (Kasai)
+encuentra los bloques de varias líneas que se repiten: el que más líneas
+cubre es el candidato a coro, y las líneas muy repetidas son candidatas a
+hook. El array de sufijos cuesta O(n log n) en el número de líneas y ninguna
+fase compara cadenas.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Líneas mínimas de un bloque para considerarlo coro
+MIN_CHORUS_LINES = 2
+# Repeticiones mínimas de una línea para considerarla hook
+HOOK_MIN_REPEATS = 3
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s']+")
+
+
+def normalize_line(line: str) -> str:
+    """Normaliza una línea para comparar repeticiones (minúsculas, sin puntuación)"""
+    return ' '.join(_PUNCTUATION_RE.sub(' ', line.lower()).split())
+
+
+def line_ids(lines: List[str]) -> Tuple[List[int], List[str]]:
+    """
+    Convierte las líneas no vacías en identificadores enteros
+
+    Args:
+        lines: Líneas de la letra
+
+    Returns:
+        (identificadores, líneas originales correspondientes)
+    """
+    # Normalizar todo el texto de una vez (la puntuación nunca incluye '\n')
+    normalized = _PUNCTUATION_RE.sub(' ', '\n'.join(lines).lower()).split('\n')
+    ids: Dict[str, int] = {}
+    sequence, kept = [], []
+    for line, key in zip(lines, normalized):
+        key = ' '.join(key.split())
+        if not key:
+            continue
+        sequence.append(ids.setdefault(key, len(ids)))
+        kept.append(line.strip())
+    return sequence, kept
+
+
+def suffix_array(sequence: List[int]) -> List[int]:
+    """Array de sufijos por duplicación de prefijos (O(n log n) con ordenación por claves)"""
+    n = len(sequence)
+    order = list(range(n))
+    rank = list(sequence)
+    step = 1
+    while n > 1:
+        key = [(rank[i], rank[i + step] if i + step < n else -1) for i in range(n)]
+        order.sort(key=key.__getitem__)
+        new_rank = [0] * n
+        for prev, current in zip(order, order[1:]):
+            new_rank[current] = new_rank[prev] + (key[prev] != key[current])
+        rank = new_rank
+        if rank[order[-1]] == n - 1:
+            break
+        step *= 2
+    return order
+
+
+def lcp_array(sequence: List[int], order: List[int]) -> List[int]:
+    """LCP entre sufijos consecutivos del array de sufijos (algoritmo de Kasai, O(n))"""
+    n = len(sequence)
+    rank = [0] * n
+    for index, start in enumerate(order):
+        rank[start] = index
+    lcp = [0] * n
+    common = 0
+    for start in range(n):
+        if rank[start] == 0:
+            common = 0
+            continue
+        previous = order[rank[start] - 1]
+        while start + common < n and previous + common < n and \
+                sequence[start + common] == sequence[previous + common]:
+            common += 1
+        lcp[rank[start]] = common
+        common = max(common - 1, 0)
+    return lcp
+
+
+def repeated_blocks(sequence: List[int], min_length: int = 1) -> List[Tuple[int, List[int]]]:
+    """
+    Bloques de líneas repetidos, sin solapamiento entre apariciones
+
+    Recorre los intervalos LCP del array de sufijos: cada intervalo es un
+    bloque que aparece en todas sus posiciones. Si dos apariciones se
+    solapan, el bloque se acorta a la distancia mínima entre ellas.
+
+    Args:
+        sequence: Identificadores de línea
+        min_length: Longitud mínima del bloque
+
+    Returns:
+        Lista de (longitud, posiciones de inicio ordenadas)
+    """
+    if len(sequence) < 2:
+        return []
+    order = suffix_array(sequence)
+    lcp = lcp_array(sequence, order) + [0]
+
+    blocks = []
+    stack = [(0, 0)]  # (lcp del intervalo, índice izquierdo)
+    for i in range(1, len(lcp)):
+        left = i - 1
+        while lcp[i] < stack[-1][0]:
+            length, left = stack.pop()
+            positions = sorted(order[left:i])
+            gap = min(b - a for a, b in zip(positions, positions[1:]))
+            length = min(length, gap)
+            if length >= min_length:
+                blocks.append((length, positions))
+        if lcp[i] > stack[-1][0]:
+            stack.append((lcp[i], left))
+    return blocks
+
+
+def analyze_repetition(lines: List[str]) -> Dict:
+    """
+    Detecta el coro y los hooks de una letra
+
+    Args:
+        lines: Líneas de la letra (las vacías se ignoran)
+
+    Returns:
+        Diccionario con 'chorus' (líneas, posiciones y cobertura, o None),
+        'hooks' (líneas repetidas al menos HOOK_MIN_REPEATS veces) y
+        'repeated_line_ratio' (fracción de líneas que se repiten)
+    """
+    sequence, kept = line_ids(lines)
+    total = len(sequence)
+    if not total:
+        return {'chorus': None, 'hooks': [], 'repeated_line_ratio': 0.0, 'total_lines': 0}
+
+    chorus: Optional[Dict] = None
+    best = (0, 0)
+    for length, positions in repeated_blocks(sequence, MIN_CHORUS_LINES):
+        # Más líneas cubiertas; a igualdad, el bloque más largo
+        score = (length * len(positions), length)
+        if score > best:
+            best = score
+            chorus = {
+                'lines': kept[positions[0]:positions[0] + length],
+                'length': length,
+                'positions': positions,
+                'occurrences': len(positions),
+                'coverage': length * len(positions) / total,
+            }
+
+    counts = Counter(sequence)
+    first_seen = {}
+    for index, line_id in enumerate(sequence):
+        first_seen.setdefault(line_id, index)
+    hooks = [
+        {'line': kept[first_seen[line_id]], 'count': count}
+        for line_id, count in counts.most_common()
+        if count >= HOOK_MIN_REPEATS
+    ]
+
+    return {
+        'chorus': chorus,
+        'hooks': hooks,
+        'repeated_line_ratio': sum(c for c in counts.values() if c > 1) / total,
+        'total_lines': total,
+    }
+
+
+def split_by_chorus(total_lines: int, chorus: Optional[Dict]) -> Tuple[List[int], List[int]]:
+    """
+    Longitudes de versos y coros a partir del coro detectado
+
+    Los tramos entre apariciones del coro se cuentan como versos.
+
+    Args:
+        total_lines: Número de líneas no vacías de la letra
+        chorus: Coro devuelto por analyze_repetition (o None)
+
+    Returns:
+        (longitudes de versos, longitudes de coros)
+    """
+    if not chorus:
+        return ([total_lines] if total_lines else []), []
+
+    verses = []
+    cursor = 0
+    for start in chorus['positions']:
+        if start > cursor:
+            verses.append(start - cursor)
+        cursor = start + chorus['length']
+    if cursor < total_lines:
+        verses.append(total_lines - cursor)
+    return verses, [chorus['length']] * chorus['occurrences']
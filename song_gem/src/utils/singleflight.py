@@ -0,0 +1,98 @@
+"""
+Coalescencia de peticiones concurrentes idénticas (single-flight)
+
+Si varias llamadas piden la misma clave mientras su cálculo está en curso,
+solo la primera lo ejecuta y el resto espera y comparte el resultado (o la
+excepción). Funciona con hilos y con asyncio sobre el mismo registro, así que
+un hilo y una corrutina que pidan la misma clave también se coalescen.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Registro de cálculos en curso indexados por clave"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Devuelve el future en curso para la clave y si el llamador es el líder"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        """Publica el resultado a todos los que esperan y libera la clave"""
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Indica si hay un cálculo en curso para la clave"""
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta fn una sola vez por clave entre hilos concurrentes
+
+        Args:
+            key: Clave que identifica el cálculo
+            fn: Función a ejecutar si no hay otro cálculo en curso
+
+        Returns:
+            Resultado compartido del cálculo
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta fn una sola vez por clave entre corrutinas (e hilos) concurrentes
+
+        Las funciones síncronas se ejecutan en el executor del loop para no
+        bloquearlo; las corrutinas se esperan directamente.
+
+        Args:
+            key: Clave que identifica el cálculo
+            fn: Función o corrutina a ejecutar si no hay otro cálculo en curso
+
+        Returns:
+            Resultado compartido del cálculo
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                result = await fn(*args, **kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(None, lambda: fn(*args, **kwargs))
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
@@ -0,0 +1,317 @@
+"""
+Estructuras de resumen (sketches) de memoria acotada
+
+Se usan en el análisis en streaming de catálogos grandes y en los agregados
+por género o sello: en lugar de guardar cada palabra o cada puntuación, se
+mantienen agregados de tamaño fijo con cotas de error conocidas.
+
+- CountMinSketch: frecuencia aproximada de cualquier elemento (sobreestima).
+- SpaceSaving: elementos más frecuentes (heavy hitters) con error por elemento
+  (combinable y serializable).
+- HyperLogLog: número aproximado de elementos distintos (combinable).
+- RunningMoments: media, varianza, mínimo y máximo en una pasada (Welford).
+"""
+
+import base64
+import hashlib
+import heapq
+import math
+import zlib
+from array import array
+from typing import Dict, List, Tuple
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def hash_item(item: str) -> int:
+    """
+    Hash estable de 64 bits (no depende de PYTHONHASHSEED)
+
+    Los sketches aceptan el hash ya calculado para no repetirlo cuando un
+    mismo elemento se añade a varios.
+    """
+    return int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _remix(hashed: int, seed: int) -> int:
+    """Deriva un hash independiente a partir de otro y una semilla"""
+    return ((hashed ^ seed) * 0x9E3779B97F4A7C15) & _MASK64
+
+
+class CountMinSketch:
+    """Count-Min: estimación de frecuencias con error <= epsilon * total (prob. 1 - delta)"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = max(16, width)
+        self.depth = max(1, depth)
+        self.table = [array('I', bytes(4 * self.width)) for _ in range(self.depth)]
+        self.total = 0
+
+    def _indexes(self, item: str, hashed: int = None) -> List[int]:
+        # Doble hashing: h1 + i * h2 da `depth` índices independientes
+        h = hash_item(item) if hashed is None else hashed
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item: str, count: int = 1, hashed: int = None) -> int:
+        """Suma count al elemento y devuelve su nueva frecuencia estimada"""
+        self.total += count
+        estimate = None
+        for row, index in zip(self.table, self._indexes(item, hashed)):
+            value = row[index] = min(row[index] + count, 0xFFFFFFFF)
+            if estimate is None or value < estimate:
+                estimate = value
+        return estimate
+
+    def estimate(self, item: str, hashed: int = None) -> int:
+        """Frecuencia estimada (nunca menor que la real)"""
+        return min(row[index] for row, index in zip(self.table, self._indexes(item, hashed)))
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+    @property
+    def memory_bytes(self) -> int:
+        return 4 * self.width * self.depth
+
+    @classmethod
+    def for_budget(cls, budget_bytes: int, depth: int = 4) -> 'CountMinSketch':
+        return cls(width=budget_bytes // (4 * depth), depth=depth)
+
+
+class SpaceSaving:
+    """
+    Space-Saving: top-k aproximado con `capacity` contadores
+
+    Mientras el número de elementos distintos no supere la capacidad, los
+    conteos son exactos. Después, cada contador guarda una cota de error y
+    count - error es un mínimo garantizado.
+    """
+
+    # Coste aproximado por entrada (clave str corta + contador + entrada del heap)
+    ENTRY_BYTES = 200
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = max(1, capacity)
+        self.counts: Dict[str, List[int]] = {}  # elemento -> [conteo, error]
+        self.overflowed = False
+        # Min-heap perezoso de (conteo, elemento): las entradas desactualizadas
+        # se corrigen al llegar a la cima
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, item: str, count: int = 1):
+        entry = self.counts.get(item)
+        if entry is not None:
+            entry[0] += count
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = [count, 0]
+            heapq.heappush(self._heap, (count, item))
+            return
+
+        # Reemplazar el contador mínimo: el nuevo hereda su conteo como error
+        self.overflowed = True
+        while True:
+            stale_count, victim = self._heap[0]
+            current = self.counts[victim][0]
+            if current == stale_count:
+                break
+            heapq.heapreplace(self._heap, (current, victim))
+        del self.counts[victim]
+        self.counts[item] = [stale_count + count, stale_count]
+        heapq.heapreplace(self._heap, (stale_count + count, item))
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """Los n más frecuentes como (elemento, conteo, error)"""
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return [(key, value[0], value[1]) for key, value in ranked[:n]]
+
+    def guaranteed_top(self, n: int) -> int:
+        """Cuántos de los n primeros están garantizados en el top real"""
+        ranked = self.top(n + 1)
+        guaranteed = 0
+        for i, (_, count, error) in enumerate(ranked[:n]):
+            following = ranked[i + 1][1] if i + 1 < len(ranked) else 0
+            if count - error < following:
+                break
+            guaranteed += 1
+        return guaranteed
+
+    @property
+    def max_error(self) -> int:
+        return max((value[1] for value in self.counts.values()), default=0)
+
+    @property
+    def min_count(self) -> int:
+        """Conteo que puede tener cualquier elemento no monitorizado (0 si no está lleno)"""
+        if len(self.counts) < self.capacity and not self.overflowed:
+            return 0
+        return min((value[0] for value in self.counts.values()), default=0)
+
+    def merge(self, other: 'SpaceSaving', capacity: int = None) -> 'SpaceSaving':
+        """
+        Combina dos resúmenes (algoritmo de resúmenes combinables)
+
+        Un elemento ausente en uno de los resúmenes puede haber tenido allí
+        hasta su conteo mínimo: se suma a su conteo y a su error.
+
+        Args:
+            other: Otro resumen
+            capacity: Capacidad del resultado (por defecto la mayor de ambas)
+
+        Returns:
+            Nuevo resumen
+        """
+        merged = SpaceSaving(capacity or max(self.capacity, other.capacity))
+        min_self, min_other = self.min_count, other.min_count
+        combined = {}
+        for item in set(self.counts) | set(other.counts):
+            count_a, error_a = self.counts.get(item, (min_self, min_self))
+            count_b, error_b = other.counts.get(item, (min_other, min_other))
+            combined[item] = [count_a + count_b, error_a + error_b]
+
+        ranked = sorted(combined.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        merged.counts = dict(ranked[:merged.capacity])
+        merged.overflowed = self.overflowed or other.overflowed or len(ranked) > merged.capacity
+        merged._heap = [(value[0], key) for key, value in merged.counts.items()]
+        heapq.heapify(merged._heap)
+        return merged
+
+    def to_dict(self, limit: int = None) -> Dict:
+        """
+        Serializa el resumen (opcionalmente solo los `limit` más frecuentes)
+
+        Truncar equivale a un resumen de capacidad `limit`: los elementos
+        descartados quedan cubiertos por el conteo mínimo.
+        """
+        entries = self.top(limit or len(self.counts))
+        truncated = len(entries) < len(self.counts)
+        return {
+            'capacity': len(entries) if truncated else self.capacity,
+            'overflowed': self.overflowed or truncated,
+            'entries': [[item, count, error] for item, count, error in entries],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SpaceSaving':
+        summary = cls(data['capacity'])
+        summary.counts = {item: [count, error] for item, count, error in data['entries']}
+        summary.overflowed = data.get('overflowed', False)
+        summary._heap = [(value[0], key) for key, value in summary.counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.ENTRY_BYTES * len(self.counts)
+
+    @classmethod
+    def for_budget(cls, budget_bytes: int) -> 'SpaceSaving':
+        return cls(capacity=max(100, budget_bytes // cls.ENTRY_BYTES))
+
+
+class HyperLogLog:
+    """
+    HyperLogLog: número aproximado de elementos distintos
+
+    Con precisión p usa 2^p registros de un byte y tiene un error estándar
+    relativo de ~1.04 / sqrt(2^p) (1.6 % con p=12, 4 KB). Dos HLL de la misma
+    precisión se combinan con el máximo registro a registro, de modo que la
+    unión de vocabularios cuesta O(tamaño del sketch).
+    """
+
+    def __init__(self, precision: int = 12, seed: int = 0):
+        if not 4 <= precision <= 18:
+            raise ValueError("La precisión de HyperLogLog debe estar entre 4 y 18")
+        self.precision = precision
+        self.seed = seed
+        self.registers = bytearray(1 << precision)
+
+    def add(self, item: str, hashed: int = None):
+        h = hash_item(item) if hashed is None else hashed
+        if self.seed:
+            h = _remix(h, self.seed)
+        index = h >> (64 - self.precision)
+        # Posición del primer bit a 1 en los 64 - p bits restantes
+        rest = (h << self.precision) & _MASK64
+        rank = 64 - rest.bit_length() + 1 if rest else 64 - self.precision + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Corrección de rango bajo (linear counting)
+            return m * math.log(m / zeros)
+        return raw
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Unión de dos HLL (misma precisión y semilla)"""
+        if (other.precision, other.seed) != (self.precision, self.seed):
+            raise ValueError("Solo se pueden combinar HyperLogLog con la misma precisión y semilla")
+        merged = HyperLogLog(self.precision, self.seed)
+        merged.registers = bytearray(map(max, self.registers, other.registers))
+        return merged
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.registers)
+
+    def to_dict(self) -> Dict:
+        return {
+            'precision': self.precision,
+            'seed': self.seed,
+            'registers': base64.b64encode(zlib.compress(bytes(self.registers))).decode('ascii'),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HyperLogLog':
+        hll = cls(data['precision'], data.get('seed', 0))
+        registers = zlib.decompress(base64.b64decode(data['registers']))
+        if len(registers) != len(hll.registers):
+            raise ValueError("Registros de HyperLogLog con tamaño inesperado")
+        hll.registers = bytearray(registers)
+        return hll
+
+
+class RunningMoments:
+    """Media y varianza en una pasada (algoritmo de Welford) con mínimo y máximo"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'std': self.std, 'min': self.min, 'max': self.max}
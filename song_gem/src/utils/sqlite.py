@@ -0,0 +1,44 @@
+"""
+Conexiones SQLite de los almacenes persistentes
+
+La cola de trabajos, el índice de canciones, las generaciones y las
+características por canción abren la base igual: una conexión por hilo en
+modo WAL, en autocommit (las transacciones se abren con BEGIN IMMEDIATE) y
+nueva en cada proceso, porque una conexión heredada por fork no se puede
+usar en el hijo.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+
+class ThreadLocalConnection:
+    """Conexión SQLite por hilo y por proceso en modo WAL"""
+
+    def __init__(self, db_path: Union[str, Path], row_factory: Optional[Callable] = None, timeout: float = 30):
+        """
+        Args:
+            db_path: Ruta del archivo SQLite
+            row_factory: row_factory de las conexiones (p. ej. sqlite3.Row)
+            timeout: Segundos de espera si la base está bloqueada
+        """
+        self.db_path = str(db_path)
+        self.row_factory = row_factory
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        """Conexión de este hilo; se abre de nuevo si el proceso cambió (tras un fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
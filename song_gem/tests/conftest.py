@@ -0,0 +1,27 @@
+"""
+Configuración común de las pruebas
+
+Las pruebas comparan las estructuras optimizadas (corpus de tokens, array
+de sufijos, sketches, rangos de artista en FTS5) con una versión por fuerza
+bruta de lo mismo sobre datos pequeños y aleatorios con semilla fija, y las
+que necesitan Genius usan el servidor simulado de benchmarks (sin red).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Agregar src y benchmarks al path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+
+
+@pytest.fixture
+def nltk_data():
+    """Salta la prueba si faltan los datos de NLTK del análisis de estilo (ver install.py)"""
+    from analyzers.languages import LanguageResources
+    try:
+        LanguageResources('en').tokenize('la la')
+    except LookupError as e:
+        pytest.skip(f"Faltan datos de NLTK: {e}")
@@ -0,0 +1,108 @@
+"""Almacén de generaciones frente a filtrar y ordenar en Python"""
+
+import json
+import multiprocessing
+import os
+import random
+
+import pytest
+
+from generators.generation_store import GenerationStore
+
+_ARTISTS = ['Adele', 'Bad Bunny', 'Mock Artist 1']
+_THEMES = ['despedida', 'Amor en la ciudad', 'la noche']
+
+
+def _song(rng):
+    return {
+        'success': True,
+        'artist_style': rng.choice(_ARTISTS),
+        'theme': rng.choice(_THEMES),
+        'emotion': rng.choice(['positive', 'emotional', None]),
+        'originality_score': round(rng.random(), 3),
+        'lyrics': [['[Verso 1]', [f"línea {rng.randrange(1000)}"]]],
+        'generation_metadata': {'backend': 'stub'},
+    }
+
+
+@pytest.fixture
+def filled(tmp_path):
+    rng = random.Random(5)
+    store = GenerationStore(str(tmp_path / 'generations.sqlite3'))
+    rows = []
+    for kind in ('generate', 'rewrite'):
+        songs = [_song(rng) for _ in range(40)]
+        dates = [1_000_000 + rng.randrange(10_000) for _ in songs]
+        for generation_id, song, date in zip(store.add_many(songs, kind, dates), songs, dates):
+            rows.append((generation_id, kind, song, date))
+    return store, rows
+
+
+def test_query_matches_brute_force(filled):
+    store, rows = filled
+    rng = random.Random(8)
+    for _ in range(100):
+        filters = {
+            'artist': rng.choice([None, rng.choice(_ARTISTS).upper()]),
+            'theme': rng.choice([None, '  ' + rng.choice(_THEMES).lower()]),
+            'kind': rng.choice([None, 'generate', 'rewrite']),
+            'since': rng.choice([None, 1_000_000 + rng.randrange(10_000)]),
+            'min_originality': rng.choice([None, rng.random()]),
+        }
+        expected = [
+            (generation_id, song, date) for generation_id, kind, song, date in rows
+            if (not filters['artist'] or song['artist_style'].lower() == filters['artist'].lower())
+            and (not filters['theme'] or song['theme'].lower() == filters['theme'].strip())
+            and (not filters['kind'] or kind == filters['kind'])
+            and (filters['since'] is None or date >= filters['since'])
+            and (filters['min_originality'] is None or song['originality_score'] >= filters['min_originality'])
+        ]
+        assert store.count(**filters) == len(expected)
+
+        got = store.query(**filters, order='originality', limit=1000)
+        assert [g['originality_score'] for g in got] == sorted(
+            (song['originality_score'] for _, song, _ in expected), reverse=True)
+        got = store.query(**filters, order='oldest', limit=5, offset=2)
+        assert [g['created_at'] for g in got] == sorted(date for _, _, date in expected)[2:7]
+        assert {g['id'] for g in store.query(**filters, limit=1000)} == {i for i, _, _ in expected}
+
+
+def test_get_returns_the_full_song(filled):
+    store, rows = filled
+    generation_id, _, song, _ = rows[7]
+    assert store.get(generation_id) == json.loads(json.dumps(song))
+    assert store.get('no-existe') is None
+
+
+def test_import_files_is_repeatable(tmp_path):
+    rng = random.Random(2)
+    directory = tmp_path / 'generated_songs'
+    directory.mkdir()
+    for i in range(6):
+        (directory / f"song_{i}.json").write_text(json.dumps(_song(rng)), encoding='utf-8')
+    (directory / 'broken.json').write_text('{', encoding='utf-8')
+    store = GenerationStore(str(tmp_path / 'generations.sqlite3'))
+    paths = sorted(directory.glob('*.json'))
+    assert store.import_files(paths, 'generate') == 6
+    assert store.import_files(paths, 'generate') == 0
+    assert store.count() == 6
+
+
+def _add_in_child(store, song, parent_conn):
+    # La conexión heredada del padre no se puede usar en el hijo
+    if store._connect() is parent_conn:
+        os._exit(3)
+    store.add(song)
+    os._exit(0)
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='Requiere fork')
+def test_forked_child_opens_its_own_connection(tmp_path):
+    store = GenerationStore(str(tmp_path / 'generations.sqlite3'))
+    store.add(_song(random.Random(1)))
+    child = multiprocessing.get_context('fork').Process(
+        target=_add_in_child, args=(store, _song(random.Random(2)), store._connect()))
+    child.start()
+    child.join(10)
+    assert child.exitcode == 0
+    assert store.count() == 2
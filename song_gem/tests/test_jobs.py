@@ -0,0 +1,78 @@
+"""Cola de trabajos: cancelación cooperativa durante la descarga y la generación"""
+
+import pytest
+
+from jobs.job_queue import CANCELLED, SUCCEEDED, JobCancelled, JobQueue
+from jobs.worker import worker_loop
+from mock_genius import MockGeniusServer, running_in_thread
+from scrapers.lyrics_scraper import LyricsScraper
+
+
+class FakeSystem:
+    """SongGemSystem falso: la generación pide su propia cancelación a mitad"""
+
+    def __init__(self, queue, cancel=True, swallow=False):
+        self.queue = queue
+        self.cancel = cancel
+        self.swallow = swallow
+        self.checkpoints = 0
+
+    def generate_song(self, artist, theme, emotion, structure, recreate_style, candidates, progress):
+        for done in range(1, candidates + 1):
+            if self.cancel and done == 2:
+                self.queue.cancel(self.queue.list()[0]['id'])
+            try:
+                progress(0.1 + 0.8 * done / candidates, f'Candidato {done}/{candidates}')
+            except JobCancelled as e:
+                # Como LyricsGenerator: el error de una generación se devuelve, no se lanza
+                if self.swallow:
+                    return {'success': False, 'error': str(e)}
+                raise
+            self.checkpoints += 1
+        return {'success': True, 'candidates': candidates}
+
+
+def _run(tmp_path, **fake):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite3'))
+    job_id = queue.submit('generate', {'artist': 'a', 'theme': 't', 'candidates': 4})
+    system = FakeSystem(queue, **fake)
+    worker_loop(queue.db_path, lambda: system, poll_interval=0.01, max_jobs=1)
+    return queue.get(job_id), system
+
+
+def test_running_job_stops_at_next_checkpoint(tmp_path):
+    job, system = _run(tmp_path)
+    assert job['status'] == CANCELLED
+    assert system.checkpoints == 1
+
+
+def test_cancelled_generation_is_not_reported_as_failed(tmp_path):
+    job, _ = _run(tmp_path, swallow=True)
+    assert job['status'] == CANCELLED
+
+
+def test_uncancelled_job_succeeds(tmp_path):
+    job, system = _run(tmp_path, cancel=False)
+    assert job['status'] == SUCCEEDED and job['progress'] == 1.0
+    assert system.checkpoints == 4
+
+
+def test_queued_job_is_cancelled_immediately(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite3'))
+    job_id = queue.submit('analyze', {'artist': 'a'})
+    assert queue.cancel(job_id) == CANCELLED
+    assert queue.claim('w') is None
+
+
+def test_cancel_during_scrape_stops_downloads(tmp_path):
+    with running_in_thread(MockGeniusServer(artists=1, songs_per_artist=40, latency=0.01)) as genius:
+        scraper = LyricsScraper('x', cache_dir=str(tmp_path / 'cache'), base_url=genius.url, max_connections=2)
+
+        def progress(done, total):
+            if done >= 3:
+                raise JobCancelled('cancelado')
+
+        with pytest.raises(JobCancelled):
+            scraper.get_artist_songs('Mock Artist 1', 40, progress=progress)
+        assert genius.stats['requests_page'] < 40
+        assert scraper.cache_info('Mock Artist 1') is None
@@ -0,0 +1,40 @@
+"""Palabras clave de temas: palabras completas frente a una búsqueda por fuerza bruta"""
+
+import random
+
+from analyzers.languages import _THEME_KEYWORDS, count_terms, keyword_terms
+
+_VOCABULARY = ['mi', 'vida', 'mar', 'amarte', 'sol', 'sola', 'rey', 'creyendo', 'tomar', 'noche', 'la']
+
+
+def _brute_counts(words, keywords):
+    """Apariciones de cada clave como secuencia de palabras consecutivas"""
+    counts = {}
+    for category, terms in keywords.items():
+        for term in terms:
+            term = term.split()
+            for i in range(len(words) - len(term) + 1):
+                if words[i:i + len(term)] == term:
+                    counts[category] = counts.get(category, 0) + 1
+    return counts
+
+
+def test_count_terms_matches_brute_force():
+    rng = random.Random(6)
+    terms = keyword_terms(_THEME_KEYWORDS['es'])
+    for _ in range(300):
+        words = [rng.choice(_VOCABULARY) for _ in range(rng.randrange(0, 30))]
+        assert count_terms(words, terms) == _brute_counts(words, _THEME_KEYWORDS['es'])
+
+
+def test_keywords_inside_other_words_do_not_count():
+    terms = keyword_terms(_THEME_KEYWORDS['es'])
+    assert count_terms(['amarte', 'sola', 'creyendo'], terms) == {'heartbreak': 1}
+    assert count_terms(['el', 'mar', 'mi', 'vida'], terms) == {'nature': 1, 'love': 1}
+
+
+def test_song_features_use_whole_words(nltk_data):
+    from analyzers.style_analyzer import StyleAnalyzer
+    song = {'title': 't', 'lyrics': 'Quiero amarte y tomar el sol\nEres mi vida, mi vida'}
+    themes = StyleAnalyzer().song_features([song])[0]['themes']
+    assert themes == {'party': 1, 'nature': 1, 'love': 2}
@@ -0,0 +1,77 @@
+"""Pruebas del generador: best-of-N con candidatos que fallan o se cancelan y extracción de temas"""
+
+import threading
+import time
+
+import pytest
+
+from generators.backends import ModelBackend, ModelResponse
+from generators.lyrics_generator import LyricsGenerator
+from jobs.job_queue import JobCancelled
+from utils.metrics import MetricsRegistry
+
+
+class FlakyBackend(ModelBackend):
+    """Backend que falla en las llamadas indicadas (por orden de llegada)"""
+
+    def __init__(self, failing=(), latency=0.0):
+        self.failing = set(failing)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def generate(self, prompt, generation_config):
+        with self.lock:
+            call = self.calls
+            self.calls += 1
+        time.sleep(self.latency)
+        if call in self.failing:
+            raise RuntimeError(f"fallo en la llamada {call}")
+        return ModelResponse([f"[Verso 1]\ncandidato {call}"], {'total_tokens': 1})
+
+
+def test_failed_candidates_are_dropped():
+    metrics = MetricsRegistry()
+    generator = LyricsGenerator(backend=FlakyBackend(failing={1, 3}), metrics=metrics, candidate_workers=1)
+    texts, usage = generator._request_candidates('prompt', 4, parallel=True)
+    assert sorted(texts) == ['[Verso 1]\ncandidato 0', '[Verso 1]\ncandidato 2']
+    assert usage == {'total_tokens': 2}
+
+
+def test_all_candidates_failing_raises():
+    generator = LyricsGenerator(backend=FlakyBackend(failing=range(3)), metrics=MetricsRegistry())
+    with pytest.raises(RuntimeError):
+        generator._request_candidates('prompt', 3, parallel=True)
+
+
+def test_generate_ranks_surviving_candidates():
+    generator = LyricsGenerator(backend=FlakyBackend(failing={0}), metrics=MetricsRegistry(), candidate_workers=1)
+    result = generator.generate_lyrics({'artist_name': 'X'}, 'tema', candidate_count=3)
+    assert result['success']
+    assert result['generation_metadata']['candidate_count'] == 2
+
+
+def test_cancellation_stops_pending_candidates():
+    backend = FlakyBackend(latency=0.05)
+    generator = LyricsGenerator(backend=backend, metrics=MetricsRegistry(), candidate_workers=1)
+
+    def progress(done, total):
+        raise JobCancelled('cancelado')
+
+    start = time.perf_counter()
+    with pytest.raises(JobCancelled):
+        generator._request_candidates('prompt', 8, parallel=True, progress=progress)
+    assert time.perf_counter() - start < 0.2
+    time.sleep(0.1)
+    assert backend.calls < 8
+
+
+def test_rewrite_theme_and_emotion_match_whole_words(nltk_data):
+    generator = LyricsGenerator(backend=FlakyBackend(), metrics=MetricsRegistry())
+    # 'sun' en Sunday, 'top' en topic, 'sad' en sadly y 'dark' en darker no cuentan
+    lyrics = "Sunday morning on the topic\nSadly the road gets darker"
+    assert generator._extract_theme(lyrics) == 'life'
+    assert generator._extract_emotion(lyrics) == 'balanced'
+    lyrics = "The sun and the moon\nI cry in the dark, I smile"
+    assert generator._extract_theme(lyrics) == 'nature'
+    assert generator._extract_emotion(lyrics) == 'emotional'
@@ -0,0 +1,142 @@
+"""Caché de artistas y búsquedas de canciones sueltas contra el Genius simulado (sin red)"""
+
+import io
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from mock_genius import _SONG_ID_STRIDE, MockGeniusServer, running_in_thread
+from scrapers.genius_client import GeniusClient
+from scrapers.lyrics_scraper import LyricsScraper, _iter_json_array
+
+
+@pytest.fixture
+def genius():
+    with running_in_thread(MockGeniusServer(artists=2, songs_per_artist=5)) as server:
+        yield server
+
+
+@pytest.fixture
+def scraper(genius, tmp_path):
+    return LyricsScraper('x', cache_dir=str(tmp_path / 'cache'), base_url=genius.url)
+
+
+def test_lookup_returns_the_same_on_repeat(genius, scraper):
+    title = genius._song(_SONG_ID_STRIDE)['title']
+    first = scraper.search_song('Mock Artist 1', title)
+    requests = genius.stats['requests_api']
+    second = scraper.search_song('Mock Artist 1', title)
+
+    assert first is not None and first['title'] == title
+    assert second == first
+    # La segunda sale del índice de búsquedas, sin preguntar a Genius
+    assert genius.stats['requests_api'] == requests
+
+
+def test_fallback_hit_is_not_returned(genius, scraper):
+    # Genius responde con otra canción del artista: no es la pedida
+    assert scraper.search_song('Mock Artist 1', 'x') is None
+    requests = genius.stats['requests_api']
+    assert scraper.search_song('Mock Artist 1', 'x') is None
+    assert genius.stats['requests_api'] == requests
+
+
+def test_client_rejects_hits_by_other_artists(genius):
+    client = GeniusClient('x', api_url=genius.url)
+    try:
+        title = genius._song(_SONG_ID_STRIDE)['title']
+        song = client.search_song(title, 'Mock Artist 1')
+        assert (song.title, song.artist) == (title, 'Mock Artist 1')
+        # Genius solo devuelve canciones de Mock Artist 1: ninguna es del artista pedido
+        assert client.search_song(title, 'Mock Artist 1 Tribute') is None
+    finally:
+        client.close()
+
+
+def _scraper(genius, tmp_path, **freshness):
+    return LyricsScraper('x', cache_dir=str(tmp_path / 'cache'), base_url=genius.url, **freshness)
+
+
+def test_fresh_cache_is_served_without_requests(genius, tmp_path):
+    scraper = _scraper(genius, tmp_path, fresh_ttl=3600, hard_expiry=0)
+    assert scraper.cache_info('Mock Artist 1') is None
+    assert len(scraper.get_artist_songs('Mock Artist 1')) == 5
+    info = scraper.cache_info('Mock Artist 1')
+    assert info['state'] == 'fresh' and info['song_count'] == 5
+
+    requests = genius.stats['requests_total']
+    assert len(scraper.get_artist_songs('Mock Artist 1')) == 5
+    assert genius.stats['requests_total'] == requests
+
+
+def test_stale_cache_is_served_while_refreshing(genius, tmp_path):
+    scraper = _scraper(genius, tmp_path, fresh_ttl=0, hard_expiry=0)
+    scraper.get_artist_songs('Mock Artist 1')
+    fetched_at = scraper.cache_info('Mock Artist 1')['fetched_at']
+    assert scraper.cache_info('Mock Artist 1')['state'] == 'stale'
+    httpx.post(f"{genius.url}/_release?artist=1&count=2")
+
+    # La copia antigua se sirve sin esperar a la descarga
+    assert len(scraper.get_artist_songs('Mock Artist 1')) == 5
+    scraper.wait_for_refreshes(timeout=10)
+    assert len(scraper.get_cached_songs('Mock Artist 1')) == 7
+    assert scraper.cache_info('Mock Artist 1')['fetched_at'] > fetched_at
+
+
+def test_expired_cache_is_refreshed_before_serving(genius, tmp_path):
+    scraper = _scraper(genius, tmp_path, fresh_ttl=0, hard_expiry=1e-6)
+    scraper.get_artist_songs('Mock Artist 1')
+    assert scraper.cache_info('Mock Artist 1')['state'] == 'expired'
+    httpx.post(f"{genius.url}/_release?artist=1&count=2")
+    assert len(scraper.get_artist_songs('Mock Artist 1')) == 7
+
+
+def test_concurrent_cache_writes_leave_one_complete_file(tmp_path):
+    scraper = LyricsScraper('x', cache_dir=str(tmp_path / 'cache'), client='lyricsgenius')
+    catalogs = [[{'title': f"Song {i}", 'lyrics': 'la ' * 20_000 * (i + 1)}] for i in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda songs: scraper.cache_songs('Artista', songs), catalogs))
+    assert scraper.get_cached_songs('Artista') in catalogs
+    assert not list(scraper.cache_dir.glob('*.tmp'))
+
+
+_TRICKY = ['}', '{', ']', '[', '"', '\\', ',', '\n', 'ñ', '😀', ' ', 'la', '\\"}', '\u2028']
+
+
+def _catalog(rng):
+    return [{'title': ''.join(rng.choice(_TRICKY) for _ in range(rng.randrange(0, 6))),
+             'lyrics': ''.join(rng.choice(_TRICKY) for _ in range(rng.randrange(0, 40))),
+             'sections': [[rng.choice(_TRICKY), [rng.choice(_TRICKY)]] for _ in range(rng.randrange(0, 3))],
+             'genius_id': rng.randrange(10 ** 6)}
+            for _ in range(rng.randrange(0, 8))]
+
+
+def test_streamed_cache_matches_json_load():
+    rng = random.Random(4)
+    for _ in range(300):
+        catalog = _catalog(rng)
+        text = json.dumps(catalog, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+        text = rng.choice(['', ' ', '\n']) + text
+        chunk_size = rng.choice([1, 2, 3, 7, 64, 1 << 16])
+        assert list(_iter_json_array(io.StringIO(text), chunk_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize('text', ['', '{"a": 1}', '[{"a": 1}', '[{"a": 1},'])
+def test_streamed_cache_rejects_broken_files(text):
+    with pytest.raises(ValueError):
+        list(_iter_json_array(io.StringIO(text), 2))
+
+
+def test_stream_and_full_read_agree(tmp_path):
+    scraper = LyricsScraper('x', cache_dir=str(tmp_path / 'cache'), client='lyricsgenius')
+    catalog = _catalog(random.Random(9)) + [{'title': 'x' * 100_000, 'lyrics': 'la'}]
+    scraper.cache_songs('Artista', catalog)
+    songs, digest = scraper.get_cached_catalog('Artista')
+    streamed, streamed_digest = scraper.get_cached_catalog('Artista', stream=True)
+    assert list(streamed) == songs == catalog
+    assert streamed_digest == digest == scraper.cache_digest('Artista')
+    assert list(scraper.iter_cached_songs('Artista')) == catalog
+    assert list(scraper.iter_cached_songs('Nadie')) == []
@@ -0,0 +1,71 @@
+"""Parseo de letras en secciones: tabla de ejemplos"""
+
+import pytest
+
+from scrapers.lyrics_scraper import LyricsScraper
+from utils.lyrics_sections import parse_sections, section_kind
+
+# (texto, secciones esperadas) con los filtros de la salida del modelo
+MODEL_CASES = [
+    # Encabezados entre corchetes, markdown y coros repetidos
+    ("[Verse 1]\nuno\ndos\n\n[Chorus]\nla la\n\n[Chorus]\nla la",
+     [('[Verse 1]', ['uno', 'dos']), ('[Chorus]', ['la la']), ('[Chorus]', ['la la'])]),
+    ("**[Verso 1]**\n**uno**\n## Coro\n*dos*",
+     [('[Verso 1]', ['uno']), ('[Coro]', ['dos'])]),
+    ("Verse 2:\nuno\n(Chorus)\ndos\nOutro (opcional)\ntres",
+     [('[Verse 2]', ['uno']), ('[Chorus]', ['dos']), ('[Outro]', ['tres'])]),
+    # Las líneas antes del primer encabezado no se pierden
+    ("primera línea\nsegunda\n[Chorus]\nla la",
+     [('[Section]', ['primera línea', 'segunda']), ('[Chorus]', ['la la'])]),
+    # ... salvo la presentación del modelo
+    ("¡Claro! Aquí tienes la canción:\n\n[Verse 1]\nuno",
+     [('[Verse 1]', ['uno'])]),
+    # Un encabezado sin corchetes con texto detrás es letra
+    ("[Verse 1]\nuno\nCoro: la la la\ndos",
+     [('[Verse 1]', ['uno', 'Coro: la la la', 'dos'])]),
+    # Palabras que también son nombres de sección: solo con ':'
+    ("[Verse 1]\nllegamos al\nfinal\n\nFinal:\nadiós",
+     [('[Verse 1]', ['llegamos al', 'final']), ('[Final]', ['adiós'])]),
+    ("[Bridge]\nbreak\nhook\n\nHook:\nsí",
+     [('[Bridge]', ['break', 'hook']), ('[Hook]', ['sí'])]),
+    # El énfasis con guiones bajos solo se quita en el borde de las palabras
+    ("[Verse 1]\n_solo_ en snake_case y mi_nombre__real\n__fuerte__ road_",
+     [('[Verse 1]', ['solo en snake_case y mi_nombre__real', 'fuerte road'])]),
+    # Comentarios del modelo, eco del prompt y separadores
+    ("Título: Algo\n[Verse 1]\nuno\n---\nNota: rima AABB\nTAREA: escribir",
+     [('[Verse 1]', ['uno'])]),
+    # Sin encabezados: estrofas repetidas = coro
+    ("uno\ndos\n\nla la\n\ntres\n\nla la",
+     [('[Verse 1]', ['uno', 'dos']), ('[Chorus]', ['la la']), ('[Verse 2]', ['tres']), ('[Chorus]', ['la la'])]),
+    ("una sola estrofa\nsin más", [('[Full Song]', ['una sola estrofa', 'sin más'])]),
+    ("", []),
+]
+
+# Letras de Genius: solo cuentan los [encabezados] y las líneas se conservan tal cual
+GENIUS_CASES = [
+    ("Song Title Lyrics[Intro]\nhey\n[Chorus: Artista]\n*lonely* road_\nCoro: la la",
+     [('[Intro]', ['hey']), ('[Chorus: Artista]', ['*lonely* road_', 'Coro: la la'])]),
+    ("12 ContributorsSong Lyrics[Verse 1]\nuno\nfinal\nChorus\n\n[Outro]\nfin34Embed",
+     [('[Verse 1]', ['uno', 'final', 'Chorus']), ('[Outro]', ['fin'])]),
+    ("sin encabezado\n[Verse 1]\nuno",
+     [('[Section]', ['sin encabezado']), ('[Verse 1]', ['uno'])]),
+]
+
+
+@pytest.mark.parametrize('text,expected', MODEL_CASES)
+def test_model_output(text, expected):
+    assert parse_sections(text) == expected
+
+
+@pytest.mark.parametrize('text,expected', GENIUS_CASES)
+def test_genius_lyrics(text, expected):
+    text = LyricsScraper._strip_genius_chrome(text)
+    assert parse_sections(text, filter_model_artifacts=False) == expected
+
+
+@pytest.mark.parametrize('label,kind', [
+    ('[Verse 2: Artista]', 'Verse'), ('[Pre-Chorus]', 'PreChorus'), ('[Estribillo]', 'Chorus'),
+    ('[Final]', 'Outro'), ('[Puente]', 'Bridge'), ('[Section]', 'Other'),
+])
+def test_section_kind(label, kind):
+    assert section_kind(label) == kind
@@ -0,0 +1,92 @@
+"""Reconstrucción y guardado de perfiles: huella de la caché y perfiles al día"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+import main
+from analyzers.style_analyzer import StyleAnalyzer
+from jobs.rebuild import rebuild_profiles
+from mock_genius import MockGeniusServer, running_in_thread
+
+
+@pytest.fixture
+def genius():
+    with running_in_thread(MockGeniusServer(artists=3, songs_per_artist=12)) as server:
+        yield server
+
+
+@pytest.fixture
+def system(nltk_data, genius, tmp_path, monkeypatch):
+    for name, path in [('LYRICS_CACHE_DIR', 'cache'), ('STYLE_PROFILES_DIR', 'profiles'),
+                       ('FEATURE_STORE_PATH', 'features.sqlite3'), ('TOKEN_CORPUS_DIR', 'corpus'),
+                       ('GENERATIONS_DB_PATH', 'generations.sqlite3')]:
+        monkeypatch.setattr(main, name, str(tmp_path / path))
+    return main.SongGemSystem('y', 'x', genius_url=genius.url)
+
+
+def _fingerprint(system, artist):
+    return json.loads(system._profile_path(artist).read_text(encoding='utf-8')).get('source_fingerprint')
+
+
+def test_analyzed_profile_is_up_to_date(system):
+    system.analyze_artist('Mock Artist 1')
+    assert _fingerprint(system, 'Mock Artist 1')
+    assert system.rebuild_profile('Mock Artist 1')['status'] == 'skipped'
+
+
+def test_skip_does_not_parse_the_cache(system, monkeypatch):
+    system.analyze_artist('Mock Artist 1')
+
+    def parse(*args, **kwargs):
+        raise AssertionError("la caché no debería leerse")
+
+    monkeypatch.setattr(system.scraper, 'get_cached_catalog', parse)
+    assert system.rebuild_profile('Mock Artist 1')['status'] == 'skipped'
+
+
+def test_changed_cache_is_rebuilt(system):
+    system.analyze_artist('Mock Artist 1')
+    before = _fingerprint(system, 'Mock Artist 1')
+
+    songs = system.scraper.get_cached_songs('Mock Artist 1')
+    system.scraper.cache_songs('Mock Artist 1', songs[:-1])
+    system.build_corpus()
+    result = system.rebuild_profile('Mock Artist 1')
+    assert result == {'artist': 'Mock Artist 1', 'songs': len(songs) - 1, 'status': 'rebuilt'}
+    assert _fingerprint(system, 'Mock Artist 1') != before
+    assert system.rebuild_profile('Mock Artist 1')['status'] == 'skipped'
+    assert system.rebuild_profile('Mock Artist 1', force=True)['status'] == 'rebuilt'
+
+
+def test_synced_profile_is_up_to_date(system, genius):
+    system.analyze_artist('Mock Artist 2')
+    httpx.post(f"{genius.url}/_release?artist=2&count=2")
+    assert system.sync_cache(['Mock Artist 2']) == {'Mock Artist 2': 2}
+    assert system.rebuild_profile('Mock Artist 2')['status'] == 'skipped'
+
+
+def test_rebuild_all(system):
+    for artist in ('Mock Artist 1', 'Mock Artist 2'):
+        system.analyze_artist(artist)
+    system.build_corpus()
+    counts = system.scraper.cached_song_counts()
+    assert counts == {'Mock Artist 1': 12, 'Mock Artist 2': 12}
+
+    summary = rebuild_profiles(counts, lambda: system)
+    # Añadir el segundo artista al corpus cambia las palabras distintivas del primero
+    assert (summary['rebuilt'], summary['skipped']) == (1, 1)
+    summary = rebuild_profiles(counts, lambda: system)
+    assert (summary['rebuilt'], summary['skipped'], summary['failed']) == (0, 2, 0)
+
+
+def test_concurrent_profile_saves_leave_one_complete_file(tmp_path):
+    analyzer = StyleAnalyzer()
+    path = tmp_path / 'artista_style.json'
+    profiles = [{'artist_name': 'Artista', 'padding': 'x' * 50_000 * (i + 1)} for i in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda profile: analyzer.save_style_profile(profile, str(path)), profiles))
+    assert analyzer.load_style_profile(str(path)) in profiles
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
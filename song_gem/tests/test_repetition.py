@@ -0,0 +1,51 @@
+"""Array de sufijos, LCP y bloques repetidos frente a fuerza bruta"""
+
+import random
+
+import pytest
+
+from utils.repetition import lcp_array, repeated_blocks, suffix_array
+
+
+def _sequences():
+    rng = random.Random(7)
+    yield []
+    yield [0]
+    yield [0] * 12
+    yield [0, 1] * 9
+    for _ in range(200):
+        yield [rng.randrange(rng.choice([2, 3, 6])) for _ in range(rng.randrange(1, 40))]
+
+
+def _common_prefix(a, b):
+    length = 0
+    while length < min(len(a), len(b)) and a[length] == b[length]:
+        length += 1
+    return length
+
+
+@pytest.mark.parametrize('sequence', list(_sequences()))
+def test_suffix_array_and_lcp(sequence):
+    order = suffix_array(sequence)
+    assert order == sorted(range(len(sequence)), key=lambda i: sequence[i:])
+
+    lcp = lcp_array(sequence, order)
+    expected = [0] + [_common_prefix(sequence[a:], sequence[b:]) for a, b in zip(order, order[1:])]
+    assert lcp[:len(sequence)] == expected[:len(sequence)]
+
+
+@pytest.mark.parametrize('sequence', list(_sequences()))
+def test_repeated_blocks(sequence):
+    blocks = repeated_blocks(sequence)
+    for length, positions in blocks:
+        assert length >= 1 and len(positions) >= 2
+        assert positions == sorted(positions)
+        # Mismo bloque en todas sus apariciones y sin solapamiento
+        block = sequence[positions[0]:positions[0] + length]
+        assert all(sequence[p:p + length] == block for p in positions)
+        assert all(b - a >= length for a, b in zip(positions, positions[1:]))
+
+    # Toda línea repetida aparece en algún bloque de longitud >= 1
+    covered = {p for length, positions in blocks for start in positions for p in range(start, start + length)}
+    repeated = {i for i, value in enumerate(sequence) if sequence.count(value) > 1}
+    assert repeated <= covered
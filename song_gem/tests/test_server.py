@@ -0,0 +1,92 @@
+"""Pruebas del modo servicio HTTP: validación de parámetros antes de llamar al modelo"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from generators.backends import ModelBackend, ModelResponse
+from generators.lyrics_generator import LyricsGenerator
+from server import HTTPError, SongGemServer
+
+
+class RecordingSystem:
+    """SongGemSystem falso que registra los candidatos que le llegan"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def generate_song_async(self, artist, theme, emotion, structure, recreate_style, candidates):
+        self.calls.append(candidates)
+        return None
+
+    async def rewrite_song_async(self, target, original_artist, original_title, new_angle, candidates):
+        self.calls.append(candidates)
+        return None
+
+
+@pytest.mark.parametrize('kind, value, expected', [
+    (int, '3', 3), (int, 3.0, 3), (int, None, None), (float, '0.5', 0.5), (float, 2, 2.0),
+    (bool, 'true', True), (bool, 'Sí', True), (bool, '0', False), (bool, False, False),
+])
+def test_param_parses_query_and_json_values(kind, value, expected):
+    assert SongGemServer._param({'x': value}, 'x', kind) == expected
+
+
+@pytest.mark.parametrize('kind, value', [
+    (int, 'abc'), (int, 2.5), (int, True), (float, 'x'), (float, [1]), (bool, 'quizás'), (bool, 1.5),
+])
+def test_param_rejects_bad_values_with_400(kind, value):
+    with pytest.raises(HTTPError) as error:
+        SongGemServer._param({'x': value}, 'x', kind)
+    assert error.value.status == 400
+
+
+def dispatch(server, path, params):
+    return asyncio.run(server._dispatch('POST', path, {}, json.dumps(params).encode('utf-8')))
+
+
+def test_candidates_above_limit_are_rejected_before_generation():
+    system = RecordingSystem()
+    server = SongGemServer(system, max_candidates=8)
+    try:
+        for path, params in [('/generate', {'artist': 'a', 'theme': 't'}),
+                             ('/rewrite', {'target_artist': 'a', 'original_artist': 'b', 'original_title': 'c'})]:
+            for candidates in (0, 9, 10000):
+                status, payload = dispatch(server, path, dict(params, candidates=candidates))
+                assert status == 400, (path, candidates)
+                assert 'candidates' in payload['error']
+            status, _ = dispatch(server, path, dict(params, candidates=8))
+            assert status != 400
+        assert system.calls == [8, 8]
+    finally:
+        server.executor.shutdown()
+
+
+class ConcurrencyBackend(ModelBackend):
+    """Backend que mide cuántas llamadas hay en curso a la vez"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def generate(self, prompt, generation_config):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return ModelResponse(['[Verso 1]\nla la'], {'total_tokens': 1})
+
+
+def test_parallel_candidates_are_capped_at_worker_count():
+    backend = ConcurrencyBackend()
+    generator = LyricsGenerator(backend=backend, candidate_workers=3)
+    texts, usage = generator._request_candidates('prompt', 12, parallel=True)
+    assert len(texts) == 12
+    assert usage == {'total_tokens': 12}
+    assert backend.peak <= 3
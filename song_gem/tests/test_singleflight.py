@@ -0,0 +1,121 @@
+"""Coalescencia de peticiones concurrentes (single-flight) entre hilos y corrutinas"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from generators.backends import StubBackend
+from mock_genius import MockGeniusServer, running_in_thread
+from scrapers.lyrics_scraper import LyricsScraper
+from utils.singleflight import SingleFlight
+
+
+class SlowCall:
+    """Función que cuenta sus ejecuciones y no termina hasta que se la libera"""
+
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return object()
+
+
+def _run_concurrently(flight, key, fn, count=8):
+    """Lanza count llamadas con la misma clave mientras fn está en curso"""
+    with ThreadPoolExecutor(count) as pool:
+        futures = [pool.submit(flight.do, key, fn) for _ in range(count)]
+        assert fn.started.wait(5)
+        # Da tiempo a que el resto se una al cálculo en curso
+        time.sleep(0.1)
+        fn.release.set()
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_calls_share_one_result():
+    flight, fn = SingleFlight(), SlowCall()
+    results = _run_concurrently(flight, 'k', fn)
+    assert fn.calls == 1
+    assert all(result is results[0] for result in results)
+    assert not flight.in_flight('k')
+
+
+def test_error_is_shared_and_key_released():
+    flight, fn = SingleFlight(), SlowCall(error=ValueError('boom'))
+    results = _run_concurrently(flight, 'k', fn)
+    assert fn.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    # Terminado el cálculo, la clave se ejecuta de nuevo
+    retry = SlowCall()
+    retry.release.set()
+    assert flight.do('k', retry) is not None
+    assert retry.calls == 1
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    fns = [SlowCall() for _ in range(3)]
+    for fn in fns:
+        fn.release.set()
+    with ThreadPoolExecutor(3) as pool:
+        list(pool.map(lambda item: flight.do(item[0], item[1]), enumerate(fns)))
+    assert [fn.calls for fn in fns] == [1, 1, 1]
+
+
+def test_thread_and_coroutine_share_the_call():
+    flight, fn = SingleFlight(), SlowCall()
+
+    async def main():
+        with ThreadPoolExecutor(1) as pool:
+            from_thread = pool.submit(flight.do, 'k', fn)
+            assert await asyncio.get_running_loop().run_in_executor(None, fn.started.wait, 5)
+            waiting = asyncio.ensure_future(flight.do_async('k', fn))
+            await asyncio.sleep(0.05)
+            fn.release.set()
+            return await waiting, from_thread.result()
+
+    from_coroutine, from_thread = asyncio.run(main())
+    assert fn.calls == 1
+    assert from_coroutine is from_thread
+
+
+def test_concurrent_downloads_of_one_artist_hit_genius_once(tmp_path):
+    with running_in_thread(MockGeniusServer(artists=1, songs_per_artist=6, latency=0.02)) as genius:
+        scraper = LyricsScraper('x', cache_dir=str(tmp_path / 'cache'), base_url=genius.url)
+        with ThreadPoolExecutor(4) as pool:
+            catalogs = list(pool.map(lambda _: scraper.get_artist_songs('Mock Artist 1', 6), range(4)))
+        assert all(len(songs) == 6 for songs in catalogs)
+        # Cada letra se descarga una sola vez aunque haya cuatro peticiones
+        assert genius.stats['requests_page'] == 6
+
+
+def test_forced_reanalysis_does_not_join_a_generation(tmp_path, monkeypatch):
+    for name, path in [('LYRICS_CACHE_DIR', 'cache'), ('STYLE_PROFILES_DIR', 'profiles'),
+                       ('FEATURE_STORE_PATH', 'features.sqlite3'), ('TOKEN_CORPUS_DIR', 'corpus'),
+                       ('GENERATIONS_DB_PATH', 'generations.sqlite3')]:
+        monkeypatch.setattr(main, name, str(tmp_path / path))
+    system = main.SongGemSystem('y', 'x', backend=StubBackend())
+    fn = SlowCall()
+    monkeypatch.setattr(system, '_generate_and_save', lambda *args: {'recreate_style': args[4], 'result': fn()})
+
+    with ThreadPoolExecutor(3) as pool:
+        cached = [pool.submit(system.generate_song, 'Adele', 'Despedida ') for _ in range(2)]
+        assert fn.started.wait(5)
+        forced = pool.submit(system.generate_song, 'adele', 'despedida', recreate_style=True)
+        time.sleep(0.1)
+        fn.release.set()
+        results = [future.result() for future in cached] + [forced.result()]
+    # Las dos peticiones iguales comparten generación; la que fuerza el reanálisis lleva la suya
+    assert fn.calls == 2
+    assert results[0] is results[1]
+    assert results[2]['recreate_style'] and not results[0]['recreate_style']
@@ -0,0 +1,146 @@
+"""Cotas de error de los sketches y de VocabularySketch frente a conteos exactos"""
+
+import random
+from collections import Counter
+
+from analyzers.vocabulary_sketch import VocabularySketch, summaries_from_counts
+from utils.sketches import CountMinSketch, HyperLogLog, SpaceSaving
+
+
+def _zipf_stream(seed: int, distinct: int, total: int):
+    """Palabras con frecuencias de tipo Zipf (unas pocas muy frecuentes y muchas raras)"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    return [f"w{index}" for index in rng.choices(range(distinct), weights, k=total)]
+
+
+def test_count_min_bounds():
+    stream = _zipf_stream(1, 3000, 20000)
+    truth = Counter(stream)
+    sketch = CountMinSketch(width=256, depth=4)
+    for word in stream:
+        sketch.add(word)
+
+    assert sketch.total == len(stream)
+    over = [sketch.estimate(word) - count for word, count in truth.items()]
+    assert min(over) >= 0
+    # Error <= epsilon * total salvo con probabilidad delta por elemento
+    exceeded = sum(1 for error in over if error > sketch.epsilon * sketch.total)
+    assert exceeded <= max(1, 3 * sketch.delta * len(truth))
+
+
+def test_space_saving_bounds():
+    stream = _zipf_stream(2, 2000, 20000)
+    truth = Counter(stream)
+    summary = SpaceSaving(capacity=100)
+    for word in stream:
+        summary.add(word)
+
+    assert summary.overflowed
+    for word, (count, error) in summary.counts.items():
+        assert count - error <= truth[word] <= count
+    for word in set(truth) - set(summary.counts):
+        assert truth[word] <= summary.min_count
+
+    # Los primeros garantizados superan a cualquier otro elemento
+    guaranteed = summary.guaranteed_top(20)
+    assert guaranteed > 0
+    top = [word for word, _, _ in summary.top(guaranteed)]
+    rest = max(count for word, count in truth.items() if word not in top)
+    assert all(truth[word] >= rest for word in top)
+
+
+def test_space_saving_exact_under_capacity():
+    stream = _zipf_stream(3, 50, 2000)
+    summary = SpaceSaving(capacity=100)
+    for word in stream:
+        summary.add(word)
+    assert not summary.overflowed and summary.max_error == 0
+    assert {word: count for word, (count, _) in summary.counts.items()} == Counter(stream)
+
+
+def test_space_saving_merge_and_serialization():
+    first, second = _zipf_stream(4, 1500, 8000), _zipf_stream(5, 1500, 8000)
+    truth = Counter(first) + Counter(second)
+    summaries = []
+    for stream in (first, second):
+        summary = SpaceSaving(capacity=120)
+        for word in stream:
+            summary.add(word)
+        summaries.append(SpaceSaving.from_dict(summary.to_dict(limit=80)))
+
+    merged = summaries[0].merge(summaries[1])
+    for word, (count, error) in merged.counts.items():
+        assert count - error <= truth[word] <= count
+    for word in set(truth) - set(merged.counts):
+        assert truth[word] <= merged.min_count
+
+
+def test_hyperloglog_estimate_and_merge():
+    for distinct in (10, 1000, 50000):
+        hll = HyperLogLog(precision=12)
+        for index in range(distinct):
+            hll.add(f"item{index}")
+        assert abs(hll.estimate() - distinct) <= 4 * hll.relative_error * distinct + 1
+
+    left, right, union = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    for index in range(3000):
+        (left if index % 3 else right).add(f"x{index}")
+        union.add(f"x{index}")
+    # La unión registro a registro es exactamente el HLL de la unión
+    assert left.merge(right).registers == union.registers
+    assert HyperLogLog.from_dict(union.to_dict()).registers == union.registers
+
+
+def _sketch_songs(seed: int, distinct: int, songs: int):
+    stream = _zipf_stream(seed, distinct, songs * 100)
+    return [Counter(stream[i:i + 100]) for i in range(0, len(stream), 100)]
+
+
+def test_vocabulary_sketch_exact_mode_matches_counter():
+    songs = _sketch_songs(6, 300, 40)
+    truth = sum(songs, Counter())
+    sketch = VocabularySketch(memory_budget_bytes=1_000_000)
+    for counts in songs:
+        sketch.add_counts(counts)
+
+    assert sketch.exact
+    profile = sketch.profile()
+    assert profile['total_words'] == sum(truth.values())
+    assert profile['unique_words'] == len(truth)
+    assert profile['rare_words_count'] == sum(1 for count in truth.values() if count == 1)
+    assert all(truth[word] == 1 for word in profile['rare_words_sample'])
+    assert [count for _, count in profile['most_common_words']] == [count for _, count in truth.most_common(20)]
+    assert profile['avg_word_length'] == sum(map(len, truth)) / len(truth)
+
+
+def test_vocabulary_sketch_bounded_mode():
+    songs = _sketch_songs(7, 20000, 400)
+    truth = sum(songs, Counter())
+    sketch = VocabularySketch(memory_budget_bytes=40_000)
+    for counts in songs:
+        sketch.add_counts(counts)
+
+    assert not sketch.exact
+    profile = sketch.profile()
+    accuracy = sketch.accuracy()
+    assert profile['total_words'] == sum(truth.values())
+    error = accuracy['unique_words']['relative_std_error']
+    assert abs(profile['unique_words'] - len(truth)) <= 4 * error * len(truth)
+    for word, count, error in sketch.top_words.top(20):
+        assert count - error <= truth[word] <= count
+    for word in profile['rare_words_sample']:
+        assert truth[word] == 1
+
+
+def test_summaries_from_counts_match_sketch():
+    songs = _sketch_songs(8, 300, 20)
+    truth = sum(songs, Counter())
+    sketch = VocabularySketch(memory_budget_bytes=1_000_000)
+    for counts in songs:
+        sketch.add_counts(counts)
+
+    exact, streamed = summaries_from_counts(truth), sketch.summaries()
+    assert exact['total_words'] == streamed['total_words']
+    assert exact['distinct'] == streamed['distinct']
+    assert sorted(exact['top_words']['entries'], key=lambda e: (-e[1], e[0])) == streamed['top_words']['entries']
@@ -0,0 +1,116 @@
+"""Búsqueda de texto completo por artista frente a un filtrado directo de las líneas"""
+
+import json
+import os
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from scrapers.song_index import SongIndex, _fold, line_ending, normalize_name
+
+_WORDS = ['amor', 'noche', 'luz', 'night', 'light', 'corazón', 'corazon', 'fuego', 'bailando', 'cantando', 'sol']
+_ARTISTS = ['Luna Roja', 'The Night', 'Sol y Mar']
+
+
+def _write(cache_dir: Path, name: str, songs):
+    path = cache_dir / f"{name}.json"
+    path.write_text(json.dumps(songs, ensure_ascii=False), encoding='utf-8')
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    return path
+
+
+def _songs(rng, artist, serial):
+    songs = []
+    for _ in range(rng.randrange(1, 5)):
+        serial[0] += 1
+        lines = [' '.join(rng.choice(_WORDS) for _ in range(rng.randrange(1, 6))) for _ in range(rng.randrange(1, 7))]
+        # Colaboraciones: canciones de otro artista en el archivo
+        singer = artist if rng.random() < 0.8 else rng.choice(_ARTISTS)
+        songs.append({'artist': singer, 'title': f"Song {serial[0]}", 'lyrics': '\n'.join(lines)})
+    return songs
+
+
+def _brute_lines(cache, query, ending, artist):
+    """(archivo, posición, línea) de las líneas que deberían coincidir"""
+    key = normalize_name(artist) if artist else None
+    wanted = set(re.findall(r'\w+', _fold(query))) if query else set()
+    suffix = line_ending(ending) if ending else ''
+    found = set()
+    for path, songs in cache.items():
+        if key and normalize_name(path.stem.replace('_', ' ')) != key and \
+                all(normalize_name(song['artist']) != key for song in songs):
+            continue
+        for position, song in enumerate(songs):
+            for line_no, line in enumerate(song['lyrics'].split('\n')):
+                line = line.strip()
+                if not line or not wanted <= set(re.findall(r'\w+', _fold(line))):
+                    continue
+                if suffix and not line_ending(line).startswith(suffix):
+                    continue
+                found.add((str(path), position, line_no))
+    return found
+
+
+@pytest.fixture
+def index_and_cache(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    index = SongIndex(str(tmp_path / 'index.db'))
+    if not index.fulltext:
+        pytest.skip("SQLite sin FTS5")
+
+    rng = random.Random(13)
+    serial = [0]
+    cache = {}
+    names = ['Luna_Roja', 'The_Night', 'Sol_y_Mar', 'Luna_Roja_Live', 'Otros']
+    for name in names:
+        path = _write(cache_dir, name, _songs(rng, name.replace('_', ' '), serial))
+        cache[path] = json.loads(path.read_text(encoding='utf-8'))
+    index.refresh(cache_dir)
+    # Reindexar intercala los rangos de IDs de línea de los archivos
+    for name in ['Luna_Roja', 'Sol_y_Mar', 'Luna_Roja']:
+        path = _write(cache_dir, name, _songs(rng, name.replace('_', ' '), serial))
+        cache[path] = json.loads(path.read_text(encoding='utf-8'))
+        index.refresh(cache_dir)
+    return index, cache
+
+
+@pytest.mark.parametrize('query,ending', [
+    ('amor', None), ('corazón', None), ('noche luz', None), ('fuego', 'ando'), (None, 'ight'), (None, 'on'),
+])
+@pytest.mark.parametrize('artist', [None, 'Luna Roja', 'the night', 'Sol y Mar', 'Nadie'])
+def test_search_matches_brute_force(index_and_cache, query, ending, artist):
+    index, cache = index_and_cache
+    expected = _brute_lines(cache, query, ending, artist)
+
+    lines = index.search_lines(query, ending, artist, limit=10_000)
+    assert {(row['cache_file'], row['position'], row['line_no']) for row in lines} == expected
+
+    songs = index.search_lyrics(query, ending, artist, limit=10_000, lines_per_song=10_000)
+    per_song = {}
+    for cache_file, position, _ in expected:
+        per_song[(cache_file, position)] = per_song.get((cache_file, position), 0) + 1
+    assert {(song['cache_file'], song['position']): song['matches'] for song in songs} == per_song
+    for song in songs:
+        assert {(song['cache_file'], song['position'], line['line_no']) for line in song['lines']} <= expected
+        assert len(song['lines']) == song['matches']
+
+
+def test_song_counts_are_songs_per_file(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    index = SongIndex(str(tmp_path / 'index.db'))
+    # Una colaboración (dos claves de artista) y dos canciones con el mismo título
+    path = _write(cache_dir, 'Luna_Roja', [
+        {'artist': 'Luna Roja', 'title': 'Noche', 'lyrics': 'a'},
+        {'artist': 'Luna Roja', 'title': 'Noche', 'lyrics': 'b'},
+        {'artist': 'Sol y Mar', 'title': 'Fuego', 'lyrics': 'c'},
+        {'artist': 'The Night', 'title': 'Luz', 'lyrics': 'd'},
+    ])
+    other = _write(cache_dir, 'Sol_y_Mar', [{'artist': 'Sol y Mar', 'title': 'Mar', 'lyrics': 'e'}])
+    index.refresh(cache_dir)
+    assert index.song_counts() == {str(path): 4, str(other): 1}
+    assert index.file_song_count(path) == 4
@@ -0,0 +1,183 @@
+"""Corpus de tokens frente a la tokenización directa de la caché"""
+
+import json
+import os
+import random
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from analyzers.token_corpus import NGRAM_SIZE, UNKNOWN, TokenCorpus, ngram_hashes, tokenize_line
+
+_MASK64 = (1 << 64) - 1
+_HASH_BASE = 0x100000001B3
+_WORDS = ['amor', 'noche', 'luz', 'road', "don't", 'corazón', 'fuego', 'mar', 'baby', 'sol', 'cielo', 'ñandú']
+
+
+def _brute_hashes(tokens, line_starts, n):
+    """Hash de cada n-grama dentro de una línea y sin tokens desconocidos, en orden"""
+    bounds = list(line_starts) + [len(tokens)]
+    hashes = []
+    for start, end in zip(bounds, bounds[1:]):
+        for i in range(start, end - n + 1):
+            gram = tokens[i:i + n]
+            if UNKNOWN in gram:
+                continue
+            value = 0
+            for token in gram:
+                value = (value * _HASH_BASE + token) & _MASK64
+            hashes.append(value)
+    return hashes
+
+
+def test_ngram_hashes_matches_brute_force():
+    rng = random.Random(11)
+    for _ in range(300):
+        lengths = [rng.randrange(1, 9) for _ in range(rng.randrange(1, 8))]
+        tokens = [rng.choice([UNKNOWN, 1, 2, 3, 4, 5]) if rng.random() < 0.2 else rng.randrange(1, 6)
+                  for _ in range(sum(lengths))]
+        starts = list(np.cumsum([0] + lengths[:-1]))
+        n = rng.choice([1, 2, 3, NGRAM_SIZE])
+        got = ngram_hashes(np.asarray(tokens, np.uint32), np.asarray(starts, np.int64), n)
+        assert got.tolist() == _brute_hashes(tokens, starts, n)
+
+
+def _song(rng, index):
+    lines = [' '.join(rng.choice(_WORDS) for _ in range(rng.randrange(0, 9))) for _ in range(rng.randrange(1, 8))]
+    return {'title': f"Song {index}", 'lyrics': '\n'.join(lines)}
+
+
+def _write_artist(cache_dir: Path, key: str, songs):
+    path = cache_dir / f"{key}.json"
+    path.write_text(json.dumps(songs, ensure_ascii=False), encoding='utf-8')
+    # Cambia mtime aunque el tamaño coincida con la versión anterior
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def _check_against_cache(corpus: TokenCorpus, cache: dict, exact_index: bool):
+    """Compara el corpus con la tokenización directa de las canciones vigentes"""
+    vocabulary = corpus.vocabulary()
+    index = {word: token_id for token_id, word in enumerate(vocabulary)}
+    assert corpus.artists() == sorted(cache)
+
+    total = Counter()
+    live_hashes = set()
+    line_count = 0
+    for key, songs in cache.items():
+        lines = [tokenize_line(line) for song in songs for line in song['lyrics'].split('\n')]
+        lines = [words for words in lines if words]
+        line_count += len(lines)
+        words = [word for line in lines for word in line]
+        assert [vocabulary[t] for t in corpus.artist_tokens(key).tolist()] == words
+        counts = corpus.word_counts(key)
+        assert {vocabulary[t]: int(c) for t, c in enumerate(counts) if c} == Counter(words)
+        total.update(words)
+
+        ids = [index[word] for word in words]
+        starts = list(np.cumsum([0] + [len(line) for line in lines[:-1]])) if lines else []
+        live_hashes.update(_brute_hashes(ids, starts, NGRAM_SIZE))
+
+    counts = corpus.word_counts()
+    assert {vocabulary[t]: int(c) for t, c in enumerate(counts) if c} == total
+
+    # Las estadísticas cuentan solo lo vigente
+    stats = corpus.stats()
+    assert (stats['songs'], stats['lines'], stats['tokens']) == (
+        sum(len(songs) for songs in cache.values()), line_count, sum(total.values()))
+    manifest = corpus._snapshot_now().manifest
+    assert stats['tokens'] + stats['dead_tokens'] == manifest['tokens']
+    indexed = set(corpus._snapshot_now().arrays['ngrams'].tolist())
+    # Lo obsoleto sigue en el índice hasta la compactación
+    assert indexed == live_hashes if exact_index else indexed >= live_hashes
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    cache_dir, corpus_dir = tmp_path / 'cache', tmp_path / 'corpus'
+    cache_dir.mkdir()
+    return cache_dir, corpus_dir
+
+
+def test_update_appends_and_compacts(dirs):
+    cache_dir, corpus_dir = dirs
+    rng = random.Random(3)
+    cache = {f"artist_{i}": [_song(rng, j) for j in range(rng.randrange(1, 6))] for i in range(6)}
+    for key, songs in cache.items():
+        _write_artist(cache_dir, key, songs)
+    corpus = TokenCorpus(str(corpus_dir))
+    assert corpus.update(str(cache_dir))['added'] == 6
+    _check_against_cache(corpus, cache, exact_index=True)
+
+    # Un artista modificado deja su rango anterior obsoleto
+    cache['artist_1'] = [_song(rng, j) for j in range(3)]
+    _write_artist(cache_dir, 'artist_1', cache['artist_1'])
+    result = corpus.update(str(cache_dir))
+    assert result['updated'] == 1
+    if not result['compacted']:
+        assert corpus.stats()['dead_songs'] > 0
+    _check_against_cache(corpus, cache, exact_index=result['compacted'])
+
+    # Retirar casi todo fuerza la compactación
+    for key in ['artist_0', 'artist_2', 'artist_3', 'artist_4']:
+        (cache_dir / f"{key}.json").unlink()
+        del cache[key]
+    result = corpus.update(str(cache_dir))
+    assert result['removed'] == 4 and result['compacted']
+    assert corpus.stats()['dead_songs'] == 0
+    assert corpus.stats()['tokens'] == sum(len(corpus.artist_tokens(key)) for key in cache)
+    _check_against_cache(corpus, cache, exact_index=True)
+
+    # Otra instancia (otro proceso) lee lo mismo
+    _check_against_cache(TokenCorpus(str(corpus_dir)), cache, exact_index=True)
+
+
+def test_interrupted_append_is_discarded(dirs):
+    cache_dir, corpus_dir = dirs
+    rng = random.Random(5)
+    cache = {f"artist_{i}": [_song(rng, j) for j in range(4)] for i in range(3)}
+    for key, songs in cache.items():
+        _write_artist(cache_dir, key, songs)
+    corpus = TokenCorpus(str(corpus_dir))
+    corpus.update(str(cache_dir))
+
+    # Una compilación interrumpida dejó bytes tras las longitudes del manifest
+    manifest = json.loads((corpus_dir / 'manifest.json').read_text(encoding='utf-8'))
+    for kind in ('vocab', 'tokens', 'lines', 'songs'):
+        with open(corpus_dir / manifest['files'][kind], 'ab') as f:
+            f.write(b'zombi\n' if kind == 'vocab' else b'\x07' * 24)
+    _check_against_cache(corpus, cache, exact_index=True)
+
+    cache['artist_3'] = [_song(rng, j) for j in range(4)] + [{'title': 'Nueva', 'lyrics': 'zombi palabra nueva'}]
+    _write_artist(cache_dir, 'artist_3', cache['artist_3'])
+    assert corpus.update(str(cache_dir))['added'] == 1
+    _check_against_cache(corpus, cache, exact_index=True)
+    vocabulary = corpus.vocabulary()
+    assert len(vocabulary) == len(set(vocabulary))
+
+    # Las líneas nuevas siguen apuntando a sus tokens
+    found, total = corpus.copied_ngrams([line for song in cache['artist_3'] for line in song['lyrics'].split('\n')])
+    assert found == total
+
+
+def test_generation_advances_only_on_changes(dirs):
+    cache_dir, corpus_dir = dirs
+    rng = random.Random(7)
+    corpus = TokenCorpus(str(corpus_dir))
+    _write_artist(cache_dir, 'artist_0', [_song(rng, 0)])
+    corpus.update(str(cache_dir))
+    generation = corpus.generation()
+
+    # Sin cambios en la caché el corpus no cambia (los perfiles siguen al día)
+    corpus.update(str(cache_dir))
+    assert corpus.generation() == generation
+
+    for change in (lambda: _write_artist(cache_dir, 'artist_1', [_song(rng, 1)]),
+                   lambda: _write_artist(cache_dir, 'artist_0', [_song(rng, 2)]),
+                   lambda: (cache_dir / 'artist_1.json').unlink()):
+        change()
+        corpus.update(str(cache_dir))
+        assert corpus.generation() > generation
+        generation = corpus.generation()